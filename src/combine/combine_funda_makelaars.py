@@ -1,6 +1,9 @@
 # %% Combiner: 
+import numpy as np
 import pandas as pd
 
+from src.combine.match_listings import match_listings
+
 def retreve_most_recent_funda_file():
     import os
     import glob
@@ -36,6 +39,80 @@ def retrieve_most_recent_makelaar_file():
     
     return most_recent_file
 
+KEY_COLUMNS = ['street', 'number_extension', 'url', 'city', 'price', 'm2', 'latitude', 'longitude', 'source', 'match_confidence']
+
+
+def _first_of(df, columns):
+    """
+    Row-wise first non-null value of the columns that exist in df.
+    """
+    result = pd.Series(np.nan, index=df.index, dtype=object)
+    for col in columns:
+        if col in df.columns:
+            result = result.combine_first(df[col])
+    return result
+
+
+def combine_funda_makelaars(df_funda, df_makelaar, matches=None):
+    """
+    One row per listing: matched pairs side by side (funda columns suffixed '_funda',
+    makelaar columns '_makelaar'), plus the unmatched listings of both sources.
+    Key columns prefer the Funda value.
+
+    Parameters:
+        matches (pd.DataFrame): Match table of match_listings(); computed when not given
+    """
+    if matches is None:
+        matches = match_listings(df_funda, df_makelaar)
+
+    funda = df_funda.add_suffix('_funda')
+    makelaar = df_makelaar.add_suffix('_makelaar')
+
+    matched = pd.concat([
+        funda.loc[matches['funda_id']].reset_index(drop=True),
+        makelaar.loc[matches['makelaar_id']].reset_index(drop=True),
+    ], axis=1)
+    matched['match_confidence'] = matches['confidence'].to_numpy()
+
+    # The source comes from the match table: a matched pair is 'both' even when one side lacks a url
+    df_combined = pd.concat([
+        matched.assign(source='both'),
+        funda.drop(index=matches['funda_id']).assign(source='funda'),
+        makelaar.drop(index=matches['makelaar_id']).assign(source='makelaar'),
+    ], ignore_index=True)
+
+    df_combined['street'] = _first_of(df_combined, ['street_name_funda', 'street_makelaar'])
+    df_combined['number_extension'] = _first_of(df_combined, ['number_funda', 'number_extension_makelaar'])
+    df_combined['url'] = _first_of(df_combined, ['url_funda', 'url_makelaar'])
+    df_combined['city'] = _first_of(df_combined, ['city_funda', 'city_makelaar'])
+    df_combined['price'] = _first_of(df_combined, ['price_funda', 'price_makelaar'])
+    df_combined['m2'] = _first_of(df_combined, ['m2_funda', 'area_makelaar'])
+    df_combined['latitude'] = _first_of(df_combined, ['lat_funda', 'latitude_makelaar'])
+    df_combined['longitude'] = _first_of(df_combined, ['lon_funda', 'longitude_makelaar'])
+
+    if 'match_confidence' not in df_combined.columns:
+        df_combined['match_confidence'] = np.nan
+
+    return df_combined[KEY_COLUMNS + [col for col in df_combined.columns if col not in KEY_COLUMNS]]
+
+
+def combine_most_recent():
+    """
+    Matches the most recent Funda and makelaar files and saves the match table and the combined data.
+    """
+    df_funda = pd.read_csv(retreve_most_recent_funda_file())
+    df_makelaar = pd.read_csv(retrieve_most_recent_makelaar_file())
+
+    matches = match_listings(df_funda, df_makelaar)
+    df_combined = combine_funda_makelaars(df_funda, df_makelaar, matches)
+
+    today = pd.Timestamp.now().strftime('%Y-%m-%d')
+    matches.to_csv('data/funda_makelaars_matches_{}.csv'.format(today), index=False)
+    df_combined.to_csv('data/funda_makelaars_combined_{}.csv'.format(today), index=False)
+    print("Combined DataFrame saved to 'data/funda_makelaars_combined_{}.csv' ({} matches)".format(today, len(matches)))
+    return df_combined
+
+
 # most_recent_funda = retreve_most_recent_funda_file()
 # most_recent_makelaar = retrieve_most_recent_makelaar_file()
 
@@ -88,31 +165,8 @@ def retrieve_most_recent_makelaar_file():
 # })
 
 # # %%
-# # Merge DataFrames on latitude and longitude, keeping all columns from both
-# df_combined = pd.merge(
-#     df_funda,
-#     df_makelaar,
-#     on=["latitude", "longitude"],
-#     how="outer",
-#     suffixes=('_funda', '_makelaar')
-# )
-
-# # Combine key columns, prioritizing funda, then makelaar
-# df_combined['street'] = df_combined['street_funda'].combine_first(df_combined['street_makelaar'])
-# df_combined['number_extension'] = df_combined['number_extension_funda'].combine_first(df_combined['number_extension_makelaar'])
-# df_combined['city'] = df_combined['city_funda'].combine_first(df_combined['city_makelaar'])
-# df_combined['url'] = df_combined['url_funda'].combine_first(df_combined['url_makelaar'])
-# df_combined['price'] = df_combined['asking_price'].combine_first(df_combined['price'])
-# df_combined['m2'] = df_combined['surface_building_attached_outdoor_space_m2'].combine_first(df_combined['area'])
-
-# # Add a source column: funda, makelaar, or both
-# df_combined['source'] = df_combined.apply(
-#     lambda row: 'both' if pd.notna(row.get('url_funda')) and pd.notna(row.get('url_makelaar')) else
-#                 'funda' if pd.notna(row.get('url_funda')) else
-#                 'makelaar' if pd.notna(row.get('url_makelaar')) else
-#                 None,
-#     axis=1
-# )
+# # Funda and makelaar listings are matched with src.combine.match_listings, see combine_funda_makelaars()
+# df_combined = combine_funda_makelaars(df_funda_raw, df_makelaar_raw)
 # # add these to the front of the dataframe and remove the old columns
 # df_combined = df_combined[[
 #     'street', 'number_extension', "url", 'city', 'price', 'm2',
@@ -163,3 +217,6 @@ def retrieve_most_recent_makelaar_file():
 # print("Combined DataFrame saved to 'data/funda_makelaars_combined_{}.csv'".format(today))
 
 # # %%
+
+if __name__ == "__main__":
+    combine_most_recent()
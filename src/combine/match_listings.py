@@ -0,0 +1,281 @@
+# %%
+# src/combine/match_listings.py
+"""
+Entity resolution between Funda and makelaar listings.
+
+Exact lat/lon equality misses most pairs (geocoders round differently) and turns into a
+many-to-many join when several listings share a building's coordinates. Instead:
+
+1. Blocking: candidate pairs only within the same normalized street + house number, the
+   same normalized street, or neighbouring ~150m grid cells. Oversized blocks are skipped,
+   so the number of candidates grows roughly linearly with the number of listings.
+2. Scoring: rapidfuzz similarity on the address, plus house number (with its addition),
+   price, area and distance agreement, combined into one confidence (missing parts are left
+   out). A pair is only matched when the house numbers agree and there is a price or area
+   to compare (or the addresses are identical), so neither a street-only address nor the
+   neighbour upstairs can match on street name and distance alone.
+3. Assignment: greedy one-to-one on confidence, above MIN_CONFIDENCE.
+
+The result is a match table (one row per matched pair, with the partial scores).
+"""
+
+import re
+import logging
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+# Canonical column -> column in the source frame
+FUNDA_COLUMNS = {
+    "url": "url", "street": "street_name", "number": "number", "price": "price", "area": "m2",
+    "lat": "lat", "lon": "lon", "neighborhood": "neighborhood",
+}
+MAKELAAR_COLUMNS = {
+    "url": "url", "street": "street", "number": "number_extension", "price": "price", "area": "area",
+    "lat": "latitude", "lon": "longitude", "neighborhood": "neighborhood",
+}
+
+DEFAULT_BLOCKS = ("street_number", "street", "grid")
+# Blocks with more candidate pairs than this are skipped (e.g. a huge street block)
+MAX_BLOCK_PAIRS = 400
+# Grid cell size in degrees, roughly 150-170m in Amsterdam
+GRID_LAT = 0.0015
+GRID_LON = 0.0025
+MAX_DISTANCE_M = 250
+
+WEIGHTS = {"address": 0.4, "number": 0.2, "price": 0.2, "area": 0.1, "distance": 0.1}
+MIN_CONFIDENCE = 0.75
+# A pair needs a matching house number and a price or area score (or an identical address) to be matched
+REQUIRED_SCORE = "number_score"
+SUPPORTING_SCORES = ("price_score", "area_score")
+
+ORDINALS = {"eerste": "1e", "tweede": "2e", "derde": "3e", "vierde": "4e", "vijfde": "5e"}
+ORDINAL_PATTERN = re.compile(r"\b(" + "|".join(ORDINALS) + r")\b")
+NON_ALNUM_PATTERN = re.compile(r"[^0-9a-z]+")
+HOUSE_NUMBER_PATTERN = re.compile(r"^\s*(\d+)")
+# Makelaar number fields sometimes carry the postcode and city: '17 1<br/>1092 JC AMSTERDAM'
+NUMBER_NOISE_PATTERN = re.compile(r"<br\s*/?>.*|\b\d{4}\s?[a-z]{2}\b.*", re.IGNORECASE)
+ROMAN_ADDITIONS = {"i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5"}
+
+SCORE_COLUMNS = [f"{name}_score" for name in WEIGHTS]
+MATCH_COLUMNS = ["funda_id", "makelaar_id", "funda_url", "makelaar_url", "funda_address", "makelaar_address",
+                 "block"] + SCORE_COLUMNS + ["confidence"]
+
+
+def _normalize_text(value):
+    if not isinstance(value, str):
+        return ""
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii").lower()
+    value = ORDINAL_PATTERN.sub(lambda m: ORDINALS[m.group(1)], value)
+    return NON_ALNUM_PATTERN.sub(" ", value).strip()
+
+
+def normalize_street(series):
+    """
+    'Eerste Jan Steenstraat' / '1e Jan-Steenstraat' -> '1e jan steenstraat'.
+    """
+    return series.map(_normalize_text, na_action="ignore").fillna("")
+
+
+def house_addition(value):
+    """
+    Normalized addition after the house number: '12-2' / '12 II' -> '2', '3 F3' -> 'f3',
+    '99A' -> 'a', '12' -> ''. Postcode and city noise after the number is dropped.
+    """
+    if not isinstance(value, str):
+        return ""
+    value = NUMBER_NOISE_PATTERN.sub("", value)
+    addition = _normalize_text(HOUSE_NUMBER_PATTERN.sub("", value, count=1))
+    return ROMAN_ADDITIONS.get(addition, addition).replace(" ", "")
+
+
+def prepare_side(df, columns):
+    """
+    Canonical frame (url, street_key, house_number, house_addition, address_key, price, area,
+    lat, lon, neighborhood) for one source; the index of `df` is kept as the listing id.
+    """
+    side = pd.DataFrame(index=df.index)
+    for canonical, source in columns.items():
+        side[canonical] = df[source] if source in df.columns else np.nan
+
+    number = side["number"].astype(object).where(side["number"].notna(), "").astype(str)
+    side["street_key"] = normalize_street(side["street"])
+    side["house_number"] = pd.to_numeric(number.str.extract(HOUSE_NUMBER_PATTERN)[0], errors="coerce")
+    side["house_addition"] = number.map(house_addition)
+    side["address_key"] = (side["street_key"] + " " + number.map(_normalize_text)).str.strip()
+    for col in ("price", "area", "lat", "lon"):
+        side[col] = pd.to_numeric(side[col], errors="coerce")
+    return side.drop(columns=["street", "number"])
+
+
+def _block_keys(side, block, expand=False):
+    """
+    Series of blocking keys per listing (index = listing id); rows without a key are dropped.
+    With expand=True a grid key is emitted for the cell and its 8 neighbours.
+    """
+    if block == "street_number":
+        keys = side["street_key"] + "|" + side["house_number"].astype("Int64").astype(str)
+        return keys[(side["street_key"] != "") & side["house_number"].notna()]
+    if block == "street":
+        return side["street_key"][side["street_key"] != ""]
+    if block == "neighborhood":
+        return side["neighborhood"].dropna().astype(str)
+    if block == "grid":
+        located = side[["lat", "lon"]].dropna()
+        row = np.floor(located["lat"] / GRID_LAT).astype(np.int64)
+        col = np.floor(located["lon"] / GRID_LON).astype(np.int64)
+        offsets = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)] if expand else [(0, 0)]
+        return pd.concat([(row + dr).astype(str) + "|" + (col + dc).astype(str) for dr, dc in offsets])
+    raise ValueError(f"Unknown block: {block}")
+
+
+def candidate_pairs(funda, makelaar, blocks=DEFAULT_BLOCKS, max_block_pairs=MAX_BLOCK_PAIRS):
+    """
+    (funda_id, makelaar_id, block) for every pair that shares a blocking key.
+    A pair found by several blocks is kept once, under the first block.
+    """
+    pairs = []
+    for block in blocks:
+        left = _block_keys(funda, block, expand=True).rename("key").rename_axis("funda_id").reset_index()
+        right = _block_keys(makelaar, block).rename("key").rename_axis("makelaar_id").reset_index()
+        if left.empty or right.empty:
+            continue
+
+        sizes = left["key"].value_counts().mul(right["key"].value_counts(), fill_value=0)
+        oversized = sizes.index[sizes > max_block_pairs]
+        if len(oversized):
+            logging.info(f"🧱 Skipping {len(oversized)} '{block}' block(s) with more than {max_block_pairs} pairs")
+            left = left[~left["key"].isin(oversized)]
+
+        merged = left.merge(right, on="key")[["funda_id", "makelaar_id"]]
+        merged["block"] = block
+        pairs.append(merged)
+
+    if not pairs:
+        return pd.DataFrame(columns=["funda_id", "makelaar_id", "block"])
+    return pd.concat(pairs, ignore_index=True).drop_duplicates(subset=["funda_id", "makelaar_id"])
+
+
+def _relative_agreement(a, b):
+    """
+    1 - |a - b| / max(a, b), clipped to [0, 1]; NaN when either side is missing or not positive.
+    """
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = 1 - np.abs(a - b) / np.maximum(a, b)
+    score[(a <= 0) | (b <= 0)] = np.nan
+    return np.clip(score, 0, 1)
+
+
+def score_pairs(pairs, funda, makelaar):
+    """
+    Adds the partial scores and the weighted confidence to the candidate pairs.
+    """
+    f = funda.loc[pairs["funda_id"]].reset_index(drop=True)
+    m = makelaar.loc[pairs["makelaar_id"]].reset_index(drop=True)
+    scored = pairs.reset_index(drop=True)
+
+    scored["address_score"] = process.cpdist(
+        f["address_key"].tolist(), m["address_key"].tolist(), scorer=fuzz.token_sort_ratio, workers=-1
+    ) / 100
+    # Different additions ('3 F7' vs '3 F3') are different homes; a missing addition on one side is not
+    f_addition, m_addition = f["house_addition"], m["house_addition"]
+    same_addition = (f_addition == m_addition) | (f_addition == "") | (m_addition == "")
+    scored["number_score"] = np.where(
+        f["house_number"].notna() & m["house_number"].notna(),
+        ((f["house_number"] == m["house_number"]) & same_addition).astype(float), np.nan,
+    )
+    scored["price_score"] = _relative_agreement(f["price"], m["price"])
+    scored["area_score"] = _relative_agreement(f["area"], m["area"])
+
+    dlat = (f["lat"] - m["lat"]) * 111_320
+    dlon = (f["lon"] - m["lon"]) * 111_320 * np.cos(np.radians(f["lat"]))
+    scored["distance_score"] = np.clip(1 - np.hypot(dlat, dlon) / MAX_DISTANCE_M, 0, 1)
+
+    scores = scored[SCORE_COLUMNS].to_numpy(dtype=float)
+    weights = np.array([WEIGHTS[name] for name in WEIGHTS])
+    present = ~np.isnan(scores)
+    total = (np.nan_to_num(scores) * weights).sum(axis=1)
+    confidence = total / np.where(present.any(axis=1), (present * weights).sum(axis=1), np.nan)
+    supported = scored[list(SUPPORTING_SCORES)].notna().any(axis=1) | (scored["address_score"] == 1)
+    eligible = (scored[REQUIRED_SCORE] == 1) & supported
+    scored["confidence"] = np.where(eligible, confidence, np.nan)
+
+    scored["funda_url"] = f["url"].to_numpy()
+    scored["makelaar_url"] = m["url"].to_numpy()
+    scored["funda_address"] = f["address_key"].to_numpy()
+    scored["makelaar_address"] = m["address_key"].to_numpy()
+    return scored
+
+
+def assign_one_to_one(scored, min_confidence=MIN_CONFIDENCE):
+    """
+    Greedy one-to-one assignment: best pairs first, each listing used at most once.
+    """
+    scored = scored[scored["confidence"] >= min_confidence].sort_values("confidence", ascending=False, kind="stable")
+    used_funda, used_makelaar, keep = set(), set(), []
+    for position, funda_id, makelaar_id in zip(range(len(scored)), scored["funda_id"], scored["makelaar_id"]):
+        if funda_id in used_funda or makelaar_id in used_makelaar:
+            continue
+        used_funda.add(funda_id)
+        used_makelaar.add(makelaar_id)
+        keep.append(position)
+    return scored.iloc[keep]
+
+
+def match_listings(df_funda, df_makelaar, blocks=DEFAULT_BLOCKS, min_confidence=MIN_CONFIDENCE,
+                   funda_columns=FUNDA_COLUMNS, makelaar_columns=MAKELAAR_COLUMNS):
+    """
+    Match table between Funda and makelaar listings.
+
+    Returns:
+        pd.DataFrame: MATCH_COLUMNS; funda_id / makelaar_id are index labels of the inputs
+    """
+    funda = prepare_side(df_funda, funda_columns)
+    makelaar = prepare_side(df_makelaar, makelaar_columns)
+
+    pairs = candidate_pairs(funda, makelaar, blocks)
+    if pairs.empty:
+        return pd.DataFrame(columns=MATCH_COLUMNS)
+
+    matches = assign_one_to_one(score_pairs(pairs, funda, makelaar), min_confidence)
+    logging.info(
+        f"🔗 Matched {len(matches)} listings ({len(df_funda)} funda, {len(df_makelaar)} makelaar, "
+        f"{len(pairs)} candidate pairs)"
+    )
+    return matches[MATCH_COLUMNS].reset_index(drop=True)
+
+
+def unit_test_match_listings():
+    df_funda = pd.DataFrame({
+        "url": ["f1", "f2", "f3", "f4", "f5"],
+        "street_name": ["Eerste Jan Steenstraat", "Damstraat", "Damstraat", "Singel", "Spuistraat"],
+        "number": ["12-2", "1", "11", "5", "3-f7"],
+        "price": [450000, 600000, 350000, 900000, 400000],
+        "m2": [55, 80, 40, 120, 45],
+        "lat": [52.3551, 52.3725, 52.3726, 52.3700, 52.3760],
+        "lon": [4.8920, 4.8950, 4.8951, 4.8890, 4.8900],
+    })
+    df_makelaar = pd.DataFrame({
+        "url": ["m1", "m2", "m3", "m4", "m5", "m6"],
+        "street": ["1e Jan Steenstraat", "Damstraat", "Damstraat", "Prinsengracht", "Spuistraat", "Singel"],
+        # m5 is another apartment in the same building, m6 has no house number at all
+        "number_extension": ["12 II", "11", "1", "300", "3 F3", None],
+        "price": [450000, 350000, 595000, 750000, 400000, np.nan],
+        "area": [56, 40, 80, 95, 45, np.nan],
+        # the same building coordinates for both Damstraat listings
+        "latitude": [52.3552, 52.3725, 52.3725, 52.3650, 52.3760, 52.3700],
+        "longitude": [4.8921, 4.8950, 4.8950, 4.8840, 4.8900, 4.8890],
+    })
+    matches = match_listings(df_funda, df_makelaar)
+    pairs = dict(zip(matches["funda_url"], matches["makelaar_url"]))
+    assert pairs == {"f1": "m1", "f2": "m3", "f3": "m2"}, pairs
+    assert matches["confidence"].between(MIN_CONFIDENCE, 1).all()
+    assert house_addition("17 1<br/>1092 JC AMSTERDAM") == house_addition("17-I") == "1"
+
+
+if __name__ == "__main__":
+    unit_test_match_listings()
+    print("Funda/makelaar matching works on the example listings.")
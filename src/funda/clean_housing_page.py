@@ -208,24 +208,169 @@ def parse_popularity_data(text):
 
     return (popularity_bekeken, popularity_bewaard)
 
-def clean_company_scrape():
+# Precompiled patterns and lookup tables for the vectorized cleaning below.
+# Each vectorized_* function gives the same result as the row-wise parser it is named after.
+DUTCH_TO_ENGLISH_MONTHS = {
+    "januari": "january", "februari": "february", "maart": "march", "april": "april",
+    "mei": "may", "juni": "june", "juli": "july", "augustus": "august",
+    "september": "september", "oktober": "october", "november": "november", "december": "december"
+}
+DUTCH_MONTH_PATTERN = re.compile("|".join(DUTCH_TO_ENGLISH_MONTHS))
+FIRST_NUMBER_PATTERN = re.compile(r'(\d+)')
+AMOUNT_PATTERN = re.compile(r'([\d\.,]+)')
+EURO_AMOUNT_PATTERN = re.compile(r'€\s*([\d\.,]+)')
+AFGEKOCHT_TOT_PATTERN = re.compile(r'afgekocht tot (\d{2}-\d{2}-\d{4})')
+EINDDATUM_ERFPACHT_PATTERN = re.compile(r'einddatum erfpacht:\s*(\d{2}-\d{2}-\d{4})')
+WOONLAAG_FLOOR_PATTERN = re.compile(r'(\d+)e woonlaag')
+WOONLAGEN_COUNT_PATTERN = re.compile(r'(\d+)\s+woonlaag')
+KAMERS_PATTERN = re.compile(r'(\d+)\s+kamer')
+BADKAMERS_PATTERN = re.compile(r'(\d+)\s+badkamer')
+
+# Ownership vocabulary -> eigendom_year code, checked in this order
+EIGENDOM_CODES = [
+    ('volle eigendom', 9999),
+    ('lidmaatschapsrecht', -1),
+]
+
+
+def _lower(series, strip=True):
+    series = series.astype(str).str.lower()
+    return series.str.strip() if strip else series
+
+
+def _extract_number(series, pattern):
+    return pd.to_numeric(series.str.extract(pattern, expand=False), errors='coerce')
+
+
+def _parse_dates_dayfirst(series):
     """
-    Clean the scraped data from Funda company page.
+    Parses date strings with the same rules as pd.to_datetime(val, dayfirst=True),
+    but only once per distinct value (dates repeat a lot across listings).
     """
-    # Load the data
+    lookup = {}
+    for val in series.dropna().unique():
+        try:
+            lookup[val] = pd.to_datetime(val, dayfirst=True, errors='raise')
+        except Exception:
+            lookup[val] = pd.NaT
+    return pd.to_datetime(series.map(lookup))
+
+
+def vectorized_aangeboden_date(series, reference_date=None):
+    if reference_date is None:
+        reference_date = pd.Timestamp.today().normalize()
+
+    val = _lower(series)
+    number = _extract_number(val, FIRST_NUMBER_PATTERN)
+    has_number = number.notna()
+
+    is_today = val.str.contains('vandaag', regex=False)
+    is_six_plus = ~is_today & val.str.contains('6+', regex=False) & val.str.contains('maand', regex=False)
+    done = is_today | is_six_plus
+    is_weeks = ~done & (val.str.contains('week', regex=False) | val.str.contains('weken', regex=False)) & has_number
+    done |= is_weeks
+    is_months = ~done & val.str.contains('maand', regex=False) & has_number
+    done |= is_months
+
+    result = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    result[is_today] = reference_date
+    result[is_six_plus] = reference_date - pd.DateOffset(months=6)
+    result[is_weeks] = reference_date - pd.to_timedelta(number[is_weeks] * 7, unit='D')
+    # Month offsets depend on the calendar, so use a lookup per distinct number of months
+    months = number[is_months].astype(int)
+    result[is_months] = months.map({m: reference_date - pd.DateOffset(months=m) for m in months.unique()})
+
+    exact = val[~done].str.replace(DUTCH_MONTH_PATTERN, lambda m: DUTCH_TO_ENGLISH_MONTHS[m.group(0)], regex=True)
+    result[~done] = _parse_dates_dayfirst(exact)
+    return result
+
+
+def vectorized_servicekosten(series):
+    text = series.astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return _extract_number(text, AMOUNT_PATTERN).where(series.notna())
+
+
+def vectorized_lasten_split(series):
+    """
+    Vectorized parse_lasten_split, returns (price_kadaster, year_kadaster) Series.
+    """
+    text = _lower(series)
+    is_eeuwig = series.notna() & text.str.contains('eeuwigdurend afgekocht', regex=False)
+    is_afgekocht = series.notna() & ~is_eeuwig & text.str.contains('afgekocht tot', regex=False)
+    is_price = series.notna() & ~is_eeuwig & ~is_afgekocht
+
+    afgekocht_year = _parse_dates_dayfirst(text.str.extract(AFGEKOCHT_TOT_PATTERN, expand=False)).dt.year
+    amount = text.str.extract(EURO_AMOUNT_PATTERN, expand=False)
+    amount = pd.to_numeric(amount.str.replace('.', '', regex=False).str.replace(',', '.', regex=False), errors='coerce')
+
+    price = pd.Series(np.nan, index=series.index)
+    price[is_eeuwig | is_afgekocht] = 0.0
+    price[is_price] = amount[is_price]
+
+    year = pd.Series(np.nan, index=series.index)
+    year[is_eeuwig] = 2099
+    year[is_afgekocht] = afgekocht_year[is_afgekocht].fillna(2099)
+    return price, year
+
+
+def vectorized_eigendomssituatie_year(series):
+    text = _lower(series, strip=False)
+    notna = series.notna()
+
+    conditions, choices = [], []
+    for term, code in EIGENDOM_CODES:
+        conditions.append(notna & text.str.contains(term, regex=False))
+        choices.append(code)
+
+    # 'einddatum erfpacht' without a parsable date stays NaN, it does not fall back to 0
+    einddatum_year = _parse_dates_dayfirst(text.str.extract(EINDDATUM_ERFPACHT_PATTERN, expand=False)).dt.year
+    conditions.append(notna & text.str.contains('einddatum erfpacht', regex=False))
+    choices.append(einddatum_year)
+    conditions.append(notna & text.str.contains('erfpacht', regex=False))
+    choices.append(0)
+
+    return pd.Series(np.select(conditions, choices, default=np.nan), index=series.index)
+
+
+def vectorized_woonlaag_to_floor(series):
+    text = _lower(series)
+    floor = _extract_number(text, WOONLAAG_FLOOR_PATTERN)
+    floor[text.str.contains('begane grond', regex=False)] = 0
+    return floor.where(series.notna())
+
+
+def vectorized_woonlagen_count(series):
+    return _extract_number(_lower(series), WOONLAGEN_COUNT_PATTERN).where(series.notna())
 
-    date = pd.Timestamp.now().strftime('%Y-%m-%d')
-    output_path = f"data/funda_data_{date}.csv"
-    input_path = os.path.join('data', f'raw_funda_housing_data_{date}.csv')
-    # output_path = f'data/funda_data_working_2025-06-18.csv'
-    df = pd.read_csv(output_path)
-    # Apply the function to the 'overdracht_aangeboden_sinds' column
-    df['aangeboden_date'] = df['overdracht_aangeboden_sinds'].apply(
-        lambda x: get_aangeboden_date(x, reference_date=pd.Timestamp.today().normalize())
-    )
-    # Clean 'overdracht_servicekosten' to extract the numeric value as float (EUR/month)
-    df['servicekosten_num'] = df['overdracht_servicekosten'].apply(extract_servicekosten)
-    df['servicekosten_num']
+
+def vectorized_kamers_badkamers(series):
+    """
+    Vectorized parse_kamers_badkamers, returns (num_kamers, num_badkamers) Series.
+    """
+    text = _lower(series, strip=False)
+    kamers = _extract_number(text, KAMERS_PATTERN)
+    badkamers = _extract_number(text, BADKAMERS_PATTERN).fillna(0)
+    return kamers.where(series.notna()), badkamers.where(series.notna())
+
+
+def vectorized_popularity_count(series):
+    """
+    Counts such as '1.234x' -> 1234, missing -> 0.
+    """
+    text = series.astype(str).str.replace('.', '', regex=False).str.replace('x', '', regex=False).str.strip()
+    return text.where(series.notna(), '0').astype(int)
+
+
+def clean_funda_frame(df, reference_date=None):
+    """
+    Adds the cleaned columns to a Funda detail frame, using vectorized string operations.
+    """
+    if reference_date is None:
+        reference_date = pd.Timestamp.today().normalize()
+
+    df['aangeboden_date'] = vectorized_aangeboden_date(df['overdracht_aangeboden_sinds'], reference_date)
+    # Numeric value of 'overdracht_servicekosten' as float (EUR/month)
+    df['servicekosten_num'] = vectorized_servicekosten(df['overdracht_servicekosten'])
 
     df['has_berging'] = (
         df['listing_data_externe_bergruimte_m2'].notna()
@@ -236,29 +381,101 @@ def clean_company_scrape():
     df['listing_data_bouwjaar'] = pd.to_numeric(
         df['listing_data_bouwjaar'], errors='coerce'
     ).astype('Int64')  # Use Int64 to allow NaN values
-    df[['kadaster_lasten_price', 'kadaster_lasten_year']] = df['kadaster_lasten'].apply(
-        parse_lasten_split
-    ).apply(pd.Series)
-    df['beschikbaar'] = df['overdracht_status'].apply(lambda x: True if str(x).strip().lower() == 'beschikbaar' else False)
-
-    df['eigendom_year'] = df['kadaster_eigendomssituatie'].apply(parse_eigendomssituatie_year)
-    df['eigendom_year'] = df['eigendom_year'].astype('Int64')  # Use Int64 to allow NaN values
-    df['woonlaag_num'] = df['indeling_verdieping'].apply(parse_woonlaag_to_floor)
-    df[['num_kamers', 'num_badkamers']] = df['indeling_kamers'].apply(parse_kamers_badkamers).apply(pd.Series).astype('Int64')  # Use Int64 to allow NaN values
-    df['woonlagen_num'] = df['indeling_woonlagen'].apply(parse_woonlagen_count).astype('Int64') 
-    df['bekeken'] = df['popularity_bekeken'].apply(
-        lambda x: int(str(x).replace('.', '').replace('x', '').strip()) if pd.notna(x) else 0
-    )
-    df['bewaard'] = df['popularity_bewaard'].apply(
-        lambda x: int(str(x).replace('.', '').replace('x', '').strip()) if pd.notna(x) else 0
-    )
+    df['kadaster_lasten_price'], df['kadaster_lasten_year'] = vectorized_lasten_split(df['kadaster_lasten'])
+    df['beschikbaar'] = _lower(df['overdracht_status']) == 'beschikbaar'
+
+    df['eigendom_year'] = vectorized_eigendomssituatie_year(df['kadaster_eigendomssituatie']).astype('Int64')
+    df['woonlaag_num'] = vectorized_woonlaag_to_floor(df['indeling_verdieping'])
+    num_kamers, num_badkamers = vectorized_kamers_badkamers(df['indeling_kamers'])
+    df['num_kamers'] = num_kamers.astype('Int64')
+    df['num_badkamers'] = num_badkamers.astype('Int64')
+    df['woonlagen_num'] = vectorized_woonlagen_count(df['indeling_woonlagen']).astype('Int64')
+    df['bekeken'] = vectorized_popularity_count(df['popularity_bekeken'])
+    df['bewaard'] = vectorized_popularity_count(df['popularity_bewaard'])
 
     # Calculate the ratio of 'bekeken' to 'bewaard', avoiding division by zero and infinite values
     df['bewaard_bekeken_ratio'] = df['bewaard'] / df['bekeken'].replace({0: np.nan})
+    return df
+
+
+def clean_company_scrape():
+    """
+    Clean the scraped data from Funda company page.
+    """
+    # Load the data
+
+    date = pd.Timestamp.now().strftime('%Y-%m-%d')
+    output_path = f"data/funda_data_{date}.csv"
+    input_path = os.path.join('data', f'raw_funda_housing_data_{date}.csv')
+    # output_path = f'data/funda_data_working_2025-06-18.csv'
+    df = pd.read_csv(output_path)
+    df = clean_funda_frame(df, reference_date=pd.Timestamp.today().normalize())
     df.to_csv(output_path, index=False)
     print(f"Data cleaned and saved to {output_path}")
 
+
+def unit_test_clean_funda_frame(df=None):
+    """
+    Parity check: the vectorized cleaning must give the same columns as the row-wise parsers.
+    Runs on a small sample, or on a real scraped frame when `df` is given.
+    """
+    if df is None:
+        df = pd.DataFrame({
+            'overdracht_aangeboden_sinds': ['Vandaag', '3 weken', '1 week', '6+ maanden', '2 maanden',
+                                            '6 juni 2025', '12 mei 2024', 'onbekend', np.nan],
+            'overdracht_servicekosten': ['€ 150 per maand', '€ 1.234,56 per maand', 'geen', np.nan, '€ 95',
+                                         np.nan, '€ 0', '80', 'x'],
+            'listing_data_externe_bergruimte_m2': [5, np.nan, 3, np.nan, np.nan, 1, np.nan, np.nan, 2],
+            'listing_data_gebouwgebonden_buitenruimte_m2': [np.nan, 4, np.nan, 8, np.nan, np.nan, 2, np.nan, 1],
+            'listing_data_bouwjaar': ['1920', '2001', 'onbekend', np.nan, '1650', '1999', '2020', '1930', '1890'],
+            'kadaster_lasten': ['Eeuwigdurend afgekocht', 'Afgekocht tot 31-12-2050', 'Afgekocht tot',
+                                '€ 1.234,56 per jaar', 'Zie akte', np.nan, '€ 300', 'afgekocht tot 15-01-2036', '€ 0'],
+            'overdracht_status': ['Beschikbaar', 'Onder bod', ' beschikbaar ', np.nan, 'Verkocht onder voorbehoud',
+                                  'Beschikbaar', 'Verkocht', 'Beschikbaar', 'Onder optie'],
+            'kadaster_eigendomssituatie': ['Volle eigendom', 'Erfpacht (einddatum erfpacht: 15-03-2060)',
+                                           'Gemeentelijk eigendom belast met erfpacht', 'Lidmaatschapsrecht',
+                                           'Zie akte', np.nan, 'Einddatum erfpacht: onbekend', 'Volle eigendom',
+                                           'Erfpacht en einddatum erfpacht: 01-01-2045'],
+            'indeling_verdieping': ['Begane grond', '1e woonlaag', '5e woonlaag', np.nan, 'Kelder',
+                                    '3e woonlaag', 'Begane grond', '12e woonlaag', 'Souterrain'],
+            'indeling_kamers': ['3 kamers (2 slaapkamers)', '4 kamers (3 slaapkamers) 2 badkamers', np.nan,
+                                '1 kamer', '2 kamers (1 slaapkamer) 1 badkamer', 'onbekend', '5 kamers',
+                                '6 kamers (4 slaapkamers)', '2 kamers'],
+            'indeling_woonlagen': ['1 woonlaag', '2 woonlagen en een zolder', np.nan, '3 woonlagen', 'geen',
+                                   '1 woonlaag', '4 woonlagen', '1 woonlaag en een kelder', np.nan],
+            'popularity_bekeken': ['1.234x', '56x', np.nan, '0x', '12x', '7.001x', '100x', np.nan, '3x'],
+            'popularity_bewaard': ['12x', '0x', np.nan, '3x', np.nan, '101x', '5x', '2x', '0x'],
+        })
+
+    reference_date = pd.Timestamp.today().normalize()
+    vectorized = clean_funda_frame(df.copy(), reference_date=reference_date)
+
+    expected = {
+        'aangeboden_date': pd.to_datetime(df['overdracht_aangeboden_sinds'].apply(
+            lambda x: get_aangeboden_date(x, reference_date=reference_date))),
+        'servicekosten_num': df['overdracht_servicekosten'].apply(extract_servicekosten),
+        'beschikbaar': df['overdracht_status'].apply(lambda x: str(x).strip().lower() == 'beschikbaar'),
+        'eigendom_year': df['kadaster_eigendomssituatie'].apply(parse_eigendomssituatie_year),
+        'woonlaag_num': df['indeling_verdieping'].apply(parse_woonlaag_to_floor),
+        'woonlagen_num': df['indeling_woonlagen'].apply(parse_woonlagen_count),
+        'bekeken': df['popularity_bekeken'].apply(
+            lambda x: int(str(x).replace('.', '').replace('x', '').strip()) if pd.notna(x) else 0),
+        'bewaard': df['popularity_bewaard'].apply(
+            lambda x: int(str(x).replace('.', '').replace('x', '').strip()) if pd.notna(x) else 0),
+    }
+    expected['kadaster_lasten_price'], expected['kadaster_lasten_year'] = zip(*df['kadaster_lasten'].apply(parse_lasten_split))
+    expected['num_kamers'], expected['num_badkamers'] = zip(*df['indeling_kamers'].apply(parse_kamers_badkamers))
+
+    for col, values in expected.items():
+        left = pd.Series(vectorized[col], index=df.index).astype(object)
+        right = pd.Series(list(values), index=df.index).astype(object)
+        both_missing = left.isna() & right.isna()
+        mismatches = ~both_missing & (left != right)
+        assert not mismatches.any(), f"Column '{col}' differs:\n{pd.DataFrame({'vectorized': left, 'row_wise': right})[mismatches]}"
+
+
 if __name__ == "__main__":
+    unit_test_clean_funda_frame()
+    print("Vectorized cleaning matches the row-wise parsers.")
     clean_company_scrape()
     print("Company data cleaning completed successfully!")
-    
\ No newline at end of file
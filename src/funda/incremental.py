@@ -0,0 +1,140 @@
+# %%
+# src/funda/incremental.py
+"""
+Incremental mode for the Funda detail scrape.
+
+Today's search results are diffed against the listing history in the listing store:
+- new URLs, and URLs whose price/m2 fingerprint changed, get their detail page fetched
+- listings whose last known status was not 'beschikbaar' are fetched again (status moves)
+- details older than REFRESH_AFTER_DAYS are fetched again (popularity counts go stale)
+- everything else carries its enriched (detail) columns forward from the last scrape
+"""
+
+import logging
+
+import pandas as pd
+
+from src.utils import listing_store
+
+# Columns of the search results that make up a listing's fingerprint
+FINGERPRINT_COLUMNS = ["price", "m2"]
+REFRESH_AFTER_DAYS = 7
+DETAIL_DATE_COLUMN = "detail_scrape_date"
+STATUS_COLUMN = "overdracht_status"
+# Prefixes of the columns filled from the detail page (see extract_detail_page)
+DETAIL_PREFIXES = ("indeling_", "kadaster_", "listing_data_", "overdracht_", "surface_", "popularity_", "omschrijving_", "buurt_")
+
+
+def listing_fingerprint(df):
+    """
+    Hash of the fingerprint columns per row; equal when price and m2 did not change.
+    """
+    values = pd.DataFrame({
+        col: pd.to_numeric(df[col], errors="coerce").astype("float64").round(2) if col in df.columns else float("nan")
+        for col in FINGERPRINT_COLUMNS
+    }, index=df.index)
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def load_detail_history(today, refresh_after_days=REFRESH_AFTER_DAYS):
+    """
+    Last stored record per URL from the funda listing store, limited to the refresh window.
+    An unreadable store gives an empty history, so every listing is fetched (full scrape).
+    """
+    start_date = pd.Timestamp(today) - pd.Timedelta(days=refresh_after_days)
+    try:
+        history = listing_store.read_listings("funda", start_date=start_date, end_date=today)
+    except Exception as e:
+        logging.warning(f"⚠️ Could not read the funda listing store, falling back to a full scrape: {e}")
+        return pd.DataFrame()
+    if history.empty or "url" not in history.columns:
+        return pd.DataFrame()
+
+    history = history.sort_values("scrape_date", kind="stable").drop_duplicates(subset="url", keep="last")
+
+    # Partitions from before the incremental mode have no detail date; their rows count
+    # as scraped on the partition date when any detail column is filled
+    detail_columns = [col for col in history.columns if col.startswith(DETAIL_PREFIXES)]
+    has_details = history[detail_columns].notna().any(axis=1)
+    if DETAIL_DATE_COLUMN not in history.columns:
+        history[DETAIL_DATE_COLUMN] = pd.NA
+    history[DETAIL_DATE_COLUMN] = history[DETAIL_DATE_COLUMN].fillna(history["scrape_date"].where(has_details))
+    return history.drop(columns=["scrape_date"]).set_index("url")
+
+
+def plan_incremental_scrape(raw_df, history=None, today=None, refresh_after_days=REFRESH_AFTER_DAYS):
+    """
+    Splits today's search results into listings that need a detail fetch and listings
+    whose details can be carried forward.
+
+    Returns:
+        (to_fetch, carried): `to_fetch` has only the search result columns, `carried`
+        also has the enriched columns of the last scrape. Both keep the index of `raw_df`.
+    """
+    today = pd.Timestamp(today or pd.Timestamp.now()).strftime("%Y-%m-%d")
+    if history is None:
+        history = load_detail_history(today, refresh_after_days)
+    if history.empty:
+        return raw_df, raw_df.iloc[0:0]
+
+    known = raw_df["url"].isin(history.index)
+    previous = history.reindex(raw_df["url"])
+    previous.index = raw_df.index
+
+    unchanged = known & (listing_fingerprint(raw_df) == listing_fingerprint(previous))
+
+    if STATUS_COLUMN in previous.columns:
+        status = previous[STATUS_COLUMN].astype("string").str.strip().str.lower()
+        unchanged &= status.fillna("beschikbaar").eq("beschikbaar")
+
+    detail_age = pd.Timestamp(today) - pd.to_datetime(previous[DETAIL_DATE_COLUMN], errors="coerce")
+    unchanged &= detail_age < pd.Timedelta(days=refresh_after_days)
+
+    enriched_columns = [col for col in history.columns if col not in raw_df.columns]
+    carried = pd.concat([raw_df[unchanged], previous.loc[unchanged, enriched_columns]], axis=1)
+    to_fetch = raw_df[~unchanged]
+
+    logging.info(
+        f"🧮 Incremental scrape: {len(to_fetch)} of {len(raw_df)} listings need details "
+        f"({(~known).sum()} new), {len(carried)} carried forward"
+    )
+    return to_fetch, carried
+
+
+def unit_test_plan_from_store():
+    """
+    Plan against a real multi-day store whose extra columns changed type between days,
+    and fall back to a full scrape when the store cannot be read.
+    """
+    import os
+    import tempfile
+
+    store_dir = listing_store.STORE_DIR
+    listing_store.STORE_DIR = tempfile.mkdtemp()
+    try:
+        listing_store.write_partition(pd.DataFrame({
+            "url": ["a", "b"], "price": [400000, 500000], "m2": [50, 60],
+            "overdracht_status": ["Beschikbaar", "Beschikbaar"], "popularity_bekeken": [120, 80],
+        }), "funda", "2026-10-01")
+        listing_store.write_partition(pd.DataFrame({
+            "url": ["a"], "price": [400000], "m2": [50],
+            "overdracht_status": ["Beschikbaar"], "popularity_bekeken": ["1.234x"],
+        }), "funda", "2026-10-02")
+
+        raw_df = pd.DataFrame({"url": ["a", "b", "c"], "price": [400000, 475000, 300000], "m2": [50, 60, 40]})
+        to_fetch, carried = plan_incremental_scrape(raw_df, today="2026-10-03")
+        assert to_fetch["url"].tolist() == ["b", "c"], to_fetch
+        assert carried["url"].tolist() == ["a"] and carried["popularity_bekeken"].tolist() == ["1.234x"], carried
+
+        # a corrupt partition file must not stop the scrape
+        with open(os.path.join(listing_store.STORE_DIR, "funda", "scrape_date=2026-10-02", "part-1.parquet"), "wb") as f:
+            f.write(b"not parquet")
+        to_fetch, carried = plan_incremental_scrape(raw_df, today="2026-10-03")
+        assert len(to_fetch) == 3 and carried.empty
+    finally:
+        listing_store.STORE_DIR = store_dir
+
+
+if __name__ == "__main__":
+    unit_test_plan_from_store()
+    print("Incremental plan works against a multi-day listing store.")
@@ -4,10 +4,43 @@ import json
 
 from bs4 import BeautifulSoup
 
+# lxml builds the tree several times faster than the pure-python parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
+NUXT_PATTERN = re.compile(r'window\.__NUXT__\s*=\s*({.*});', re.DOTALL)
 
-def extract_indeling_info(html):
-    soup = BeautifulSoup(html, "html.parser")
+
+def parse_html(html):
+    """
+    Parses a detail page once so the result can be shared by all extractors.
+    """
+    return BeautifulSoup(html, HTML_PARSER)
+
+def extract_nuxt_payload(soup):
+    """
+    Decodes the window.__NUXT__ JSON payload from a parsed page.
+    Returns None if the script is missing or cannot be decoded.
+    """
+    script = soup.find('script', string=re.compile(r'window\.__NUXT__'))
+    if not script:
+        return None
+
+    match = NUXT_PATTERN.search(script.string)
+    if not match:
+        return None
+
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
+
+def extract_indeling_info(html, soup=None):
+    soup = soup if soup is not None else parse_html(html)
     indeling_data = {
         "kamers": None,
         "badkamers": None,
@@ -54,25 +87,12 @@ def extract_indeling_info(html):
 
     return indeling_data
 
-def extract_listing_data(html):
-    soup = BeautifulSoup(html, 'html.parser')
-
-    # Step 1: Find the script tag with __NUXT__ or JSON-like data
-    script = soup.find('script', string=re.compile(r'window\.__NUXT__'))
-    if not script:
-        return {}
-
-    # Step 2: Extract JSON from script contents
-    match = re.search(r'window\.__NUXT__\s*=\s*({.*});', script.string, re.DOTALL)
-    if not match:
-        return {}
-
-    nuxt_json_str = match.group(1)
-
-    try:
-        # Evaluate or parse the JS object
-        data = json.loads(nuxt_json_str)
-    except json.JSONDecodeError:
+def extract_listing_data(html, soup=None, nuxt_data=None):
+    # Step 1 + 2: Find the __NUXT__ script and decode its JSON payload
+    if nuxt_data is None:
+        soup = soup if soup is not None else parse_html(html)
+        nuxt_data = extract_nuxt_payload(soup)
+    if nuxt_data is None:
         return {}
 
     # Step 3: Traverse through the nested JSON to pull relevant fields
@@ -124,8 +144,8 @@ def extract_surface_areas(text):
 
     return data
 
-def extract_energy_label(html):
-    soup = BeautifulSoup(html, 'html.parser')
+def extract_energy_label(html, soup=None):
+    soup = soup if soup is not None else parse_html(html)
     
     # Find the dt with "Energielabel"
     label_dt = soup.find('dt', string="Energielabel")
@@ -138,8 +158,8 @@ def extract_energy_label(html):
                 return span.get_text(strip=True)
     return None
 
-def extract_popularity_data(html):
-    soup = BeautifulSoup(html, 'html.parser')
+def extract_popularity_data(html, soup=None):
+    soup = soup if soup is not None else parse_html(html)
     data = {}
 
     # Locate the popularity section
@@ -188,8 +208,8 @@ def extract_kadastrale_info_from_flat_html(raw_text):
         # 
     }
 
-def extract_omschrijving(html):
-    soup = BeautifulSoup(html, 'html.parser')
+def extract_omschrijving(html, soup=None):
+    soup = soup if soup is not None else parse_html(html)
     data = {}
 
     # Find the heading or section that contains "Omschrijving"
@@ -212,8 +232,8 @@ def extract_omschrijving(html):
 
     return None
 
-def extract_neighborhood_block(html):
-    soup = BeautifulSoup(html, 'html.parser')
+def extract_neighborhood_block(html, soup=None):
+    soup = soup if soup is not None else parse_html(html)
     result = {}
 
     # --- Fallback: extract from top header if primary not found ---
@@ -224,3 +244,35 @@ def extract_neighborhood_block(html):
             result['neighborhood_fallback_url'] = fallback_link.get('href')
 
     return result if result else None
+
+def extract_detail_page(html):
+    """
+    Runs every extractor over one detail page. The HTML is parsed once and the
+    __NUXT__ payload decoded once; both are shared by the extractors.
+    Returns the flattened record as stored in funda_data_<date>.csv.
+    """
+    soup = parse_html(html)
+    nuxt_data = extract_nuxt_payload(soup)
+
+    extracted = {
+        "indeling": extract_indeling_info(html, soup=soup),
+        "kadaster": extract_kadastrale_info_from_flat_html(html),
+        "listing_data": extract_listing_data(html, soup=soup, nuxt_data=nuxt_data),
+        "overdracht": extract_overdracht_from_json_block(html),
+        "surface": extract_surface_areas(html),
+        "popularity": extract_popularity_data(html, soup=soup),
+        "omschrijving": extract_omschrijving(html, soup=soup),
+        "buurt": extract_neighborhood_block(html, soup=soup),
+    }
+
+    # Combine all extracted data
+    flat_data = {}
+    for key, value in extracted.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat_data[f"{key}_{sub_key}"] = sub_value
+        else:
+            flat_data[key] = value
+
+    flat_data["energy_label"] = extract_energy_label(html, soup=soup)
+    return flat_data
@@ -0,0 +1,101 @@
+# %%
+# src/funda/listing_journal.py
+"""
+Append-only checkpoint journal for the Funda detail scrape.
+
+Every successfully scraped listing is written as one JSON line, so a crash
+only loses the listing that was in flight. On restart the journal is replayed
+to find which URLs are already done, and the final frame is built once at the end.
+"""
+
+import os
+import json
+import logging
+
+import pandas as pd
+
+
+def journal_path_for(output_path):
+    """
+    Returns the journal path belonging to an output CSV (funda_data_<date>.csv -> funda_data_<date>.jsonl).
+    """
+    return os.path.splitext(output_path)[0] + ".jsonl"
+
+
+class ListingJournal:
+    """
+    Append-only JSON-lines journal keyed by listing URL.
+    The last record for a URL wins when the journal is replayed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self._handle = None
+
+    def replay(self):
+        """
+        Loads all records from disk. A partially written last line (crash while writing) is skipped.
+        Returns the dict of url -> record.
+        """
+        self.records = {}
+        if not os.path.exists(self.path):
+            return self.records
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"⚠️ Skipping corrupt journal line {line_number} in {self.path}")
+                    continue
+                self.records[record["url"]] = record["data"]
+
+        logging.info(f"🔁 Replayed {len(self.records)} listings from {self.path}")
+        return self.records
+
+    def append(self, url, data):
+        """
+        Writes one listing to the journal and flushes it to disk.
+        """
+        if self._handle is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+
+        self._handle.write(json.dumps({"url": url, "data": data}, ensure_ascii=False, default=str) + "\n")
+        self._handle.flush()
+        self.records[url] = data
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __contains__(self, url):
+        return url in self.records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def apply_to(self, df, url_column="url"):
+        """
+        Builds the enriched frame in one pass: one column per extracted field,
+        joined onto `df` by URL. Rows without a journal record keep NaN.
+        """
+        if not self.records:
+            return df.copy()
+
+        records_df = pd.DataFrame.from_dict(self.records, orient="index")
+        overlapping = [c for c in records_df.columns if c in df.columns]
+
+        merged = df.merge(records_df, left_on=url_column, right_index=True, how="left", suffixes=("", "_journal"))
+        # Journal values win over the input, as they did with df.at[idx, col] = val
+        for col in overlapping:
+            merged[col] = merged[f"{col}_journal"].combine_first(merged[col])
+        return merged.drop(columns=[f"{col}_journal" for col in overlapping])
@@ -5,35 +5,41 @@ This module contains functions to scrape HTML content from a given URL.
 
 """
 
-import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 import logging
 
+from src.utils.get_url import get_html
+from src.utils import html_cache
+from src.utils.browser_pool import get_browser_pool
+
 def _get_html(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
-    response = requests.get(url, headers=headers, verify=False)
-    if response.status_code == 200:
-        return response.text
-    else:
-        print(f"Failed to retrieve page with status code: {response.status_code}")
-        return None
+    html = get_html(url)
+    if html is None:
+        print(f"Failed to retrieve page: {url}")
+    return html
     
 def _get_html_without_cookie(url, service=None, options=None):
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.get(url)
-    html = driver.page_source
-    driver.quit()
-    return html
+    return get_browser_pool(service=service, options=options).get_page_source(url)
+
+def _is_valid_html(html):
+    """
+    False for missing pages and Funda's captcha / bot check pages.
+    """
+    return bool(html) and "<title>Je bent bijna op de pagina die je zoekt" not in html and "captcha" not in html.lower()
+
 def get_valid_html_versions(url, service=None, options=None):
 
     html_req = _get_html(url)
-    if html_req and "<title>Je bent bijna op de pagina die je zoekt" not in html_req and "captcha" not in html_req.lower():
+    if _is_valid_html(html_req):
         return html_req
+    # never serve a captcha page from the cache on the next run
+    html_cache.invalidate(url)
     try: 
         pre_cookie_html = _get_html_without_cookie(url, service=service, options=options)
+        # Selenium can land on the captcha page as well, only real pages are cached
+        if _is_valid_html(pre_cookie_html):
+            html_cache.store(url, pre_cookie_html)
         return pre_cookie_html
     except Exception as e:
         logging.error(f"❌ Selenium failed to fetch page {url}: {e}")
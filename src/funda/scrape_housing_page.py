@@ -24,25 +24,27 @@ from selenium.webdriver.chrome.options import Options
 from src.funda.clean_housing_page import clean_company_scrape
 
 from src.funda.information_extracter import (
-    extract_indeling_info,
-    extract_kadastrale_info_from_flat_html,
-    extract_listing_data,
-    extract_energy_label,
-    extract_overdracht_from_json_block,
-    extract_surface_areas,
-    extract_popularity_data,
-    extract_omschrijving,
-    extract_neighborhood_block,
+    extract_detail_page,
     extract_company_information
 )
 
 from src.funda.page_scraper import get_valid_html_versions
+from src.funda.listing_journal import ListingJournal, journal_path_for
+from src.funda.incremental import plan_incremental_scrape, DETAIL_DATE_COLUMN
+from src.utils import listing_store
+from src.utils.listing_history import record_scrape
+from src.utils.neighborhood_stats import refresh_neighborhood_stats
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 
-def extract_all(local = False):
+def extract_all(local = False, incremental = True):
+    """
+    Fetches the detail page of every listing in today's search results.
+    With `incremental`, only new or changed listings are fetched and the details
+    of the others are carried forward from the listing history.
+    """
     today = pd.Timestamp.now().strftime('%Y-%m-%d')
 
     input_path = os.path.join(os.getcwd(), 'data', "funda", "raw", f'raw_funda_main_data_{today}.csv')
@@ -70,63 +72,46 @@ def extract_all(local = False):
     # sort based on idx in df_working
     df_working = df_working.reset_index(drop=True)
 
-    df_final = pd.DataFrame()
-
-    for idx, row in df_working.iterrows():
-        if idx % 10 == 0:
-            logging.info(f"Processing row {idx}/{len(df_working)}")
-        url = row['url']
-
-
-        for attempt in range(3):
-            try:
-                html = get_valid_html_versions(url, service=service, options=options)
-                indeling_info = extract_indeling_info(html)
-                kadaster_info = extract_kadastrale_info_from_flat_html(html)
-                listing_data = extract_listing_data(html)
-                energy_label = extract_energy_label(html)
-                overdracht_info = extract_overdracht_from_json_block(html)
-                surface_info = extract_surface_areas(html)
-                popularity_data = extract_popularity_data(html)
-                omschrijving = extract_omschrijving(html)
-                buurt_info = extract_neighborhood_block(html)
-
-                # Combine all extracted data
-                flat_data = {}
-                for key, value in {
-                    "indeling": indeling_info,
-                    "kadaster": kadaster_info,
-                    "listing_data": listing_data,
-                    "overdracht": overdracht_info,
-                    "surface": surface_info,
-                    "popularity": popularity_data,
-                    "omschrijving": omschrijving,
-                    "buurt": buurt_info
-                }.items():
-                    if isinstance(value, dict):
-                        for sub_key, sub_value in value.items():
-                            flat_data[f"{key}_{sub_key}"] = sub_value
-                    else:
-                        flat_data[key] = value
-
-                flat_data["energy_label"] = energy_label
-                for col, val in flat_data.items():
-                    df_working.at[idx, col] = val
-
-                df_final = pd.concat([df_final, df_working.iloc[[idx]]], ignore_index=True)
-                df_final.drop_duplicates(subset=['url'], keep='last', inplace=True)
-                df_final.to_csv(output_path, index=False, sep=';')
-                break  # Break out of retry loop after success
-
-            except Exception as e:
-                logging.warning(f"⚠️ Error on attempt {attempt + 1} for {url}: {e}")
-                if attempt == 2:
-                    logging.error(f"⛔ Max retries reached for {url}. Skipping.")
-                continue
-        
+    carried = df_working.iloc[0:0]
+    if incremental:
+        df_working, carried = plan_incremental_scrape(df_working, today=today)
 
+    # Replay the journal of an earlier (crashed) run of today, so finished listings are skipped
+    journal = ListingJournal(journal_path_for(output_path))
+    journal.replay()
+
+    with journal:
+        for idx, row in df_working.iterrows():
+            if idx % 10 == 0:
+                logging.info(f"Processing row {idx}/{len(df_working)}")
+            url = row['url']
+
+            if url in journal:
+                continue
 
+            for attempt in range(3):
+                try:
+                    html = get_valid_html_versions(url, service=service, options=options)
+                    flat_data = extract_detail_page(html)
+                    journal.append(url, flat_data)
+                    break  # Break out of retry loop after success
+
+                except Exception as e:
+                    logging.warning(f"⚠️ Error on attempt {attempt + 1} for {url}: {e}")
+                    if attempt == 2:
+                        logging.error(f"⛔ Max retries reached for {url}. Skipping.")
+                    continue
+
+    # Build the final frame once from the journal, plus the listings carried forward (in search order)
+    df_working = journal.apply_to(df_working.reset_index()).set_index("index")
+    fetched = df_working['url'].isin(journal.records.keys())
+    df_working[DETAIL_DATE_COLUMN] = pd.Series(today, index=df_working.index).where(fetched)
+    df_working = pd.concat([df_working, carried]).sort_index()
+    df_working.index.name = None
     df_working.to_csv(output_path, index=False)
+    listing_store.write_partition(df_working, "funda", today)
+    record_scrape(df_working, "funda", today)
+    refresh_neighborhood_stats("funda", today)
     logging.info(f"🔄 Saved output to {output_path}")
 
 
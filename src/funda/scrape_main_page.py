@@ -1,5 +1,4 @@
 # %%
-import requests
 from bs4 import BeautifulSoup
 import json
 import pandas as pd
@@ -10,23 +9,28 @@ import urllib3
 import warnings
 import logging
 
+from src.utils.get_url import get_html as _fetch_html
+from src.utils import html_cache
+from src.utils.browser_pool import get_browser_pool
+from src.utils import listing_store
+from src.utils.neighborhood_index import assign_neighborhoods
+from src.utils.gazetteer import get_gazetteer, STREET
+from src.utils.geocode_cache import get_geocode_cache
+from src.utils.pagination import crawl_pages
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-pages = np.arange(1, 100)  # Adjust range for more pages if needed
+pages = np.arange(1, 100)  # Upper bound, scrape_main stops at the last real page
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 MICROSOFT_DRIVER = r"C:\Users\bgriffioen\OneDrive - STX Commodities B.V\Desktop\funda-project\funda-tool\src\utils\msedgedriver.exe"
 
 def get_html(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
-    response = requests.get(url, headers=headers, verify=False)
-    if response.status_code == 200:
+    html = _fetch_html(url)
+    if html is not None:
         logging.info(f"Successfully retrieved page: {url}")
-        return response.text
     else:
-        print(f"Failed to retrieve page with status code: {response.status_code}")
-        return None
+        print(f"Failed to retrieve page: {url}")
+    return html
 
 def get_valid_html_versions(page_number, service=None, options=None):
 
@@ -49,6 +53,9 @@ def get_valid_html_versions(page_number, service=None, options=None):
         else:
             logging.warning("⚠️ HTML from requests is valid but JSON-LD not found.")
 
+    # never serve a captcha page or a page without JSON-LD from the cache on the next run
+    html_cache.invalidate(url)
+
     # Fallback to Selenium if needed
     try:
         pre_cookie_html = get_html_without_cookie(url=url, service=service, options=options)
@@ -57,6 +64,7 @@ def get_valid_html_versions(page_number, service=None, options=None):
             json_ld = soup.find('script', {'type': 'application/ld+json'})
             if json_ld:
                 logging.info("✅ Using HTML from Selenium (pre-cookie).")
+                html_cache.store(url, pre_cookie_html)
                 return pre_cookie_html, soup, json_ld
     except Exception as e:
         logging.error(f"❌ Selenium failed to fetch page {page_number}: {e}")
@@ -100,6 +108,9 @@ def get_page_information(page_number, service=None, options=None):
     
     data = json.loads(json_ld.text)
     items = data['itemListElement']
+    if not items:
+        logging.info(f"No listings on page {page_number}, past the last page.")
+        return pd.DataFrame()
 
     # Find all elements containing "k.k." (price)
     price_elements = soup.find_all(string=lambda text: "k.k." in text)
@@ -224,17 +235,37 @@ def get_lat_long_information(df):
 
     geolocator = Nominatim(user_agent="streamlit-geocoder")
     geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
+    gazetteer = get_gazetteer()
+    cache = get_geocode_cache()
 
     latitudes = []
     longitudes = []
 
-    for address in df['full_address']:
+    for street_name, number, address in zip(df['street_name'], df['number'], df['full_address']):
+        # Answer from the shared cache and the local gazetteer first, only true misses go to Nominatim
+        cached = cache.get(address)
+        if cached is not None:
+            latitudes.append(cached[0])
+            longitudes.append(cached[1])
+            continue
+
+        hit = gazetteer.lookup(street_name, number)
+        if hit:
+            # Street averages are only an answer for addresses without a number, don't keep them
+            if hit[2] != STREET:
+                cache.put(address, hit[0], hit[1], source=f"gazetteer_{hit[2]}")
+            latitudes.append(hit[0])
+            longitudes.append(hit[1])
+            continue
+
         print(f"Geocoding address: {address}")
         location = geocode(address)
         if location:
+            cache.put(address, location.latitude, location.longitude, source="nominatim")
             latitudes.append(location.latitude)
             longitudes.append(location.longitude)
         else:
+            cache.put(address, None, None, source="nominatim")
             latitudes.append(None)
             longitudes.append(None)
 
@@ -243,35 +274,14 @@ def get_lat_long_information(df):
     return df
 
 def add_neighborhood_info(df):
-    import json
-    import geopandas as gpd
-    from shapely.geometry import Point, shape
-
-    with open("data/neighborhoods_amsterdam.json", "r") as f:
-        geojson_data = json.load(f)
-
-    # Convert to GeoDataFrame
-    # Convert GeoJSON to GeoDataFrame
-    neighborhoods_gdf = gpd.GeoDataFrame.from_features(geojson_data["features"])
-    neighborhoods_gdf.set_crs(epsg=4326, inplace=True)
-
-    # Create geometry column in df
-    df['geometry'] = df.apply(lambda row: Point(row['lon'], row['lat']), axis=1)
-    df_gdf = gpd.GeoDataFrame(df, geometry='geometry', crs='EPSG:4326')
-
-    # Spatial join to assign neighborhood
-    df_gdf = gpd.sjoin(df_gdf, neighborhoods_gdf[['geometry', 'neighborhood']], how='left', predicate='within')
-
-    # If you want to keep as DataFrame
-    df = pd.DataFrame(df_gdf.drop(columns=['geometry', 'index_right']))
-
-    # df neighborhood if emtpy print: 
-    # df  for neighbordhoods that were not found add a new column with value "Unknown"
-    if 'neighborhood' not in df.columns:
-        df['neighborhood'] = 'Unknown'
-    else:
-        df['neighborhood'].fillna('Unknown', inplace=True)
-
+    """
+    Adds a 'neighborhood' column based on lat/lon, using the prebuilt neighborhood index.
+    Points outside all neighborhoods (or without coordinates) get 'Unknown'.
+    """
+    df['neighborhood'] = assign_neighborhoods(
+        pd.to_numeric(df['lat'], errors='coerce').to_numpy(),
+        pd.to_numeric(df['lon'], errors='coerce').to_numpy(),
+    )
     return df
 
 from selenium import webdriver
@@ -288,25 +298,19 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 def get_html_without_cookie(url, service=None, options=None, local=False):
-
+    # Browsers are kept alive in a pool, so this costs a page load instead of a browser launch
     if local ==True:
-        driver = webdriver.Edge(executable_path=MICROSOFT_DRIVER, options=options)
-        # make sure it is pageless 
-        
+        pool = get_browser_pool(options=options, local=True, executable_path=MICROSOFT_DRIVER)
     else:
-        driver = webdriver.Chrome(service=service, options=options)
+        pool = get_browser_pool(service=service, options=options)
 
-    driver.get(url)
-    html = driver.page_source
-    driver.quit()
-    return html
+    return pool.get_page_source(url)
 
 
 import os
 from datetime import timedelta
-import glob
 
-def scrape_main(local = False):
+def scrape_main(local = False, prefetch = False):
     if local == True:
         from selenium.webdriver.edge.options import Options as EdgeOptions
         from selenium.webdriver.edge.service import Service as EdgeService
@@ -331,20 +335,23 @@ def scrape_main(local = False):
 
     # Retrieve all CSV files in the directory and append, dropping duplicates
 
+    # Only the geo columns are needed, so read just those from the listing store
     data_dir = "data/funda"
-    all_files = glob.glob(os.path.join(data_dir, "funda_data_*.csv"))
-    if all_files:
-        df_list = [pd.read_csv(f) for f in all_files]
-        existing_df = pd.concat(df_list, ignore_index=True)
+    if not listing_store.list_partitions("funda"):
+        listing_store.import_csv_history("funda", os.path.join(data_dir, "funda_data_*.csv"))
+
+    existing_df = listing_store.read_listings("funda", columns=['street_name', 'number', 'lat', 'lon'])
+    if not existing_df.empty:
+        existing_df['number'] = existing_df['number'].astype(str)
         existing_df.drop_duplicates(subset=['street_name', 'number'], inplace=True)
-        yesterday_path = all_files[-1]  # Use the latest file for logging
+        yesterday_path = f"listing store (funda, last scrape {listing_store.list_partitions('funda')[-1]})"
     else:
         existing_df = pd.DataFrame()
         yesterday_path = None
 
     logging.info(f"Using existing data from {yesterday_path} if available.")
     logging.info(f"Output will be saved to {output_path}")
-    logging.info(f"Total pages to scrape: {len(pages)}")
+    logging.info(f"Scraping up to {len(pages)} pages, stopping at the last page with new listings")
 
     logging.info(f"Checking for existing data at {yesterday_path}...")
     if not existing_df.empty:
@@ -360,33 +367,39 @@ def scrape_main(local = False):
         df = pd.read_csv(output_path)
     else:
         print(f"File {output_path} does not exist. Starting fresh scrape.")
-        df = pd.DataFrame()  # <-- move this up before retry loop
-
-        for page in pages:
-            success = False  # track success for this page
+        def fetch_page(page):
             for attempt in range(max_retries):
                 try:
                     print(f"Processing page {page}, attempt {attempt + 1}...")
                     page_df = get_page_information(page, service=service, options=options)
-
-                    if page_df is not None and not page_df.empty:
-                        logging.info(f"✅ Page {page} processed with {len(page_df)} records.")
-                        df = pd.concat([df, page_df], ignore_index=True)
-                        success = True
-                        break  # ✅ Successful, break retry loop
-                    else:
-                        logging.warning(f"⚠️ Page {page} returned no data on attempt {attempt + 1}.")
+                    if page_df is not None:
+                        # an empty page is a valid answer (past the last page), no need to retry it
+                        return page_df
+                    logging.warning(f"⚠️ Page {page} returned no data on attempt {attempt + 1}.")
                 except Exception as e:
                     logging.error(f"❌ Error processing page {page} on attempt {attempt + 1}: {e}")
-
-            if not success:
-                logging.error(f"⛔ Page {page} failed after {max_retries} attempts.")
-                if page > 40:
-                    logging.error(f"🛑 Stopping page loop because page {page} > 40 failed.")
-                    break
-                else:
-                    logging.warning(f"➡️ Continuing despite failure on page {page} (page ≤ 40).")
-
+            logging.error(f"⛔ Page {page} failed after {max_retries} attempts.")
+            return None
+
+        def stop_on_failure(page):
+            if page > 40:
+                logging.error(f"🛑 Stopping page loop because page {page} > 40 failed.")
+                return True
+            logging.warning(f"➡️ Continuing despite failure on page {page} (page ≤ 40).")
+            return False
+
+        # Stops at the first page without listings or with only listings seen on earlier pages
+        page_dfs = []
+        for page, page_df in crawl_pages(
+            pages,
+            fetch_page,
+            keys_of=lambda page_df: page_df['url'],
+            prefetch=prefetch,
+            stop_on_failure=stop_on_failure,
+        ):
+            logging.info(f"✅ Page {page} processed with {len(page_df)} records.")
+            page_dfs.append(page_df)
+        df = pd.concat(page_dfs, ignore_index=True) if page_dfs else pd.DataFrame()
 
         df.drop_duplicates(subset=['street_name', 'number'], inplace=True)
         df.reset_index(drop=True, inplace=True)
@@ -1,58 +1,27 @@
 
 from bs4 import BeautifulSoup
 
+from src.makelaar.selector_spec import (
+    ListingSpec, Field, OBJECT_ADDRESS_FIELDS, address_joined, default, plain_price, extract_listings,
+)
+
 def extract_rijp_data(html: str):
-    soup = BeautifulSoup(html, "html.parser")
-    listings = []
-
-    cards = soup.select("div.object.object-fade")
-
-    for card in cards:
-        try:
-            # Address parts
-            street = card.select_one("span.object-street")
-            house_number = card.select_one("span.object-housenumber")
-            addition = card.select_one("span.object-housenumber-addition")
-            city = card.select_one("span.object-place")
-
-            full_adres = " ".join(filter(None, [
-                street.text.strip() if street else "",
-                house_number.text.strip() if house_number else "",
-                addition.text.strip() if addition else ""
-            ])).strip()
-
-            city_name = city.text.strip() if city else "Onbekend"
-
-            # URL
-            url_tag = card.select_one("a[href]")
-            url = url_tag["href"] if url_tag else None
-
-            # Availability (e.g. "Verkocht", "Beschikbaar", etc.)
-            status_elem = card.select_one("div.object-status")
-            available = status_elem.text.strip() if status_elem else "Onbekend"
-
-            # Price (may include value and price type like 'k.k.')
-            price_elem = card.select_one("span.object-price-value")
-            price = price_elem.text.strip() if price_elem else None
-            # convert € 400.000 into float
-            if price:
-                price = price.replace('€', '').replace('.', '').replace(',', '.').strip()
-                try:
-                    price = float(price)
-                except ValueError:
-                    price = None
-
-            listings.append({
-                "full_adres": full_adres,
-                "url": url,
-                "city": city_name,
-                "price": price,
-                "available": available
-            })
-        except Exception as e:
-            print(f"Skipping a listing due to error: {e}")
-
-    return listings
+    return extract_listings(html, SPEC)
+
+
+SPEC = ListingSpec(
+    card="div.object.object-fade",
+    fields={
+        **OBJECT_ADDRESS_FIELDS,
+        "city": Field("span.object-place", process=default("Onbekend")),
+        "url": Field("a[href]", attr="href"),
+        # Status text as shown (e.g. "Verkocht", "Beschikbaar")
+        "available": Field("div.object-status", process=default("Onbekend")),
+        "price": Field("span.object-price-value", process=plain_price),
+    },
+    derived={"full_adres": address_joined},
+    output=["full_adres", "url", "city", "price", "available"],
+)
 
 def extract_house_hallie(html: str) -> dict:
     soup = BeautifulSoup(html, "html.parser")
@@ -1,84 +1,41 @@
 # %%
-from bs4 import BeautifulSoup
-import re
+from src.makelaar.selector_spec import (
+    ListingSpec, Field, LISTING_OUTPUT, absolute_url, euro_price, first_match, status_from_text,
+    extract_listings,
+)
 
 def extract_smitenheinen_data(html: str):
-    soup = BeautifulSoup(html, "html.parser")
-    listings = []
-    base_url = "https://www.smitenheinen.nl"
-
-    for obj in soup.select("article"):
-        try:
-            # Street + number
-            street_tag = obj.select_one("h4.custom-address-text a")
-            street = street_tag.get_text(strip=True) if street_tag else None
-
-            # City
-            city_tag = obj.select_one("span.custom-postcode-text")
-            city_text = city_tag.get_text(strip=True) if city_tag else None
-            city = None
-            if city_text and re.search(r"\d{4}\s?[A-Z]{2}\s+(.+)", city_text):
-                city = re.search(r"\d{4}\s?[A-Z]{2}\s+(.+)", city_text).group(1).strip()
-
-            full_adres = f"{street} in {city}" if street and city else None
-
-            # URL
-            url_tag = obj.select_one("a[href]")
-            url = url_tag["href"] if url_tag else None
-            if url and not url.startswith("http"):
-                url = base_url + url
-
-            # Price
-            price = None
-            price_tag = obj.select_one("div.price")
-            if price_tag:
-                price_match = re.search(r"€\s?([\d\.,]+)", price_tag.text)
-                if price_match:
-                    price_str = price_match.group(1).replace(".", "").replace(",", ".")
-                    try:
-                        price = float(price_str)
-                    except:
-                        pass
-
-            # Area (e.g. 55 m²)
-            area = None
-            area_tag = obj.find("img", alt=re.compile(r"\d+\s?m²", re.IGNORECASE))
-            if area_tag and area_tag.has_attr("alt"):
-                area_match = re.search(r"(\d+)\s?m²", area_tag["alt"])
-                if area_match:
-                    area = int(area_match.group(1))
-
-            # Number of rooms (usually number right after "slaapkamers")
-            num_rooms = None
-            room_tag = obj.find("img", alt=re.compile(r"\d+\s+slaapkamers", re.IGNORECASE))
-            if room_tag and room_tag.has_attr("alt"):
-                room_match = re.search(r"(\d+)\s+slaapkamers", room_tag["alt"])
-                if room_match:
-                    num_rooms = int(room_match.group(1))
-
-            # Status (default: Beschikbaar)
-            available = "Beschikbaar"
-            status_tag = obj.select_one("span.status")
-            if status_tag:
-                status_text = status_tag.text.lower()
-                if "verkocht" in status_text:
-                    available = "Verkocht"
-                elif "onder bod" in status_text:
-                    available = "Onder bod"
-
-            listings.append({
-                "full_adres": full_adres,
-                "url": url,
-                "city": city,
-                "price": price,
-                "area": area,
-                "num_rooms": num_rooms,
-                "available": available
-            })
-        except Exception:
-            continue
-
-    return listings
+    return extract_listings(html, SPEC)
+
+
+BASE_URL = "https://www.smitenheinen.nl"
+
+
+def _street_in_city(values):
+    return f"{values['street']} in {values['city']}" if values["street"] and values["city"] else None
+
+
+SPEC = ListingSpec(
+    card="article",
+    fields={
+        "street": Field("h4.custom-address-text a", separator=""),
+        # City after the postcode, e.g. '1012 JS Amsterdam'
+        "city": Field("span.custom-postcode-text", separator="",
+                      process=first_match(r"\d{4}\s?[A-Z]{2}\s+(.+)", convert=str.strip)),
+        "url": Field("a[href]", attr="href", process=absolute_url(BASE_URL)),
+        "price": Field("div.price", process=euro_price),
+        # Area and bedrooms are only in the alt texts of the feature icons
+        "area": Field('img[alt*="m²"]', attr="alt", many=True, process=first_match(r"(\d+)\s?m²", convert=int)),
+        "num_rooms": Field('img[alt*="slaapkamers"]', attr="alt", many=True,
+                           process=first_match(r"(\d+)\s+slaapkamers", convert=int)),
+        "available": Field("span.status", process=status_from_text([
+            ("verkocht", "Verkocht"),
+            ("onder bod", "Onder bod"),
+        ])),
+    },
+    derived={"full_adres": _street_in_city},
+    output=LISTING_OUTPUT,
+)
 
 if __name__ == "__main__":
     from src.utils.get_url import get_html
@@ -87,4 +44,3 @@ if __name__ == "__main__":
     listings = extract_smitenheinen_data(html)
     for listing in listings:
         print(listing)
-        
\ No newline at end of file
@@ -1,109 +1,96 @@
 # %%
-import os
-import re
+import logging
 import pandas as pd
-import pickle
 from geopy.geocoders import Nominatim
 from geopy.extra.rate_limiter import RateLimiter
 
-def save_cache_to_disk(cache_dict, pickle_path, csv_path):
-    # Save as pickle
-    with open(pickle_path, "wb") as f:
-        pickle.dump(cache_dict, f)
-    
-    # Save as CSV
-    df = pd.DataFrame([
-        {"full_address_processed": addr, "latitude": lat, "longitude": lon}
-        for addr, (lat, lon) in cache_dict.items()
-        if lat is not None and lon is not None
-    ])
-    df.to_csv(csv_path, index=False)
-
+from src.utils.gazetteer import get_gazetteer, STREET
+from src.utils.geocode_cache import get_geocode_cache
+from src.utils import listing_store
 
-def geocode_addresses_with_history(results_df: pd.DataFrame, cache_path="data/geo_information/geo_cache.pkl", history_dir="data/makelaar", temp_save_path="data/geo_information/geocoding_progress.csv") -> pd.DataFrame:
+def geocode_addresses_with_history(results_df: pd.DataFrame, cache=None, temp_save_path="data/geo_information/geocoding_progress.csv") -> pd.DataFrame:
+    """
+    Adds 'latitude' and 'longitude' for every 'full_address_processed'.
+    Lookups go to the shared geocode cache first, then the local gazetteer, and only then to Nominatim.
+    Every result (also addresses Nominatim could not find) is upserted into the cache right away.
+    """
     # Initialize geocoder
     geolocator = Nominatim(user_agent="funda_scraper")
     geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
 
-    # Load geo_cache if exists
-    if os.path.exists(cache_path):
-        with open(cache_path, "rb") as f:
-            geo_cache = pickle.load(f)
-    else:
-        geo_cache = {}
-
-    # Step 1: Load all historical files
-    historical_coords = pd.DataFrame()
-    for fname in os.listdir(history_dir):
-        if re.match(r"makelaar_scrape_output_\d{4}-\d{2}-\d{2}\.csv", fname):
-            try:
-                path = os.path.join(history_dir, fname)
-                df_hist = pd.read_csv(path)
-                required_cols = {'full_address_processed', 'latitude', 'longitude'}
-                if required_cols.issubset(df_hist.columns):
-                    historical_coords = pd.concat([historical_coords, df_hist[list(required_cols)]], ignore_index=True)
-            except Exception as e:
-                print(f"Could not read {fname}: {e}")
+    cache = cache or get_geocode_cache()
+
+    # Step 1 + 2: Make sure all historical makelaar coordinates are in the cache;
+    # an unreadable store means continuing with an empty history
+    try:
+        historical_coords = listing_store.read_listings("makelaar", columns=['full_address_processed', 'latitude', 'longitude'])
+    except Exception as e:
+        logging.warning(f"⚠️ Could not read the makelaar listing store, continuing without history: {e}")
+        historical_coords = pd.DataFrame(columns=['full_address_processed', 'latitude', 'longitude'])
+    cache.import_frame(historical_coords, 'full_address_processed', 'latitude', 'longitude', source="makelaar_history")
+
+    # Step 3: Geocode function using cache, then the local gazetteer, then Nominatim
+    gazetteer = get_gazetteer()
+    address_parts = {}
+    if {'street', 'number_extension'}.issubset(results_df.columns):
+        address_parts = dict(zip(
+            results_df["full_address_processed"].astype(str),
+            zip(results_df["street"], results_df["number_extension"])
+        ))
 
-    # Step 2: Add historical coords to cache
-    for _, row in historical_coords.dropna().iterrows():
-        addr = row['full_address_processed']
-        if addr not in geo_cache:
-            geo_cache[addr] = (row['latitude'], row['longitude'])
-
-    # Step 3: Geocode function using cache
     def get_lat_lon(address):
-        if not isinstance(address, str) or address.strip() == "":
-            return pd.Series([None, None])
-        if address in geo_cache:
-            return pd.Series(geo_cache[address])
+        if address in address_parts:
+            hit = gazetteer.lookup(*address_parts[address])
+        else:
+            hit = gazetteer.lookup_address(address)
+        if hit:
+            # Street averages are only an answer for addresses without a number, don't keep them
+            if hit[2] != STREET:
+                cache.put(address, hit[0], hit[1], source=f"gazetteer_{hit[2]}")
+            return (hit[0], hit[1])
+
         try:
             location = geocode(address)
             if location:
-                lat_lon = (location.latitude, location.longitude)
-                geo_cache[address] = lat_lon
-                return pd.Series(lat_lon)
+                cache.put(address, location.latitude, location.longitude, source="nominatim")
+                return (location.latitude, location.longitude)
         except Exception as e:
             print(f"Error geocoding '{address}': {e}")
-        geo_cache[address] = (None, None)
-        return pd.Series([None, None])
+            return (None, None)  # do not store transient errors as negative results
+        cache.put(address, None, None, source="nominatim")
+        return (None, None)
 
     # Step 4: Get missing addresses
     results_df["full_address_processed"] = results_df["full_address_processed"].astype(str)
-    missing_addresses = results_df[
-        results_df["full_address_processed"].notna() &
-        ~results_df["full_address_processed"].isin(geo_cache)
-    ]["full_address_processed"].drop_duplicates().tolist()
+    unique_addresses = [a for a in results_df["full_address_processed"].drop_duplicates() if a.strip()]
+
+    coords = {}
+    missing_addresses = []
+    for address in unique_addresses:
+        cached = cache.get(address)
+        if cached is None:
+            missing_addresses.append(address)
+        else:
+            coords[address] = cached
 
     print(f"Geocoding {len(missing_addresses)} new addresses...")
 
-    # Step 5: Incrementally geocode and save
+    # Step 5: Incrementally geocode; each result is already persisted by the cache
     latlon_records = []
     for idx, address in enumerate(missing_addresses, 1):
         lat, lon = get_lat_lon(address)
+        coords[address] = (lat, lon)
         latlon_records.append((address, lat, lon))
 
         if idx % 50 == 0 or idx == len(missing_addresses):
-            print(f"Processed {idx}/{len(missing_addresses)} addresses. Saving progress...")
-
-            # Save intermediate geocoded addresses
-            latlon_df = pd.DataFrame(latlon_records, columns=['full_address_processed', 'latitude', 'longitude'])
-            latlon_df.to_csv(temp_save_path, index=False)
-
-            # Save cache to both pickle and CSV
-            save_cache_to_disk(geo_cache, cache_path, "data/geo_information/geo_cache.csv")
+            print(f"Processed {idx}/{len(missing_addresses)} addresses.")
+            pd.DataFrame(latlon_records, columns=['full_address_processed', 'latitude', 'longitude']).to_csv(temp_save_path, index=False)
 
+    # Final merge of all coordinates
+    address_series = results_df["full_address_processed"]
+    results_df['latitude'] = address_series.map(lambda a: coords.get(a, (None, None))[0])
+    results_df['longitude'] = address_series.map(lambda a: coords.get(a, (None, None))[1])
 
-    # Final merge of newly geocoded addresses
-    latlon_df = pd.DataFrame(latlon_records, columns=['full_address_processed', 'latitude', 'longitude'])
-    results_df = results_df.merge(latlon_df, on="full_address_processed", how="left")
-
-    # Fill any remaining from the cache (those already geocoded)
-    results_df[['latitude', 'longitude']] = results_df.apply(
-        lambda row: pd.Series(geo_cache.get(row['full_address_processed'], (row.get('latitude'), row.get('longitude')))),
-        axis=1
-    )
-    
     return results_df
 
 if __name__ == "__main__":
@@ -14,11 +14,12 @@ Output:
 
 """
 import os
-import ast
-import re
 import pandas as pd
 import numpy as np
-import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 from typing import Optional
 from datetime import date
 
@@ -26,11 +27,17 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 from src.utils.get_url import get_html
+from src.makelaar.scraper_registry import get_scraper_registry
+from src.utils.pagination import crawl_pages
+
+# A makelaar's crawl only ends on failures after this many failed pages in a row
+MAX_CONSECUTIVE_FAILED_PAGES = 3
 
 def extract_scraper_metadata(directory: str, exclude: str = "scrape_makelaar_main_page.py") -> pd.DataFrame:
     """
-    Extracts metadata (function name, URL, URL format) from all scraper scripts in a directory,
-    excluding a specific file.
+    Returns the metadata (function name, URL, URL format) of all scraper scripts in a directory,
+    excluding a specific file. Served from the persistent scraper registry, which only
+    re-parses files that changed since the last run.
 
     Parameters:
         directory (str): Path to the directory containing Python scraper files.
@@ -39,56 +46,125 @@ def extract_scraper_metadata(directory: str, exclude: str = "scrape_makelaar_mai
     Returns:
         pd.DataFrame: Table with filename, function name, URL, and URL format.
     """
-    results = []
+    return get_scraper_registry(directory, exclude=exclude).to_frame()
 
-    for filename in os.listdir(directory):
-        if filename.endswith(".py") and filename != exclude:
-            path = os.path.join(directory, filename)
-            with open(path, "r", encoding="utf-8") as f:
-                source = f.read()
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
 
-            # Default values
-            function_name = None
-            url = None
-            url_format = None
+def _get_host_semaphore(url: str, per_host_limit: int) -> threading.BoundedSemaphore:
+    """
+    Returns the shared semaphore for the host of `url`, creating it on first use.
+    """
+    host = urlparse(url).netloc.lower()
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(per_host_limit)
+        return _host_semaphores[host]
 
-            # Extract function name
-            try:
-                tree = ast.parse(source)
-                for node in tree.body:
-                    if isinstance(node, ast.FunctionDef):
-                        function_name = node.name
-                        break
-            except Exception:
-                function_name = None
-
-            # Extract __main__ block
-            main_match = re.search(r'if\s+__name__\s*==\s*[\'"]__main__[\'"]\s*:(.*)', source, re.DOTALL)
-            if main_match:
-                main_block = main_match.group(1)
-
-                url_match = re.search(r'url\s*=\s*[\'"]([^\'"]+)[\'"]', main_block)
-                url_format_match = re.search(r'url_format\s*=\s*[\'"]([^\'"]+)[\'"]', main_block)
-
-                if url_match:
-                    url = url_match.group(1)
-                if url_format_match:
-                    url_format = url_format_match.group(1)
-
-            results.append({
-                "python_name": filename,
-                "function_name": function_name,
-                "url": url,
-                "url_format": url_format
-            })
-
-    return pd.DataFrame(results)
+def get_html_rate_limited(url: str, per_host_limit: int = 2, min_delay: float = 0.0) -> Optional[str]:
+    """
+    Fetches a page through `get_html` while holding the per-host semaphore, so no host
+    sees more than `per_host_limit` requests in flight at the same time.
+    """
+    with _get_host_semaphore(url, per_host_limit):
+        html = get_html(url)
+        if min_delay:
+            time.sleep(min_delay)
+    return html
+
+def _listing_key(data: dict):
+    """
+    Identity of a scraped listing, used to notice pages that only repeat earlier listings.
+    """
+    return data.get("url") or data.get("full_adres") or repr(sorted(data.items(), key=lambda kv: kv[0]))
+
+def scrape_single_makelaar(row: pd.Series, per_host_limit: int = 2, min_delay: float = 0.0, prefetch: bool = False) -> list:
+    """
+    Imports the scraper module of one makelaar and runs it over the URLs in its `url_list`.
+    Pagination stops at the first page without new listings, so `url_list` is only an upper bound.
+
+    Parameters:
+        row (pd.Series): Row with 'python_name', 'function_name' and 'url_list'
+        per_host_limit (int): Maximum concurrent requests towards one host
+        min_delay (float): Seconds to wait after each request while holding the host slot
+        prefetch (bool): Fetch the next page while the current one is parsed
+
+    Returns:
+        list: Result rows (dicts) for this makelaar
+    """
+    func_name = row["function_name"]
+    url_list = row["url_list"]
+
+    # Imported once per process through the registry
+    try:
+        scraper_func = get_scraper_registry().load_function(row["python_name"])
+    except Exception as e:
+        print(f"❌ Failed to import {row['python_name']}: {e}")
+        return []
+
+    if not callable(scraper_func):
+        print(f"⚠️ Function {func_name} not found or not callable")
+        return []
+
+    consecutive_failures = 0
+
+    def scrape_page(url):
+        nonlocal consecutive_failures
+        try:
+            html = get_html_rate_limited(url, per_host_limit=per_host_limit, min_delay=min_delay)
+            data_list = scraper_func(html)
+        except Exception as e:
+            print(f"⚠️ Error scraping {url}: {e}")
+            data_list = None
+        else:
+            if not isinstance(data_list, list):
+                print(f"⚠️ Function did not return list for {url}")
+                data_list = None
+
+        consecutive_failures = consecutive_failures + 1 if data_list is None else 0
+        return data_list
+
+    def stop_on_failure(url):
+        # A single timeout must not drop all later pages of this makelaar
+        if consecutive_failures >= MAX_CONSECUTIVE_FAILED_PAGES:
+            print(f"🛑 Stopping {func_name} after {consecutive_failures} failed pages in a row (last: {url})")
+            return True
+        return False
+
+    # 'skip' formats start at offset 0, which usually repeats the start page
+    is_skip_format = isinstance(row.get("url_format"), str) and "skip" in row["url_format"]
+
+    makelaar_results = []
+
+    pages = crawl_pages(
+        url_list,
+        scrape_page,
+        keys_of=lambda data_list: map(_listing_key, data_list),
+        prefetch=prefetch,
+        max_stale_pages=2 if is_skip_format else 1,
+        stop_on_failure=stop_on_failure,
+    )
+    for url, data_list in pages:
+        for data in data_list:
+            result_row = {
+                "python_file": row["python_name"],
+                "url": url
+            }
+            result_row.update(data)
+            makelaar_results.append(result_row)
+
+    return makelaar_results
 
 def process_makelaars(
     df: pd.DataFrame,
     output_csv: str = None,
     num_pages: int = 5,
-    row_limit: Optional[int] = 20
+    row_limit: Optional[int] = 20,
+    concurrent: bool = True,
+    max_workers: int = 16,
+    per_host_limit: int = 2,
+    min_delay: float = 0.0,
+    prefetch: bool = False
 ) -> pd.DataFrame:
     """
     Run makelaar scraper functions and store results in a single daily file.
@@ -96,8 +172,13 @@ def process_makelaars(
     Parameters:
         df (pd.DataFrame): Must include 'python_name', 'function_name', 'url', 'url_format'
         output_csv (str): File path for the combined daily output CSV (default auto-generated by date)
-        num_pages (int): Pagination depth
+        num_pages (int): Maximum pagination depth; scraping a makelaar stops at its last page with new listings
         row_limit (Optional[int]): Limit number of scrapers to run
+        concurrent (bool): Run the makelaars in a thread pool instead of one after another
+        max_workers (int): Number of makelaars scraped at the same time when `concurrent` is set
+        per_host_limit (int): Maximum concurrent requests towards a single host
+        min_delay (float): Seconds to wait after each request while holding the host slot
+        prefetch (bool): Fetch the next page of a makelaar while the current one is parsed
 
     Returns:
         pd.DataFrame: Final combined results
@@ -114,6 +195,7 @@ def process_makelaars(
     # Step 1: Prepare df and generate URL lists
     df = df[df["url"].notna()].copy()
 
+    # Upper bound of pages per makelaar, pagination stops earlier at the last real page
     def generate_url_list(row):
         urls = []
         if pd.notna(row['url']):
@@ -141,60 +223,43 @@ def process_makelaars(
     if row_limit:
         df = df.head(row_limit)
 
-    combined_results = []
     # sort idx in df
     df = df.sort_index()
 
+    to_scrape = []
     for idx, row in df.iterrows():
-        if idx % 10 == 0:
-            logging.info(f"Processing row {idx + 1}/{len(df)}: {row['python_name']}")        
         if row['python_name'] in already_scraped:
             print(f"⏭ Skipping {row['python_name']} (already scraped today)")
             continue
+        to_scrape.append(row)
+
+    # Results are stored per makelaar and combined in the original order,
+    # so the output file is the same whether or not we run concurrently.
+    results_per_makelaar = [[] for _ in to_scrape]
+
+    if concurrent and len(to_scrape) > 1:
+        logging.info(f"Scraping {len(to_scrape)} makelaars with {max_workers} workers (max {per_host_limit} per host)")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(scrape_single_makelaar, row, per_host_limit, min_delay, prefetch): i
+                for i, row in enumerate(to_scrape)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results_per_makelaar[i] = future.result()
+                except Exception as e:
+                    print(f"⚠️ Error scraping {to_scrape[i]['python_name']}: {e}")
+                if done % 10 == 0:
+                    logging.info(f"Finished {done}/{len(to_scrape)} makelaars")
+    else:
+        for i, row in enumerate(to_scrape):
+            if i % 10 == 0:
+                logging.info(f"Processing row {i + 1}/{len(to_scrape)}: {row['python_name']}")
+            results_per_makelaar[i] = scrape_single_makelaar(row, per_host_limit, min_delay, prefetch)
 
-        # print(f"🔍 Scraping {row['python_name']}...")
-
-        module_path = os.path.join("src", "makelaar", "breakdown", row["python_name"])
-        func_name = row["function_name"]
-        url_list = row["url_list"]
-
-        # Dynamic import
-        spec = importlib.util.spec_from_file_location(func_name, module_path)
-        module = importlib.util.module_from_spec(spec)
-        try:
-            spec.loader.exec_module(module)
-        except Exception as e:
-            print(f"❌ Failed to import {row['python_name']}: {e}")
-            continue
-
-        scraper_func = getattr(module, func_name, None)
-        if not callable(scraper_func):
-            print(f"⚠️ Function {func_name} not found or not callable")
-            continue
-
-        makelaar_results = []
-
-    
-        for idx, url in enumerate(url_list):
-            try:
-                html = get_html(url)
-                data_list = scraper_func(html)
-
-                if not isinstance(data_list, list):
-                    print(f"⚠️ Function did not return list for {url}")
-                    continue
-
-                for data in data_list:
-                    result_row = {
-                        "python_file": row["python_name"],
-                        "url": url
-                    }
-                    result_row.update(data)
-                    makelaar_results.append(result_row)
-
-            except Exception as e:
-                print(f"⚠️ Error scraping {url}: {e}")
-
+    combined_results = []
+    for makelaar_results in results_per_makelaar:
         if makelaar_results:
             combined_results.extend(makelaar_results)
 
@@ -17,6 +17,9 @@ from src.utils.get_url import get_html
 from src.makelaar.scrape_makelaar import run_makelaar_scraper
 from src.makelaar.clean_makelaar import prepare_address_fields
 from src.makelaar.geocode_addresses import geocode_addresses_with_history
+from src.utils import listing_store
+from src.utils.listing_history import record_scrape
+from src.utils.neighborhood_stats import refresh_neighborhood_stats
 
 def scrape_makelaar_main_page() -> pd.DataFrame:
     # results_df = run_makelaar_scraper()
@@ -29,6 +32,9 @@ def scrape_makelaar_main_page() -> pd.DataFrame:
     results_df = geocode_addresses_with_history(results_df)
 
     results_df.to_csv("data/makelaar/makelaar_results_" + today + ".csv", index=False)
+    listing_store.write_partition(results_df, "makelaar", today)
+    record_scrape(results_df, "makelaar", today)
+    refresh_neighborhood_stats("makelaar", today)
 
 if __name__ == "__main__":
     scrape_makelaar_main_page()
\ No newline at end of file
@@ -0,0 +1,203 @@
+# %%
+# src/makelaar/scraper_registry.py
+"""
+Persistent registry of the broker scrapers in src/makelaar/breakdown.
+
+The manifest (data/cache/scraper_registry.json) stores per file the scraper function,
+the start url and url_format of its __main__ block, plus the file's mtime, size and hash.
+On refresh only files whose mtime/size changed are read again, and only files whose hash
+changed are parsed again, so startup does not parse 100+ files on every run.
+
+Scraper modules are imported once per process and kept in sys.modules.
+
+Query the manifest without running any scraper:
+    python -m src.makelaar.scraper_registry
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import hashlib
+import logging
+import threading
+import importlib.util
+
+import pandas as pd
+
+from src.utils.config import DATA_DIR
+
+BREAKDOWN_DIR = os.path.join("src", "makelaar", "breakdown")
+REGISTRY_PATH = os.path.join(DATA_DIR, "cache", "scraper_registry.json")
+MODULE_PREFIX = "src.makelaar.breakdown"
+DEFAULT_EXCLUDE = "scrape_makelaar_main_page.py"
+
+MAIN_BLOCK_PATTERN = re.compile(r'if\s+__name__\s*==\s*[\'"]__main__[\'"]\s*:(.*)', re.DOTALL)
+URL_PATTERN = re.compile(r'url\s*=\s*[\'"]([^\'"]+)[\'"]')
+URL_FORMAT_PATTERN = re.compile(r'url_format\s*=\s*[\'"]([^\'"]+)[\'"]')
+
+METADATA_COLUMNS = ["python_name", "function_name", "url", "url_format"]
+
+
+def parse_scraper_source(source: str) -> dict:
+    """
+    Function name (first top-level def), url and url_format (from the __main__ block) of a scraper.
+    """
+    function_name = None
+    url = None
+    url_format = None
+
+    try:
+        tree = ast.parse(source)
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef):
+                function_name = node.name
+                break
+    except Exception:
+        function_name = None
+
+    main_match = MAIN_BLOCK_PATTERN.search(source)
+    if main_match:
+        main_block = main_match.group(1)
+        url_match = URL_PATTERN.search(main_block)
+        url_format_match = URL_FORMAT_PATTERN.search(main_block)
+        if url_match:
+            url = url_match.group(1)
+        if url_format_match:
+            url_format = url_format_match.group(1)
+
+    return {"function_name": function_name, "url": url, "url_format": url_format}
+
+
+class ScraperRegistry:
+    def __init__(self, directory=BREAKDOWN_DIR, path=REGISTRY_PATH, exclude=DEFAULT_EXCLUDE):
+        self.directory = directory
+        self.path = path
+        self.exclude = exclude
+        self.entries = {}
+        self._import_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("directory") == os.path.abspath(self.directory):
+                self.entries = manifest["scrapers"]
+        except Exception as e:
+            logging.warning(f"⚠️ Could not read scraper registry, rebuilding: {e}")
+            self.entries = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"directory": os.path.abspath(self.directory), "scrapers": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self) -> int:
+        """
+        Brings the manifest in line with the directory. Returns the number of (re)parsed files.
+        """
+        seen = set()
+        parsed = 0
+        changed = False
+
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not name.endswith(".py") or name == self.exclude or not entry.is_file():
+                continue
+            seen.add(name)
+            stat = entry.stat()
+            known = self.entries.get(name)
+            if known and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+                continue
+
+            with open(entry.path, "rb") as f:
+                content = f.read()
+            sha256 = hashlib.sha256(content).hexdigest()
+
+            if not known or known["sha256"] != sha256:
+                self.entries[name] = {"python_name": name, **parse_scraper_source(content.decode("utf-8"))}
+                parsed += 1
+            self.entries[name].update(mtime=stat.st_mtime, size=stat.st_size, sha256=sha256)
+            changed = True
+
+        for name in set(self.entries) - seen:
+            del self.entries[name]
+            changed = True
+
+        if changed:
+            self.save()
+        if parsed:
+            logging.info(f"🗂️ Scraper registry: parsed {parsed} changed file(s), {len(self.entries)} scrapers in total")
+        return parsed
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [{col: entry.get(col) for col in METADATA_COLUMNS} for _, entry in sorted(self.entries.items())]
+        return pd.DataFrame(rows, columns=METADATA_COLUMNS)
+
+    def get(self, python_name: str) -> dict:
+        return self.entries.get(python_name)
+
+    def load_module(self, python_name: str):
+        """
+        Imports a scraper module once and keeps it in sys.modules; a changed file is imported again.
+        """
+        entry = self.entries[python_name]
+        module_name = f"{MODULE_PREFIX}.{os.path.splitext(python_name)[0]}"
+        with self._import_lock:
+            module = sys.modules.get(module_name)
+            if module is not None and getattr(module, "__scraper_sha256__", None) == entry["sha256"]:
+                return module
+
+            spec = importlib.util.spec_from_file_location(module_name, os.path.join(self.directory, python_name))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except Exception:
+                sys.modules.pop(module_name, None)
+                raise
+            module.__scraper_sha256__ = entry["sha256"]
+            return module
+
+    def load_function(self, python_name: str):
+        """
+        Returns the scraper function of `python_name`, or None when it is not defined or not callable.
+        """
+        entry = self.entries.get(python_name)
+        if entry is None or entry["function_name"] is None:
+            return None
+        func = getattr(self.load_module(python_name), entry["function_name"], None)
+        return func if callable(func) else None
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_scraper_registry(directory=BREAKDOWN_DIR, exclude=DEFAULT_EXCLUDE) -> ScraperRegistry:
+    """
+    Returns the process-wide registry for `directory`, refreshed on first use.
+    """
+    key = (os.path.abspath(directory), exclude)
+    with _registries_lock:
+        if key not in _registries:
+            path = REGISTRY_PATH if key[0] == os.path.abspath(BREAKDOWN_DIR) else os.path.join(
+                DATA_DIR, "cache", f"scraper_registry_{hashlib.sha256(key[0].encode()).hexdigest()[:12]}.json"
+            )
+            registry = ScraperRegistry(directory, path=path, exclude=exclude)
+            registry.refresh()
+            _registries[key] = registry
+        return _registries[key]
+
+
+if __name__ == "__main__":
+    df = get_scraper_registry().to_frame()
+    pd.set_option("display.max_rows", None, "display.width", 200, "display.max_colwidth", 80)
+    print(df)
+    print(f"\n{len(df)} scrapers, {df['url'].notna().sum()} with a start url, {df['url_format'].notna().sum()} with pagination")
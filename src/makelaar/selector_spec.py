@@ -0,0 +1,321 @@
+# %%
+# src/makelaar/selector_spec.py
+"""
+Declarative selector specs for broker listing pages.
+
+Most scrapers in src/makelaar/breakdown are the same card loop with different CSS
+selectors and cleaning rules. A ListingSpec describes only those differences:
+
+    ListingSpec(
+        card="div.object",
+        fields={
+            "street": Field("span.object-street"),
+            "url": Field("a[href]", attr="href", process=absolute_url(BASE_URL)),
+            "price": Field("div.object-price", many=True, process=euro_price),
+            "available": Field(attr="class", process=status_from_classes([("verkocht", "Verkocht")])),
+        },
+        derived={"full_adres": address_in_city},
+        output=["full_adres", "url", "city", "price", "available"],
+    )
+
+compile_spec() turns a spec into a CompiledSpec: selectors are compiled once (soupsieve),
+each page is parsed once with the fastest available parser, and extract_many() runs
+over a batch of pages.
+"""
+
+import re
+import logging
+
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+EURO_PATTERN = re.compile(r"€\s?([\d\.,]+)")
+AREA_PATTERN = re.compile(r"(\d+)\s*m")
+ROOMS_PATTERN = re.compile(r"(\d+)\s+kamer")
+
+
+class Field:
+    """
+    One value taken from a card.
+
+    Parameters:
+        selector (str | list): CSS selector relative to the card; a list is tried in order
+                               until one matches. None means the card element itself.
+        attr (str): Attribute to read instead of the stripped text (e.g. 'href', 'class')
+        many (bool): Pass the values of all matching elements (document order) as a list
+        process (callable): Post-processor, called with the value (None when nothing matched)
+        separator (str): Join the stripped text pieces with this string, like get_text(separator, strip=True)
+    """
+
+    def __init__(self, selector=None, attr=None, many=False, process=None, separator=None):
+        self.selectors = [selector] if isinstance(selector, str) or selector is None else list(selector)
+        self.attr = attr
+        self.many = many
+        self.process = process
+        self.separator = separator
+
+
+class ListingSpec:
+    """
+    Card selector plus fields for one broker.
+
+    Parameters:
+        card (str): CSS selector of a listing card
+        fields (dict): name -> Field
+        derived (dict): name -> function(values) computed from the extracted fields
+        output (list): Keys of the result dicts, in order
+    """
+
+    def __init__(self, card, fields, derived=None, output=None):
+        self.card = card
+        self.fields = fields
+        self.derived = derived or {}
+        self.output = output or list(fields) + list(self.derived)
+
+
+class CompiledSpec:
+    """
+    A ListingSpec with precompiled selectors; extract() parses a page once and walks its cards.
+    """
+
+    def __init__(self, spec, parser=HTML_PARSER):
+        self.spec = spec
+        self.parser = parser
+        self._card = sv.compile(spec.card)
+        self._fields = [
+            (name, [sv.compile(s) if s is not None else None for s in field.selectors], field)
+            for name, field in spec.fields.items()
+        ]
+
+    @staticmethod
+    def _value(element, field):
+        if field.attr is not None:
+            return element.get(field.attr)
+        if field.separator is not None:
+            return element.get_text(field.separator, strip=True)
+        return element.get_text().strip()
+
+    def _extract_field(self, card, selectors, field):
+        if field.many:
+            for selector in selectors:
+                elements = [card] if selector is None else selector.select(card)
+                if elements:
+                    return [self._value(e, field) for e in elements]
+            return []
+
+        for selector in selectors:
+            element = card if selector is None else selector.select_one(card)
+            if element is not None:
+                return self._value(element, field)
+        return None
+
+    def extract_card(self, card):
+        values = {}
+        for name, selectors, field in self._fields:
+            value = self._extract_field(card, selectors, field)
+            values[name] = field.process(value) if field.process else value
+        for name, func in self.spec.derived.items():
+            values[name] = func(values)
+        return {key: values.get(key) for key in self.spec.output}
+
+    def extract(self, html):
+        """
+        Returns one dict per card; cards that fail to parse are skipped.
+        """
+        soup = BeautifulSoup(html, self.parser)
+        listings = []
+        for card in self._card.select(soup):
+            try:
+                listings.append(self.extract_card(card))
+            except Exception as e:
+                logging.debug(f"Skipping a listing due to error: {e}")
+        return listings
+
+    def extract_many(self, htmls):
+        """
+        Extracts a batch of pages (None entries, e.g. failed downloads, are skipped).
+        """
+        listings = []
+        for html in htmls:
+            if html:
+                listings.extend(self.extract(html))
+        return listings
+
+
+_compiled = {}
+
+
+def compile_spec(spec):
+    """
+    Returns the CompiledSpec for `spec`, compiling it only once per process.
+    """
+    if id(spec) not in _compiled:
+        _compiled[id(spec)] = CompiledSpec(spec)
+    return _compiled[id(spec)]
+
+
+def extract_listings(html, spec):
+    return compile_spec(spec).extract(html)
+
+
+# --- Post-processors -------------------------------------------------------
+
+def _parse_euro_amount(text, pattern=EURO_PATTERN):
+    match = pattern.search(text or "")
+    if match:
+        try:
+            return float(match.group(1).replace(".", "").replace(",", "."))
+        except ValueError:
+            return None
+    return None
+
+
+def euro_price(value):
+    """
+    '€ 450.000 k.k.' -> 450000.0; with many=True the first parsable value wins.
+    """
+    if isinstance(value, list):
+        for text in value:
+            price = _parse_euro_amount(text)
+            if price is not None:
+                return price
+        return None
+    return _parse_euro_amount(value)
+
+
+def euro_price_matching(pattern):
+    """
+    euro_price with another amount pattern, e.g. r"€\s*([\d\.,]+)" for any spacing after the sign.
+    """
+    pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+
+    def process(value):
+        for text in value if isinstance(value, list) else [value]:
+            price = _parse_euro_amount(text, pattern)
+            if price is not None:
+                return price
+        return None
+    return process
+
+
+def plain_price(value):
+    """
+    Price without a currency pattern: strips '€' and thousands dots, e.g. '€ 400.000' -> 400000.0.
+    """
+    if not value:
+        return None
+    try:
+        return float(value.replace('€', '').replace('.', '').replace(',', '.').strip())
+    except ValueError:
+        return None
+
+
+def first_match(pattern, convert=None, lower=False):
+    """
+    Post-processor returning the first group of `pattern` in the text, or None; with many=True
+    the first value that matches wins. `convert` is applied to the match (e.g. int, str.strip).
+
+    With Field(separator=" ") (no selector) this is a regex over the whole card text.
+    """
+    pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+
+    def process(value):
+        for text in value if isinstance(value, list) else [value]:
+            if text is None:
+                continue
+            match = pattern.search(text.lower() if lower else text)
+            if match:
+                return convert(match.group(1)) if convert else match.group(1)
+        return None
+    return process
+
+
+def first_int(pattern, lower=False):
+    """
+    Post-processor returning the first group of `pattern` as int, or None.
+    """
+    return first_match(pattern, convert=int, lower=lower)
+
+
+area_m2 = first_int(AREA_PATTERN)
+num_rooms = first_int(ROOMS_PATTERN)
+
+
+def absolute_url(base_url):
+    def process(value):
+        if value and not value.startswith("http"):
+            return base_url + value
+        return value
+    return process
+
+
+def default(fallback):
+    def process(value):
+        return value if value is not None else fallback
+    return process
+
+
+def status_from_text(rules, fallback="Beschikbaar"):
+    """
+    Availability from a status text. `rules` is a list of (needles, label), checked in order
+    against the lowercased text; needles is a string or a tuple of alternatives.
+    """
+    def process(value):
+        text = (value or "").lower()
+        for needles, label in rules:
+            needles = (needles,) if isinstance(needles, str) else needles
+            if any(needle in text for needle in needles):
+                return label
+        return fallback
+    return process
+
+
+def status_from_classes(rules, fallback="Beschikbaar", lower=False):
+    """
+    Availability from the card's css classes (e.g. 'object status-verkocht'), use with attr='class'.
+    """
+    def process(value):
+        classes = [cls.lower() for cls in value or []] if lower else value or []
+        for needles, label in rules:
+            needles = (needles,) if isinstance(needles, str) else needles
+            if any(needle in cls for cls in classes for needle in needles):
+                return label
+        return fallback
+    return process
+
+
+# --- Derived fields ----------------------------------------------------------
+
+def address_in_city(values):
+    """
+    'Street Number [Addition] in City'; None when street, number or city is missing.
+    """
+    street_str = None
+    if values.get("street") is not None and values.get("number") is not None:
+        street_str = f"{values['street']} {values['number']}"
+    if values.get("addition") is not None:
+        street_str += f" {values['addition']}"
+    return f"{street_str} in {values['city']}" if street_str and values.get("city") is not None else None
+
+
+def address_joined(values):
+    """
+    'Street Number Addition' from the parts that are present.
+    """
+    return " ".join(filter(None, [values.get("street"), values.get("number"), values.get("addition")])).strip()
+
+
+# Field set of the common 'object-*' website template (span.object-street etc.)
+OBJECT_ADDRESS_FIELDS = {
+    "street": Field("span.object-street"),
+    "number": Field("span.object-housenumber"),
+    "addition": Field("span.object-housenumber-addition"),
+    "city": Field("span.object-place"),
+}
+LISTING_OUTPUT = ["full_adres", "url", "city", "price", "area", "num_rooms", "available"]
@@ -0,0 +1,276 @@
+# %%
+# src/makelaar/selector_spec_parity.py
+"""
+Parity check for the brokers migrated to selector specs.
+
+EXPECTED holds the output of the hand-written scrapers (before the migration) on pages in the
+shared 'object-*' website template:
+- FIXTURE_HTML: sold, under-offer, rental and broken cards
+- FIXTURE_SALE_HTML: sale price blocks, status features and classes, object-info texts and a
+  card without a city
+
+and on pages in their own layout for brokers whose area and rooms are a regex over the card
+text or icon alt texts (FIXTURE_ELEVEN_HTML, FIXTURE_SMIT_HEINEN_HTML).
+
+The other brokers in src/makelaar/breakdown each use their own website layout and still have
+their hand-written scrapers.
+"""
+
+import importlib
+
+FIXTURE_HTML = """
+<html><body>
+<div class="object object-fade status-verkocht">
+  <a href="/aanbod/damstraat-1-h/">
+    <span class="object-street">Damstraat</span> <span class="object-housenumber">1</span>
+    <span class="object-housenumber-addition">H</span> <span class="object-place">Amsterdam</span>
+  </a>
+  <div class="object-status">Verkocht</div>
+  <div class="object-price"><span class="object-price-value">€ 450.000 k.k.</span></div>
+  <div class="object-feature-woonoppervlakte"><div class="object-feature-label">Woonoppervlakte</div><div class="object-feature-info">85 m²</div></div>
+  <div class="object-feature-aantalkamers"><div class="object-feature-label">Kamers</div><div class="object-feature-info">3 kamers</div></div>
+</div>
+<div class="object object-fade status-onder-bod vov">
+  <a href="https://example.nl/aanbod/van-hallstraat-12/">
+    <span class="object-street">Van Hallstraat</span> <span class="object-housenumber">12</span>
+    <span class="object-place">Amsterdam</span>
+  </a>
+  <div class="object-status">Onder bod</div>
+  <div class="object-price">Prijs op aanvraag</div>
+  <div class="object-price"><div class="object-price-value">€ 1.250.000,50 v.o.n.</div></div>
+  <div class="object-feature-woonoppervlakte"><div class="object-feature-info">120m²</div></div>
+  <div class="object-feature-aantalkamers"><div class="object-feature-info">5 Kamers</div></div>
+</div>
+<div class="object status-beschikbaar">
+  <a href="/aanbod/kerkstraat-7/">
+    <span class="object-street">Kerkstraat</span> <span class="object-housenumber">7</span>
+    <span class="object-place">Haarlem</span>
+  </a>
+  <div class="object-status">Verhuurd</div>
+  <div class="object-price-rent"><span class="object-price-value">€ 2.100 p.m.</span></div>
+</div>
+<div class="object">
+  <span class="object-street">Zonder Nummer</span>
+  <span class="object-housenumber-addition">A</span>
+</div>
+</body></html>
+"""
+
+FIXTURE_SALE_HTML = """
+<html><body>
+<div class="object status-verkocht">
+  <a href="/aanbod/damstraat-1-h/">
+    <span class="object-street">Damstraat</span> <span class="object-housenumber">1</span>
+    <span class="object-housenumber-addition">H</span> <span class="object-place">Amsterdam</span>
+  </a>
+  <div class="object-status">Verkocht</div>
+  <div class="object-price object-price-sale object-price-status-verkocht"><span class="object-price-value">€  450.000 k.k.</span></div>
+  <div class="object-info"><span>85 m²</span> <span>3 Kamers</span></div>
+  <div class="object-feature-status"><div class="object-feature-info">Verkocht o.v.</div></div>
+  <div class="object-feature-woonoppervlakte"><div class="object-feature-info">85 m²</div></div>
+  <div class="object-feature-aantalkamers"><div class="object-feature-info">3 Kamers</div></div>
+</div>
+<div class="object status-onder-bod">
+  <a href="https://example.nl/aanbod/van-hallstraat-12/">
+    <span class="object-street">Van Hallstraat</span> <span class="object-housenumber">12</span>
+    <span class="object-place">Amsterdam</span>
+  </a>
+  <div class="object-status">Onder bod</div>
+  <div class="object-price object-price-sale object-price-status-onder-bod">
+    <div class="object-price-value">€ 1.250.000,50 v.o.n.</div> <span class="object-price-value">€ 1.200.000 k.k.</span>
+  </div>
+  <div class="object-info">120m² - 5 kamer</div>
+  <div class="object-feature-status"><div class="object-feature-info">Onder bod</div></div>
+  <div class="object-feature-woonoppervlakte"><div class="object-feature-info">120m²</div></div>
+  <div class="object-feature-aantalkamers"><div class="object-feature-info">5 kamers</div></div>
+</div>
+<div class="object">
+  <a href="/aanbod/kerkstraat-7/?via=https-partner">
+    <span class="object-street">Kerkstraat</span> <span class="object-housenumber">7</span>
+  </a>
+  <div class="object-price object-price-rent"><span class="object-price-value">Prijs op aanvraag</span></div>
+  <div class="object-feature-aantalkamers"><div class="object-feature-info">2 slaapkamers</div></div>
+</div>
+<div class="object">
+  <span class="object-street">Zonder Nummer</span>
+  <span class="object-housenumber-addition">A</span>
+</div>
+</body></html>
+"""
+
+FIXTURE_ELEVEN_HTML = """
+<html><body>
+<article class="realworks_wonen">
+  <header class="entry-header"><h2 class="entry-title"><a href="/woning/damstraat-1-h/">Damstraat 1-H</a></h2></header>
+  <div class="prijs">€ 450.000 k.k.</div>
+  <ul class="kenmerken"><li>85 m²</li><li>3 kamers</li></ul>
+</article>
+<article class="realworks_wonen">
+  <header class="entry-header"><h2 class="entry-title"><a href="https://example.nl/woning/van-hallstraat-12/">Van Hallstraat 12</a></h2></header>
+  <div class="prijs">Prijs op aanvraag</div>
+  <ul class="kenmerken"><li>120m²</li><li>1 kamer</li></ul>
+</article>
+<article class="realworks_wonen">
+  <header class="entry-header"><h2 class="entry-title">Kerkstraat 7</h2></header>
+  <div class="prijs">€ 1.250.000,50 v.o.n.</div>
+  <ul class="kenmerken"><li>4 Slaapkamers</li></ul>
+</article>
+<article class="realworks_wonen">
+  <div class="prijs">€ 300.000 k.k.</div>
+</article>
+</body></html>
+"""
+
+FIXTURE_SMIT_HEINEN_HTML = """
+<html><body>
+<article>
+  <a href="/woningaanbod/koop/amsterdam/damstraat-1-h"><img src="foto.jpg" alt="Damstraat 1-H"></a>
+  <h4 class="custom-address-text"><a href="/woningaanbod/koop/amsterdam/damstraat-1-h">Damstraat <span>1-H</span></a></h4>
+  <span class="custom-postcode-text">1012 JS  Amsterdam</span>
+  <div class="price">€ 450.000 k.k.</div>
+  <img src="m2.svg" alt="85 m²"> <img src="bed.svg" alt="2 slaapkamers">
+  <span class="status">Verkocht onder voorbehoud</span>
+</article>
+<article>
+  <a href="https://example.nl/van-hallstraat-12"><img src="foto.jpg" alt="Van Hallstraat 12"></a>
+  <h4 class="custom-address-text"><a href="https://example.nl/van-hallstraat-12">Van Hallstraat 12</a></h4>
+  <span class="custom-postcode-text">1051HK Amsterdam-West</span>
+  <div class="price">Prijs op aanvraag</div>
+  <img src="m2.svg" alt="Woonoppervlakte 60m²">
+  <span class="status">Onder bod</span>
+</article>
+<article>
+  <h4 class="custom-address-text"><a href="/kerkstraat-7">Kerkstraat 7</a></h4>
+  <span class="custom-postcode-text">Haarlem</span>
+  <div class="price">€ 1.250.000,50 v.o.n.</div>
+  <img src="bed.svg" alt="3 Slaapkamers">
+</article>
+<article><p>Binnenkort in verkoop</p></article>
+</body></html>
+"""
+
+# (module in src/makelaar/breakdown, extract function, fixture, expected listings)
+EXPECTED = [
+    ("hallie", "extract_rijp_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H', 'url': '/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'available': 'Onder bod'},
+    ]),
+    ("wester", "extract_wester_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://westermakelaars.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://westermakelaars.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("mokum", "extract_mokum_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://mokummakelaardij.com/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://mokummakelaardij.com/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("aemestelle", "extract_aemestelle_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.aemestelle.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://www.aemestelle.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("amstel_properties", "extract_amstel_property_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://amstel-property.com/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': 120, 'num_rooms': 5, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://amstel-property.com/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': 2100.0, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("boelen", "extract_boelen_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.boelenmakelaardij.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': 5, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://www.boelenmakelaardij.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': 2100.0, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("galmanversteeg", "extract_galmanversteeg_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://galmanversteeg.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': None, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://galmanversteeg.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': 2100.0, 'area': None, 'num_rooms': None, 'available': 'Verhuurd'},
+    ]),
+    ("biggelaar", "extract_bnv_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.bnv.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': None, 'available': 'Beschikbaar'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': 120, 'num_rooms': None, 'available': 'Beschikbaar'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://www.bnv.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("biggelaar", "extract_bnv_data", FIXTURE_SALE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.bnv.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': None, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1200000.0, 'area': 120, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': None, 'url': 'https://www.bnv.nl/aanbod/kerkstraat-7/?via=https-partner', 'city': None, 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("groot", "extract_groot_data", FIXTURE_HTML, [
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Damstraat 1', 'url': 'https://www.grootamsterdam.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Verkocht'},
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Van Hallstraat 12', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Onder bod'},
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Kerkstraat 7', 'url': 'https://www.grootamsterdam.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Verhuurd'},
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Zonder Nummer', 'url': None, 'city': '', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Onbekend'},
+    ]),
+    ("groot", "extract_groot_data", FIXTURE_SALE_HTML, [
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Damstraat 1', 'url': 'https://www.grootamsterdam.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': '85', 'num_rooms': '3', 'available': 'Verkocht'},
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Van Hallstraat 12', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': '120', 'num_rooms': '5', 'available': 'Onder bod'},
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Kerkstraat 7', 'url': '/aanbod/kerkstraat-7/?via=https-partner', 'city': '', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Onbekend'},
+        {'broker_name': 'Groot Amsterdam Makelaardij B.V.', 'broker_url': 'https://www.grootamsterdam.nl', 'full_adres': 'Zonder Nummer', 'url': None, 'city': '', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Onbekend'},
+    ]),
+    ("khmakelaar", "extract_khmakelaardij_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.khmakelaardij.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': 120, 'num_rooms': 5, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://www.khmakelaardij.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': 2100.0, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("khmakelaar", "extract_khmakelaardij_data", FIXTURE_SALE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.khmakelaardij.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1200000.0, 'area': 120, 'num_rooms': 5, 'available': 'Onder bod'},
+        {'full_adres': None, 'url': 'https://www.khmakelaardij.nl/aanbod/kerkstraat-7/?via=https-partner', 'city': None, 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("mra", "extract_mra_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://mra-makelaars.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Beschikbaar'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': 5, 'available': 'Beschikbaar'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://mra-makelaars.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("mra", "extract_mra_data", FIXTURE_SALE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://mra-makelaars.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': 5, 'available': 'Onder bod'},
+        {'full_adres': None, 'url': 'https://mra-makelaars.nl/aanbod/kerkstraat-7/?via=https-partner', 'city': None, 'price': None, 'area': None, 'num_rooms': 2, 'available': 'Beschikbaar'},
+    ]),
+    ("twm", "extract_twm_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.twm-makelaardij.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': 3, 'available': 'Beschikbaar'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': 120, 'num_rooms': 5, 'available': 'Beschikbaar'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://www.twm-makelaardij.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("twm", "extract_twm_data", FIXTURE_SALE_HTML, [
+        {'full_adres': 'Damstraat 1 H in Amsterdam', 'url': 'https://www.twm-makelaardij.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': 3, 'available': 'Beschikbaar'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1200000.0, 'area': 120, 'num_rooms': 5, 'available': 'Beschikbaar'},
+        {'full_adres': None, 'url': 'https://www.twm-makelaardij.nl/aanbod/kerkstraat-7/?via=https-partner', 'city': None, 'price': None, 'area': None, 'num_rooms': 2, 'available': 'Beschikbaar'},
+    ]),
+    ("vhm_makelaars", "extract_vhm_data", FIXTURE_HTML, [
+        {'full_adres': 'Damstraat 1 in Amsterdam', 'url': 'https://www.vhmmakelaars.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': 3, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': 'Kerkstraat 7 in Haarlem', 'url': 'https://www.vhmmakelaars.nl/aanbod/kerkstraat-7/', 'city': 'Haarlem', 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+        {'full_adres': None, 'url': None, 'city': None, 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("vhm_makelaars", "extract_vhm_data", FIXTURE_SALE_HTML, [
+        {'full_adres': 'Damstraat 1 in Amsterdam', 'url': 'https://www.vhmmakelaars.nl/aanbod/damstraat-1-h/', 'city': 'Amsterdam', 'price': None, 'area': 85, 'num_rooms': None, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam', 'url': 'https://example.nl/aanbod/van-hallstraat-12/', 'city': 'Amsterdam', 'price': 1250000.5, 'area': 120, 'num_rooms': 5, 'available': 'Onder bod'},
+        {'full_adres': None, 'url': 'https://www.vhmmakelaars.nl/aanbod/kerkstraat-7/?via=https-partner', 'city': None, 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+        {'full_adres': None, 'url': None, 'city': None, 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("eleven", "extract_eleven_data", FIXTURE_ELEVEN_HTML, [
+        {'full_adres': 'Damstraat 1-H', 'url': 'https://www.11makelaars.nl/woning/damstraat-1-h/', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 3, 'available': 'Beschikbaar'},
+        {'full_adres': 'Van Hallstraat 12', 'url': 'https://example.nl/woning/van-hallstraat-12/', 'city': 'Amsterdam', 'price': None, 'area': 120, 'num_rooms': 1, 'available': 'Beschikbaar'},
+        {'full_adres': 'Kerkstraat 7', 'url': None, 'city': 'Amsterdam', 'price': 1250000.5, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+        {'full_adres': None, 'url': None, 'city': 'Amsterdam', 'price': 300000.0, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+    ("smit_heinen", "extract_smitenheinen_data", FIXTURE_SMIT_HEINEN_HTML, [
+        {'full_adres': 'Damstraat1-H in Amsterdam', 'url': 'https://www.smitenheinen.nl/woningaanbod/koop/amsterdam/damstraat-1-h', 'city': 'Amsterdam', 'price': 450000.0, 'area': 85, 'num_rooms': 2, 'available': 'Verkocht'},
+        {'full_adres': 'Van Hallstraat 12 in Amsterdam-West', 'url': 'https://example.nl/van-hallstraat-12', 'city': 'Amsterdam-West', 'price': None, 'area': 60, 'num_rooms': None, 'available': 'Onder bod'},
+        {'full_adres': None, 'url': 'https://www.smitenheinen.nl/kerkstraat-7', 'city': None, 'price': 1250000.5, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+        {'full_adres': None, 'url': None, 'city': None, 'price': None, 'area': None, 'num_rooms': None, 'available': 'Beschikbaar'},
+    ]),
+]
+
+
+def unit_test_spec_parity():
+    for module_name, func_name, html, expected in EXPECTED:
+        module = importlib.import_module(f"src.makelaar.breakdown.{module_name}")
+        listings = getattr(module, func_name)(html)
+        assert listings == expected, f"{module_name} differs:\n{listings}\n!=\n{expected}"
+
+
+if __name__ == "__main__":
+    unit_test_spec_parity()
+    print(f"Selector specs match the original scrapers for {len({entry[0] for entry in EXPECTED})} brokers.")
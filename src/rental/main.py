@@ -5,6 +5,7 @@ from src.rental.pipelines import *
 from src.rental.processors import *
 from src.rental.notifications import *
 from src.utils import *
+from src.utils.listing_history import get_listing_history, ensure_backfilled
 
 # Retrieve __all__ from both modules
 from src.rental import pipelines, processors
@@ -15,6 +16,9 @@ all_processors = getattr(processors, '__all__', [])
 TEMP = False
 
 def process_rental_main():
+    # Once, before today's scrapes are recorded: first_seen of older listings comes from the CSVs
+    ensure_backfilled("rental")
+
     run_bouwinvest(local=TEMP)
     run_vesteda(local=TEMP)
     run_ikwilhuren(local=TEMP)
@@ -24,6 +28,9 @@ def process_rental_main():
 
     send_slack()
 
+    # The workflow commits the history file
+    get_listing_history().checkpoint()
+
 if __name__ == "__main__":
     process_rental_main()
 
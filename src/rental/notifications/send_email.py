@@ -11,6 +11,9 @@ import os
 from pathlib import Path
 
 import logging
+
+from src.utils.listing_history import get_listing_history, ensure_backfilled, canonical_url
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 # Load preference geojson
 current_dir = Path(__file__).resolve().parent
@@ -149,16 +152,22 @@ def create_ikwilhuren():
     # df = df[df['address'].str.contains('Amsterdam', case=False, na=False)]
     # Parse dates
     df['date_scraped'] = pd.to_datetime(df['date_scraped'], errors='coerce')
-    # --- Get first scraped date for each listing (using ALL rows, not just active) ---
-    first_seen = df.groupby('link')['date_scraped'].min().reset_index().rename(columns={'date_scraped': 'first_scraped'})
     # --- Get latest version of each listing ---
     df = df.sort_values('date_scraped', ascending=False).drop_duplicates('link')
 
     # --- Now filter only the ones that are currently active ---
     df = df[(df['is_active'] == True) & (df['is_available'] == True)]
 
-    # Merge in the first_seen date (from full dataset)
-    df = df.merge(first_seen, on='link', how='left')
+    # --- First scraped date per listing: an index lookup in the listing history ---
+    # (the history holds every rental CSV row since the one-off backfill)
+    ensure_backfilled("rental")
+    history = get_listing_history()
+    first_seen = history.lookup("rental", df['link'])['first_seen']
+    df['first_scraped'] = pd.to_datetime(df['link'].map(first_seen), errors='coerce')
+
+    # --- Price drops of the last week, also an index lookup ---
+    drops = history.price_drops(pd.Timestamp.now() - pd.Timedelta(days=7), "rental").drop_duplicates('url')
+    df['previous_price'] = df['link'].map(canonical_url).map(drops.set_index('url')['old_price'])
 
     # Create combined address
     df['address'] = df['address'] + ' ' + df['city']
@@ -193,6 +202,8 @@ def create_ikwilhuren():
             body += f"{address:<35} {int(row['price_per_month']):>8} {int(row['surface_area_m2']):>5} {row['price_per_m2']:>6.2f} {neighborhood:>15}\n"
             body += f"🔗 {row['link']}\n"
             body += f"📅 First scraped: {first_scraped} | 🆕 New: {is_new}\n"
+            if pd.notnull(row['previous_price']):
+                body += f"📉 Price drop: {int(row['previous_price'])} -> {int(row['price_per_month'])}\n"
             body += f"📌 Beschikbaar: {available_note}\n\n"
 
         return body
@@ -2,22 +2,87 @@
 # %%
 import requests
 import os 
+import time
+import threading
 import pandas as pd
+from requests.adapters import HTTPAdapter
 
 from src.utils.config import logging, RENTAL_DB, GEOCODED_STREETS
-from src.utils.google_sheets import read_sheet_to_df, replace_full_table
+from src.utils.google_sheets import read_sheet_to_df, update_rows_by_key
+from src.utils.listing_history import get_listing_history, canonical_url
 
 
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", None)
+# One summary message per run instead of one block per listing
+SLACK_DIGEST = os.getenv("SLACK_DIGEST", "false").lower() in ("1", "true", "yes")
+
+# Slack limits: 50 blocks per message, 3000 characters per section text
+MAX_BLOCKS = 50
+MAX_SECTION_CHARS = 3000
+MAX_MESSAGE_CHARS = 30000
+MAX_ATTEMPTS = 5
+MIN_SECONDS_BETWEEN_MESSAGES = 1.0  # incoming webhooks allow about one message per second
+
+_session = None
+_session_lock = threading.Lock()
+_last_post = 0.0
+
+
+def get_slack_session() -> requests.Session:
+    """
+    Keep-alive Session for the webhook; retries are done in post_to_slack (POST is not retried by urllib3).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+    return _session
+
+
+def post_to_slack(payload: dict) -> bool:
+    """
+    Posts one message, backing off on 429 (Retry-After) and 5xx responses.
+    """
+    global _last_post
+    if not SLACK_WEBHOOK_URL:
+        logging.error("❌ SLACK_WEBHOOK_URL is not set")
+        return False
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        wait = MIN_SECONDS_BETWEEN_MESSAGES - (time.monotonic() - _last_post)
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            response = get_slack_session().post(SLACK_WEBHOOK_URL, json=payload, timeout=(5, 20))
+        except requests.RequestException as e:
+            response, error = None, str(e)
+        _last_post = time.monotonic()
 
-def send_slack_message(text: str):
-    payload = {"text": text}
-    response = requests.post(SLACK_WEBHOOK_URL, json=payload)
+        if response is not None and response.status_code == 200:
+            logging.info("✅ Slack message sent")
+            return True
 
-    if response.status_code == 200:
-        logging.info("✅ Slack message sent")
-    else:
-        logging.error(f"❌ Failed to send message: {response.text}")
+        if response is not None and response.status_code != 429 and response.status_code < 500:
+            logging.error(f"❌ Failed to send message: {response.status_code} {response.text}")
+            return False
+
+        delay = 2 ** (attempt - 1)
+        if response is not None:
+            error = f"{response.status_code} {response.text}"
+            try:
+                delay = max(delay, float(response.headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+        logging.warning(f"⏳ Slack post failed ({error}), attempt {attempt}/{MAX_ATTEMPTS}, retrying in {delay:.0f}s")
+        time.sleep(delay)
+
+    logging.error("❌ Giving up on Slack message after retries")
+    return False
+
+
+def send_slack_message(text: str):
+    return post_to_slack({"text": text})
 
 def standardized_body(address, price, size, link):
     return (
@@ -29,36 +94,108 @@ def standardized_body(address, price, size, link):
     )
 
 
-def send_new_listing_update(df: pd.DataFrame):
+def digest_line(address, price, size, link):
+    return f"• <{link}|{address}> — €{price} / month, {size} m²"
+
+
+def listing_address(row) -> str:
+    # address is address_full up to the first comma
+    address = row.get("address_full", "Unknown address")
+    address = address.split(",")[0] if isinstance(address, str) else "Unknown address"
+
+    # add  'info1', "info2", "info3" to the address with ({ })
+    info1 = row.get("info1", "")
+    info2 = row.get("info2", "")
+    info3 = row.get("info3", "")
+    if info1 or info2 or info3:
+        address += f" ({info1}, {info2}, {info3})"
+    else:
+        address += " (No additional info)"
+    return address
+
+
+def _section(text: str) -> dict:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text[:MAX_SECTION_CHARS]}}
+
+
+def _header(text: str) -> dict:
+    return {"type": "header", "text": {"type": "plain_text", "text": text[:150], "emoji": True}}
+
+
+def pack_messages(items, title: str, digest: bool = False):
+    """
+    Packs listing texts into as few Block Kit messages as the Slack limits allow.
+
+    Parameters:
+        items (list): (link, text) per listing; the text is one section, or one line in digest mode
+        title (str): Header of every message
+
+    Returns:
+        list: (payload, links) per message
+    """
+    messages = []
+    blocks, links, size = [_header(title)], [], len(title)
+
+    def flush():
+        nonlocal blocks, links, size
+        if links:
+            fallback = f"{title} ({len(links)} listings)"
+            messages.append(({"text": fallback, "blocks": blocks}, links))
+        blocks, links, size = [_header(title)], [], len(title)
+
+    if digest:
+        # one section per ~3000 characters of lines
+        chunk, chunk_links = [], []
+        sections = []
+        for link, line in items:
+            if chunk and len("\n".join(chunk + [line])) > MAX_SECTION_CHARS:
+                sections.append(("\n".join(chunk), chunk_links))
+                chunk, chunk_links = [], []
+            chunk.append(line)
+            chunk_links.append(link)
+        if chunk:
+            sections.append(("\n".join(chunk), chunk_links))
+        units = sections
+    else:
+        units = [(text, [link]) for link, text in items]
+
+    for text, unit_links in units:
+        # a listing section plus a divider
+        if len(blocks) + 2 > MAX_BLOCKS or size + len(text) > MAX_MESSAGE_CHARS:
+            flush()
+        blocks.extend([_section(text), {"type": "divider"}])
+        links.extend(unit_links)
+        size += len(text)
+    flush()
+    return messages
+
+
+def send_new_listing_update(df: pd.DataFrame, digest: bool = None) -> list:
+    """
+    Sends the listings in batched Block Kit messages; returns the links that were delivered.
+    """
     if df.empty:
         print("ℹ️ No new listings to send.")
-        return
+        return []
+    digest = SLACK_DIGEST if digest is None else digest
 
+    items = []
     for _, row in df.iterrows():
         try:
-            # address is address_full up to the first comma
-            address = row.get("address_full", "Unknown address")
-            address = address.split(",")[0] if isinstance(address, str) else "Unknown address"
-
-            # add  'info1', "info2", "info3" to the address with ({ })
-            info1 = row.get("info1", "")
-            info2 = row.get("info2", "")
-            info3 = row.get("info3", "")
-            if info1 or info2 or info3:
-                address += f" ({info1}, {info2}, {info3})"
-            else:
-                address += " (No additional info)"
-            message = standardized_body(
-                address=address,
-                price=row["price"],
-                size=row["squared_m2"],
-                link=row["link"]
-            )
-            send_slack_message(message)
+            fields = dict(address=listing_address(row), price=row["price"], size=row["squared_m2"], link=row["link"])
+            items.append((row["link"], digest_line(**fields) if digest else standardized_body(**fields)))
         except Exception as e:
-            print(f"⚠️ Failed to send listing: {row.get('address', 'Unknown address')} - {e}")
+            print(f"⚠️ Failed to format listing: {row.get('address', 'Unknown address')} - {e}")
+
+    title = f"🏡 {len(items)} new rental listing{'s' if len(items) != 1 else ''}"
+    delivered = []
+    for payload, links in pack_messages(items, title, digest=digest):
+        if post_to_slack(payload):
+            delivered.extend(links)
+    logging.info(f"📨 Sent {len(delivered)} of {len(items)} listings to Slack")
+    return delivered
 
-def run_pipeline():
+def run_pipeline(digest: bool = None):
     logging.info("Starting Slack notification pipeline...")
 
     # Read the rental database
@@ -72,17 +209,17 @@ def run_pipeline():
         logging.info("No new listings found.")
         return
 
-    # Filter for new listings (assuming 'is_new' column exists)
-    # convert TRUE and FALSE to boolean
+    # New listings: first seen since yesterday, an index lookup in the listing history
+    new_urls = set(get_listing_history().new_since(pd.Timestamp.now() - pd.Timedelta(days=1), "rental")["url"])
+    is_new = df['link'].map(canonical_url).isin(new_urls)
+
     # convert TRUE to True and FALSE to False
-    df['is_new'] = df['is_new'].replace({'TRUE': True, 'FALSE': False})
     df['is_available'] = df['is_available'].replace({'TRUE': True, 'FALSE': False})
     df['is_slack_message_sent'] = df['is_slack_message_sent'].replace({'TRUE': True, 'FALSE': False})
     
-    new_listings = df[(df['is_new'] == True) &  
+    new_listings = df[is_new &
                       (df['is_available'] == True) &
                         (df['price'] < 1800) &
-                        (df['date_scraped'] > pd.Timestamp.now() - pd.Timedelta(days=1)) &
                         # is_slack_message_sent is False or np.nan
                         (df['is_slack_message_sent'].isna() | (df['is_slack_message_sent'] == False))]
     
@@ -92,13 +229,15 @@ def run_pipeline():
         logging.info("No new listings to notify.")
         return
     
-    # is_slack_message_sent = True
-    df = read_sheet_to_df(RENTAL_DB, 0)
-    df.loc[df['link'].isin(new_listings['link']), 'is_slack_message_sent'] = True
-
-    replace_full_table(df, RENTAL_DB, 0)
-
-    send_new_listing_update(new_listings)
+    delivered = send_new_listing_update(new_listings, digest=digest)
+
+    # is_slack_message_sent = True, only for the rows of the delivered links
+    if delivered:
+        update_rows_by_key(
+            RENTAL_DB,
+            key_column='link',
+            updates={link: {'is_slack_message_sent': True} for link in delivered},
+        )
     logging.info("Slack notification pipeline completed.")
 
 if __name__ == "__main__":
@@ -22,6 +22,9 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 from src.utils import *
 from src.utils.config import logging
+from src.utils import listing_store
+from src.utils.listing_history import record_scrape
+from src.utils.address import extract_street
 
 # --- CONFIG ---
 BASE_URL = "https://www.wonenbijbouwinvest.nl/"
@@ -154,10 +157,7 @@ def finalize_dataframe(df):
     df['address_full'] = df['address'] + ', ' + df['location']
     # df['street'] = df['address'] (only retrieve the part up to the first number value)
 
-    def extract_street(address):
-        match = re.match(r"^(.*?)(\d)", address)
-        return match.group(1).strip() if match else address
-    df['street'] = df['address'].apply(extract_street)
+    df['street'] = extract_street(df['address'])
 
     df['is_available'] = df['availability'].apply(lambda x: 'Beschikbaar' in x)
     df['note'] = None
@@ -176,6 +176,8 @@ def run_pipeline(local = False):
     df = scrape_bouwinvest(CITY, local=local)
     df = finalize_dataframe(df)
     append_row_to_sheet(df, RENTAL_DB)
+    listing_store.write_partition(df, "rental", part='bouwinvest')
+    record_scrape(df, "rental")
     return df
 
 if __name__ == "__main__":
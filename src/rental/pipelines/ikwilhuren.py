@@ -23,6 +23,9 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 from src.utils import *
 from src.utils.config import logging
+from src.utils import listing_store
+from src.utils.listing_history import record_scrape
+from src.utils.address import extract_street
 
 # --- Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -225,7 +228,7 @@ def finalize_dataframe(df):
     df['price'] = df['price_per_month']
     df['surface_m2'] = df['surface_m2'].astype(float)
     df['price_per_m2'] = df['price'] / df['surface_m2']
-    df['street'] = df['address'].apply(lambda x: re.match(r"^(.*?)(\d)", x).group(1).strip() if re.match(r"^(.*?)(\d)", x) else x)
+    df['street'] = extract_street(df['address'])
     df['is_available'] = df['status'].apply(lambda x: True if x and 'Te huur' in x else False)
     df['note'] = df['available_from_note']
     df['link'] = df['details_url']
@@ -278,6 +281,8 @@ def run_pipeline(local = False):
     df = finalize_dataframe(df)
 
     append_row_to_sheet(df, RENTAL_DB)
+    listing_store.write_partition(df, "rental", part=NAME)
+    record_scrape(df, "rental")
     return df
 
 
@@ -20,6 +20,9 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 from src.utils import *
 from src.utils.config import logging
+from src.utils import listing_store
+from src.utils.listing_history import record_scrape
+from src.utils.address import extract_street
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "huren")
 BASE_URL = "https://vbtverhuurmakelaars.nl/woningen"
@@ -154,7 +157,7 @@ def extract_coordinates(html):
 def finalize_dataframe(df):
 
     df['address_full'] = df['address'] + ', ' + df['city']
-    df['street'] = df['address'].apply(lambda x: re.match(r"^(.*?)(\d)", x).group(1).strip() if re.match(r"^(.*?)(\d)", x) else x)
+    df['street'] = extract_street(df['address'])
     df['price'] = df['price_per_month']
     df['squared_m2'] = df['surface_area_m2'].astype(float)
     df['price_per_squared_m2'] = df['price'] / df['squared_m2']
@@ -223,6 +226,8 @@ def run_pipeline(local  = False):
         df = finalize_dataframe(df)
 
         append_row_to_sheet(df, RENTAL_DB)
+        listing_store.write_partition(df, "rental", part='vbt_huren')
+        record_scrape(df, "rental")
         logging.info(f"[DONE] Scraped {len(df)} properties and saved to CSV.")
     finally:
         driver.quit()
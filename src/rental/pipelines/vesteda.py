@@ -2,7 +2,6 @@
 # scraper.py
 import os
 import time
-import re
 import tempfile
 import pandas as pd
 from bs4 import BeautifulSoup
@@ -33,6 +32,9 @@ import logging
 
 from src.utils import *
 from src.utils.config import logging
+from src.utils import listing_store
+from src.utils.listing_history import record_scrape
+from src.utils.address import extract_street
 
 NAME = "vesteda"
 CITY = "amsterdam"
@@ -172,7 +174,7 @@ def finalize_dataframe(data):
 
     df['link'] = df['link'].apply(lambda x: f"https://hurenbij.vesteda.com{x}" if x else None)
     df['address_full'] = df['address'] + ', ' + df['location']
-    df['street'] = df['address'].apply(lambda x: re.match(r"^(.*?)(\d)", x).group(1).strip() if re.match(r"^(.*?)(\d)", x) else x)
+    df['street'] = extract_street(df['address'])
     df['squared_m2'] = df['area'].str.replace(' m2', '').astype(int)
     df['price_per_m2'] = df['price'] / df['squared_m2']
     df['is_available'] = df['status_note'].apply(lambda x: True if x and 'Beschikbaar' in x else False)
@@ -209,6 +211,8 @@ def run_pipeline(local=False):
     df = finalize_dataframe(dict)
 
     append_row_to_sheet(df, RENTAL_DB)
+    listing_store.write_partition(df, "rental", part=NAME)
+    record_scrape(df, "rental")
 
     logging.info(f"[END] Scraping completed for {NAME} in {CITY}.") 
     
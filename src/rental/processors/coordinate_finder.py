@@ -14,6 +14,9 @@ from datetime import datetime
 from src.utils.google_sheets import read_sheet_to_df
 from src.utils.config import logging, GEOCODED_STREETS, RENTAL_DB
 from src.utils.google_sheets import append_row_to_sheet
+from src.utils.gazetteer import get_gazetteer
+from src.utils.geocode_cache import get_geocode_cache, NOT_FOUND, STREET
+from src.utils.neighborhood_index import assign_neighborhoods
 
 
 # Disable SSL warnings (for VPN / MITM environments)
@@ -36,13 +39,6 @@ INPUT = {
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def extract_street(address):
-    if isinstance(address, str):
-        match = re.match(r"^(.*?)(?=\d)", address.strip())
-        return match.group(0).strip() if match else address.strip()
-    return None
-
-
 def finalize_dataframe(df):
 
     df['street'] = df['street']
@@ -83,12 +79,52 @@ def run_pipeline(pipeline_name="rental"):
 
     already_done = set(geocoded_streets_df['street'].str.lower().str.strip().dropna().unique())
     new_rows = []
+    gazetteer = get_gazetteer()
+
+    # Keep the shared geocode cache in sync with the GEOCODED_STREETS sheet
+    cache = get_geocode_cache()
+    known = geocoded_streets_df.dropna(subset=['street'])
+    if {'latitude', 'longitude'}.issubset(known.columns):
+        cache.put_many(
+            list(zip(known['street'], pd.to_numeric(known['latitude'], errors='coerce'), pd.to_numeric(known['longitude'], errors='coerce'))),
+            source="geocoded_streets_sheet",
+            kind=STREET,
+            overwrite=False,
+        )
 
     for street in tqdm(missing_streets, desc="Geocoding streets"):
         normalized_street = street.lower().strip()
         if normalized_street in already_done:
             continue
 
+        # Streets we already know from earlier geocoding are answered locally, without the 1 s wait
+        cached = cache.get(street, kind=STREET)
+        if cached == NOT_FOUND:
+            continue
+        if cached is not None and cache.get_extra(street):
+            row = dict(cache.get_extra(street), date_updated=datetime.now().strftime("%Y-%m-%d"))
+            new_rows.append(row)
+            already_done.add(normalized_street)
+            continue
+
+        hit = gazetteer.lookup(street)
+        if hit:
+            lat, lon, _ = hit
+            new_rows.append({
+                "street": street,
+                "latitude": lat,
+                "longitude": lon,
+                "neighborhood": assign_neighborhoods([lat], [lon])[0],
+                "location": f"{lat}, {lon}",
+                "district": None,
+                "city": CITY_FALLBACK,
+                "postcode": None,
+                "display_name": None,
+                "date_updated": datetime.now().strftime("%Y-%m-%d")
+            })
+            already_done.add(normalized_street)
+            continue
+
         try:
             # Format query
             street_param = f"2 {street}".lower().replace(" ", "+")
@@ -143,6 +179,7 @@ def run_pipeline(pipeline_name="rental"):
                     "date_updated": datetime.now().strftime("%Y-%m-%d")
                 }
 
+            cache.put(street, row["latitude"], row["longitude"], source="geocode.maps.co", kind=STREET, extra=row)
             new_rows.append(row)
             already_done.add(normalized_street)
             time.sleep(1)  # Respect API rate limits
@@ -2,12 +2,7 @@
 import streamlit as st
 import pandas as pd
 import pydeck as pdk
-import os
 
-import geopandas as gpd
-import json
-from shapely.geometry import Point
-from datetime import timedelta
 import plotly.express as px
 import streamlit.components.v1 as components
 
@@ -16,24 +11,15 @@ import streamlit.components.v1 as components
 
 st.title("Funda Listings in Amsterdam")
 
-def load_data():
+from src.streamlit.data_layer import load_listing_index
+from src.streamlit.map_layers import neighborhood_layer, scatter_payload, scatter_layer
+from src.utils.neighborhood_stats import get_neighborhood_stats
 
-    data_dir = os.path.join(os.getcwd(), 'data', 'funda')
-    base_name = 'funda_data_'
-    ext = '.csv'
+def load_data():
+    # Parsing, typing, derived columns and the filter index are cached per data file version (path + mtime)
+    listing_index, found_date = load_listing_index()
 
     today = pd.Timestamp.now().date()
-    max_days_back = 30  # How many days to look back
-
-    found_date = None
-    for i in range(max_days_back):
-        check_date = today - timedelta(days=i)
-        file_name = f"{base_name}{check_date.strftime('%Y-%m-%d')}{ext}"
-        file_path = os.path.join(data_dir, file_name)
-        if os.path.exists(file_path):
-            found_date = check_date
-            break
-
     if found_date is None:
         st.error("No data file found in the last 30 days. Please run the scraper to update the listings.")
         st.stop()
@@ -43,66 +29,37 @@ def load_data():
         else:
             st.warning(f"Using data from: {found_date.strftime('%Y-%m-%d')}, No data for today. Showing latest available data from {found_date.strftime('%Y-%m-%d')}.")
 
-    # --- Load data ---
-    input_path = os.path.join(data_dir, f"{base_name}{found_date.strftime('%Y-%m-%d')}{ext}")
-    df = pd.read_csv(input_path)
-    # overdracht_aangeboden_sinds to aangeboden_date
-    df.rename(columns={'overdracht_aangeboden_sinds': 'aangeboden_date'}, inplace=True)
-
+    df = listing_index.df
     st.write(f"Data loaded from: {df.columns.tolist()}")
-    df['aangeboden_date'] = pd.to_datetime(df['aangeboden_date'])  # Ensure datetime type
-    last_week = df[df['aangeboden_date'] >= pd.Timestamp.now() - pd.Timedelta(days=7)]
     # number of new listings this week: 
+    # last_week = df[df['aangeboden_date'] >= pd.Timestamp.now() - pd.Timedelta(days=7)]
     # new_listings_count = len(last_week)
     # st.success(f"New listings this week: {new_listings_count}")
 
-    return df
+    return df, listing_index
 
-df = load_data()
+df, listing_index = load_data()
 
 # check how many new companies (aangeboden_date = yesterday) are in the data
 
-with open("data/neighborhoods_amsterdam.json", "r") as f:
-    geojson_data = json.load(f)
-
-# rename m2 to area for consistency
-df.rename(columns={'m2': 'area'}, inplace=True)
-
 # --- Check required columns ---
 required_cols = ['lat', 'lon', 'street_name', 'number', 'price', 'area', 'url', 'neighborhood']
 if not all(col in df.columns for col in required_cols):
     st.error("Missing required columns: lat, lon, street_name, number, price, area, url")
     st.stop()
 
-# --- Calculate price per m² ---
-df['price_per_m2'] = df['price'] / df['area']
-df['label'] = df['street_name'] + ' ' + df['number']
-
 # --- Filters ---
 from src.streamlit.side_bar import side_bar_filters
 
-filtered_df, selected_range = side_bar_filters(df)
+filtered_df, selected_range = side_bar_filters(df, listing_index)
 
 def figure_map():
+    # price, area, price_per_m2 and the *_str tooltip columns are precomputed by the data layer
     map_df = filtered_df.dropna(subset=["lat", "lon"]).copy()
-    map_df['price'] = pd.to_numeric(map_df['price'], errors='coerce')
-    map_df['area'] = pd.to_numeric(map_df['area'], errors='coerce')
-    map_df['price_per_m2'] = (map_df['price'] / map_df['area']).round(0)
-    map_df['price_per_m2_str'] = map_df['price_per_m2'].astype(int).astype(str)
-    map_df['price_str'] = map_df['price'].astype(int).astype(str)
-    map_df['area_str'] = map_df['area'].astype(int).astype(str)
-
-    # Add color scale based on price_per_m2
-    min_val = map_df['price_per_m2'].min()
-    max_val = map_df['price_per_m2'].max()
+    map_df['price_per_m2'] = map_df['price_per_m2'].round(0)
 
-    def scale_color(val):
-        ratio = (val - min_val) / (max_val - min_val) if max_val > min_val else 0.5
-        r = int(255 * ratio)
-        b = 255 - r
-        return [r, 100, b, 180]
-
-    map_df['color'] = map_df['price_per_m2'].apply(scale_color)
+    # Only position, color (scaled on price_per_m2) and tooltip fields go to the browser
+    map_payload = scatter_payload(map_df)
 
     # Table for display
     def make_clickable(val):
@@ -125,35 +82,16 @@ def figure_map():
     display_df["price/m2"] = display_df["price/m2"].round(0).astype(int)
     display_df["url"] = display_df["url"].apply(make_clickable)
 
-    return map_df, display_df
+    return map_df, map_payload, display_df
 
-map_df, display_df = figure_map()
+map_df, map_payload, display_df = figure_map()
 
 # --- Scatter plot: price vs area ---
 col1, col2 = st.columns([3, 2])
 
 with col1:
-    region_layer = pdk.Layer(
-        "GeoJsonLayer",
-        geojson_data,
-        stroked=True,
-        filled=True,
-        get_fill_color=[200, 100, 100, 40],
-        get_line_color=[255, 0, 0],
-        line_width_min_pixels=1,
-        pickable=False,
-    )
-    layers=[
-        region_layer,
-        pdk.Layer(  # Your original ScatterplotLayer
-            "ScatterplotLayer",
-            data=filtered_df,
-            get_position='[lon, lat]',
-            get_radius=120,
-            get_fill_color='color',
-            pickable=True,
-        )
-    ]
+    # Built once per GeoJSON file and shared by all reruns
+    region_layer = neighborhood_layer()
 
     tooltip = {
         "html": """
@@ -173,17 +111,7 @@ with col1:
             pitch=0,
         ),
         tooltip=tooltip,
-        layers=[
-            region_layer,
-            pdk.Layer(
-                "ScatterplotLayer",
-                data=map_df,
-                get_position='[lon, lat]',
-                get_radius=120,
-                get_fill_color='color',
-                pickable=True,
-            )
-        ]
+        layers=[region_layer, scatter_layer(map_payload)]
     ))
 
 
@@ -232,6 +160,23 @@ with col2:
 
 st.write(display_df.to_html(escape=False, index=False), unsafe_allow_html=True)
 
+# --- Neighborhood price/m² from the pre-aggregated stats (no scan over raw listings) ---
+neighborhood_stats = get_neighborhood_stats().latest("funda")
+if not neighborhood_stats.empty:
+    neighborhood_stats = neighborhood_stats.dropna(subset=["median_price_per_m2"]).sort_values("median_price_per_m2")
+    st.markdown(f"### 📊 Median price/m² per neighborhood ({neighborhood_stats['date'].iloc[0]})")
+    fig_stats = px.bar(
+        neighborhood_stats,
+        x="neighborhood",
+        y="median_price_per_m2",
+        error_y=neighborhood_stats["p75_price_per_m2"] - neighborhood_stats["median_price_per_m2"],
+        error_y_minus=neighborhood_stats["median_price_per_m2"] - neighborhood_stats["p25_price_per_m2"],
+        hover_data={"listings": True, "new_listings": True},
+        labels={"median_price_per_m2": "Median price/m² (€, p25-p75)", "neighborhood": "Neighborhood"},
+        height=400,
+    )
+    st.plotly_chart(fig_stats, use_container_width=True)
+
 # --- Clickable links below map ---
 st.markdown("### 🔗 Listings")
 for _, row in map_df.sort_values("price_per_m2").iterrows():
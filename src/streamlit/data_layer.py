@@ -0,0 +1,160 @@
+# %%
+# src/streamlit/data_layer.py
+"""
+Cached data layer for the dashboard.
+
+Streamlit reruns the whole script on every widget interaction. Everything that only depends
+on the data file (finding the latest file, parsing the CSV, typing columns, derived columns,
+the filter index) is cached here, keyed on the file path plus its mtime and size,
+so a slider change only re-runs the filters. A new scrape changes the mtime and is picked
+up on the next rerun.
+"""
+
+import os
+import re
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.streamlit.filter_index import ListingIndex
+
+FUNDA_DATA_DIR = os.path.join("data", "funda")
+FILE_PATTERN = re.compile(r"^funda_data_(\d{4}-\d{2}-\d{2})\.csv$")
+MAX_DAYS_BACK = 30
+
+NUMERIC_COLUMNS = ["price", "area", "lat", "lon", "servicekosten_num", "kadaster_lasten_price",
+                   "eigendom_year", "external_storage_space_m2"]
+
+
+def find_latest_data_file(data_dir=FUNDA_DATA_DIR, max_days_back=MAX_DAYS_BACK, today=None):
+    """
+    Most recent funda_data_<date>.csv of the last `max_days_back` days, from one directory listing.
+
+    Returns:
+        (path, date): (None, None) when there is no file in the window
+    """
+    today = pd.Timestamp(today or pd.Timestamp.now()).date()
+    oldest = today - timedelta(days=max_days_back - 1)
+
+    best = None
+    if os.path.isdir(data_dir):
+        for name in os.listdir(data_dir):
+            match = FILE_PATTERN.match(name)
+            if not match:
+                continue
+            date = pd.Timestamp(match.group(1)).date()
+            if oldest <= date <= today and (best is None or date > best[1]):
+                best = (os.path.join(data_dir, name), date)
+    return best or (None, None)
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _lower_text(series):
+    return series.astype("string").str.strip().str.lower()
+
+
+def prepare_listings(df):
+    """
+    Types the raw columns and adds every column the dashboard derives from a listing:
+    price_per_m2, label, has_berging, beschikbaar and the tooltip strings.
+    """
+    df = df.rename(columns={"overdracht_aangeboden_sinds": "aangeboden_date", "m2": "area"})
+
+    if "aangeboden_date" in df.columns:
+        df["aangeboden_date"] = pd.to_datetime(df["aangeboden_date"], errors="coerce")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df["price_per_m2"] = df["price"] / df["area"].where(df["area"] > 0)
+    df["label"] = df["street_name"].astype(str) + " " + df["number"].astype(str)
+
+    if "external_storage_space_m2" in df.columns:
+        df["has_berging"] = df["external_storage_space_m2"].gt(0)
+    else:
+        df["has_berging"] = False
+
+    beschikbaar = pd.Series(False, index=df.index)
+    for col in ("acceptance", "status"):
+        if col in df.columns:
+            beschikbaar |= _lower_text(df[col]).eq("beschikbaar").fillna(False).astype(bool)
+    df["beschikbaar"] = beschikbaar
+
+    # Tooltip strings of the map
+    for col in ("price", "area", "price_per_m2"):
+        df[f"{col}_str"] = df[col].round(0).astype("Int64").astype("string").fillna("")
+
+    if "neighborhood" in df.columns:
+        df["neighborhood"] = df["neighborhood"].astype("category")
+    return df
+
+
+@st.cache_data(show_spinner="Loading listings...", max_entries=4)
+def _load_listings(path, mtime_ns, size):
+    return prepare_listings(pd.read_csv(path))
+
+
+def load_listings(data_dir=FUNDA_DATA_DIR, max_days_back=MAX_DAYS_BACK):
+    """
+    Prepared listings of the latest data file; parsed once per file version.
+
+    Returns:
+        (df, found_date): (None, None) when there is no data file
+    """
+    path, found_date = find_latest_data_file(data_dir, max_days_back)
+    if path is None:
+        return None, None
+    return _load_listings(*_file_key(path)), found_date
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_listing_index(path, mtime_ns, size):
+    return ListingIndex(_load_listings(path, mtime_ns, size))
+
+
+def load_listing_index(data_dir=FUNDA_DATA_DIR, max_days_back=MAX_DAYS_BACK):
+    """
+    Filter index over the prepared listings of the latest data file, shared by all reruns
+    and sessions (index.df must be treated as read-only).
+
+    Returns:
+        (index, found_date): (None, None) when there is no data file
+    """
+    path, found_date = find_latest_data_file(data_dir, max_days_back)
+    if path is None:
+        return None, None
+    return _load_listing_index(*_file_key(path)), found_date
+
+
+def unit_test_prepare_listings():
+    raw = pd.DataFrame({
+        "street_name": ["Damstraat", "Singel", "Kerkstraat"],
+        "number": ["1", "2 A", "3"],
+        "price": [400000, "450000", None],
+        "m2": [80, 0, 50],
+        "lat": [52.37, 52.36, None],
+        "lon": [4.89, 4.88, None],
+        "overdracht_aangeboden_sinds": ["2026-10-01", "not a date", None],
+        "external_storage_space_m2": [5, None, 0],
+        "acceptance": ["Beschikbaar", None, "in overleg"],
+        "status": [None, " beschikbaar ", "verkocht"],
+        "neighborhood": ["Centrum", "Centrum", None],
+    })
+    df = prepare_listings(raw)
+    assert df["price_per_m2"].tolist()[0] == 5000 and np.isnan(df["price_per_m2"].tolist()[1])
+    assert df["label"].tolist() == ["Damstraat 1", "Singel 2 A", "Kerkstraat 3"]
+    assert df["has_berging"].tolist() == [True, False, False]
+    assert df["beschikbaar"].tolist() == [True, True, False]
+    assert df["price_str"].tolist() == ["400000", "450000", ""]
+    assert df["aangeboden_date"].isna().tolist() == [False, True, True]
+
+
+if __name__ == "__main__":
+    unit_test_prepare_listings()
+    print("Listings are prepared as expected.")
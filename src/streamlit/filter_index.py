@@ -0,0 +1,190 @@
+# %%
+# src/streamlit/filter_index.py
+"""
+Index-backed filtering for the dashboard sidebar.
+
+ListingIndex is built once per data file (see data_layer.load_listing_index):
+- boolean columns (has_berging, beschikbaar, servicekosten/kadaster thresholds) are kept
+  as NumPy bitmaps
+- categorical columns (neighborhood, source) as integer codes with a lookup table
+- range columns (price, area, price_per_m2, eigendom_year) as argsort order + sorted values
+
+A filter call is then a few binary searches plus bitmap intersections, instead of
+rebuilding row-wise masks and apply() columns on every rerun.
+"""
+
+import numpy as np
+import pandas as pd
+
+RANGE_COLUMNS = ["price", "area", "price_per_m2", "eigendom_year"]
+FLAG_COLUMNS = ["has_berging", "beschikbaar"]
+CATEGORY_COLUMNS = ["neighborhood", "source"]
+DEFAULT_SOURCE = "funda"
+
+
+class SortedColumn:
+    """
+    Sorted values of one numeric column; NaN rows are kept apart.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        self.size = len(values)
+        self.missing = np.isnan(values)
+        self.order = np.argsort(values, kind="stable")[: (~self.missing).sum()]
+        self.values = values[self.order]
+
+    def min(self):
+        return self.values[0] if len(self.values) else np.nan
+
+    def max(self):
+        return self.values[-1] if len(self.values) else np.nan
+
+    def between(self, low, high, include_missing=True):
+        """
+        Bitmap of the rows with low <= value <= high (and NaN rows when include_missing).
+        """
+        start = np.searchsorted(self.values, low, side="left")
+        stop = np.searchsorted(self.values, high, side="right")
+        mask = self.missing.copy() if include_missing else np.zeros(self.size, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return mask
+
+    def greater_than(self, threshold):
+        return self.between(np.nextafter(threshold, np.inf), np.inf, include_missing=False)
+
+
+class CategoryColumn:
+    """
+    Integer codes of one categorical column; membership is a lookup-table gather.
+    """
+
+    def __init__(self, values):
+        categorical = pd.Categorical(values)
+        self.categories = [str(c) for c in categorical.categories]
+        self.codes = categorical.codes  # -1 for missing
+
+    def isin(self, selected):
+        selected = {str(s) for s in selected}
+        # last entry is for code -1 (missing), never selected
+        lookup = np.zeros(len(self.categories) + 1, dtype=bool)
+        lookup[[i for i, c in enumerate(self.categories) if c in selected]] = True
+        return lookup[self.codes]
+
+
+def _flag(df, column):
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df[column].fillna(False).astype(bool).to_numpy()
+
+
+def _below_or_missing(df, column, threshold):
+    if column not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+    return np.isnan(values) | (values < threshold)
+
+
+class ListingIndex:
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.size = len(self.df)
+
+        self.ranges = {
+            col: SortedColumn(pd.to_numeric(self.df[col], errors="coerce") if col in self.df.columns else np.full(self.size, np.nan))
+            for col in RANGE_COLUMNS
+        }
+        self.flags = {col: _flag(self.df, col) for col in FLAG_COLUMNS}
+        self.flags["servicekosten_below_100"] = _below_or_missing(self.df, "servicekosten_num", 100)
+        self.flags["kadaster_lasten_below_100"] = _below_or_missing(self.df, "kadaster_lasten_price", 100)
+
+        source = self.df["source"] if "source" in self.df.columns else pd.Series(DEFAULT_SOURCE, index=self.df.index)
+        self.categories = {
+            "neighborhood": CategoryColumn(self.df["neighborhood"] if "neighborhood" in self.df.columns else [None] * self.size),
+            "source": CategoryColumn(source),
+        }
+
+    def bounds(self, column):
+        """
+        (min, max) of a range column, ignoring NaN.
+        """
+        return self.ranges[column].min(), self.ranges[column].max()
+
+    def neighborhoods(self):
+        return sorted(self.categories["neighborhood"].categories)
+
+    def mask(self, price_per_m2_range=None, area_range=None, price_range=None, neighborhoods=None,
+             sources=None, only_berging=False, only_beschikbaar=False, servicekosten_below_100=False,
+             kadaster_lasten_below_100=False, eigendom_after=None):
+        """
+        Bitmap of the rows that pass every given filter. Range filters keep rows where the
+        value is missing, like the sidebar always did; an empty neighborhood selection means all.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for column, value_range in (("price_per_m2", price_per_m2_range), ("area", area_range), ("price", price_range)):
+            if value_range is not None:
+                mask &= self.ranges[column].between(*value_range)
+        if neighborhoods:
+            mask &= self.categories["neighborhood"].isin(neighborhoods)
+        if sources is not None:
+            mask &= self.categories["source"].isin(sources)
+        if only_berging:
+            mask &= self.flags["has_berging"]
+        if only_beschikbaar:
+            mask &= self.flags["beschikbaar"]
+        if servicekosten_below_100:
+            mask &= self.flags["servicekosten_below_100"]
+        if kadaster_lasten_below_100:
+            mask &= self.flags["kadaster_lasten_below_100"]
+        if eigendom_after is not None:
+            mask &= self.ranges["eigendom_year"].greater_than(eigendom_after)
+        return mask
+
+    def filter(self, **filters):
+        return self.df[self.mask(**filters)]
+
+
+def unit_test_listing_index():
+    """
+    The index must select the same rows as the row-wise pandas filters it replaces.
+    """
+    rng = np.random.default_rng(7)
+    n = 5000
+    df = pd.DataFrame({
+        "price": np.where(rng.random(n) < 0.05, np.nan, rng.integers(150_000, 900_000, n)),
+        "area": np.where(rng.random(n) < 0.05, np.nan, rng.integers(20, 160, n)),
+        "neighborhood": rng.choice(["Baarsjes", "Centrum", "Oost", None], n),
+        "source": rng.choice(["funda", "makelaar", "both"], n),
+        "has_berging": rng.random(n) < 0.5,
+        "beschikbaar": rng.random(n) < 0.7,
+        "servicekosten_num": np.where(rng.random(n) < 0.3, np.nan, rng.integers(0, 300, n)),
+        "kadaster_lasten_price": np.where(rng.random(n) < 0.3, np.nan, rng.integers(0, 300, n)),
+        "eigendom_year": np.where(rng.random(n) < 0.5, np.nan, rng.integers(2020, 2080, n)),
+    })
+    df["price_per_m2"] = df["price"] / df["area"]
+    index = ListingIndex(df)
+
+    filters = dict(
+        price_per_m2_range=(2000, 8000), area_range=(50, 120), price_range=(250_000, 450_000),
+        neighborhoods=["Baarsjes", "Oost"], sources=["funda", "both"], only_berging=True, only_beschikbaar=True,
+        servicekosten_below_100=True, kadaster_lasten_below_100=True, eigendom_after=2035,
+    )
+    expected = df[
+        (df["price_per_m2"].between(2000, 8000) | df["price_per_m2"].isna()) &
+        (df["area"].between(50, 120) | df["area"].isna()) &
+        (df["price"].between(250_000, 450_000) | df["price"].isna()) &
+        df["neighborhood"].isin(["Baarsjes", "Oost"]) & df["source"].isin(["funda", "both"]) &
+        df["has_berging"] & df["beschikbaar"] &
+        ((df["servicekosten_num"] < 100) | df["servicekosten_num"].isna()) &
+        ((df["kadaster_lasten_price"] < 100) | df["kadaster_lasten_price"].isna()) &
+        (df["eigendom_year"] > 2035)
+    ]
+    result = index.filter(**filters)
+    assert result.index.tolist() == expected.index.tolist(), (len(result), len(expected))
+    assert len(index.filter()) == n
+    assert index.bounds("area") == (df["area"].min(), df["area"].max())
+
+
+if __name__ == "__main__":
+    unit_test_listing_index()
+    print("Index-backed filters select the same rows as the pandas filters.")
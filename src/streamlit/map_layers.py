@@ -0,0 +1,140 @@
+# %%
+# src/streamlit/map_layers.py
+"""
+Map layers for the dashboard.
+
+- price_colors(): RGBA per point from price/m2 as one NumPy computation (red = expensive,
+  blue = cheap), instead of a Python function returning a list per row
+- scatter_payload(): only the columns the ScatterplotLayer and its tooltip use; pydeck
+  serializes every column of its data to the browser on each rerun
+- neighborhood_layer(): the GeoJsonLayer is built once per GeoJSON file version, with
+  coordinates rounded to ~1m, and reused by every rerun and session
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+import streamlit as st
+
+NEIGHBORHOODS_GEOJSON = os.path.join("data", "neighborhoods_amsterdam.json")
+COORDINATE_DECIMALS = 5
+TOOLTIP_COLUMNS = ["label", "price_str", "area_str", "price_per_m2_str"]
+COLOR_COLUMNS = ["r", "g", "b", "a"]
+
+
+def price_colors(values, green=100, alpha=180):
+    """
+    (n, 4) uint8 RGBA array, scaled between the min and max of `values` (NaN ignored).
+    """
+    values = np.asarray(values, dtype=float)
+    colors = np.empty((len(values), 4), dtype=np.uint8)
+    if not len(values):
+        return colors
+
+    min_val, max_val = np.nanmin(values), np.nanmax(values)
+    if max_val > min_val:
+        ratio = (values - min_val) / (max_val - min_val)
+    else:
+        ratio = np.full(len(values), 0.5)
+    red = np.nan_to_num(255 * ratio, nan=0).astype(np.int64)
+
+    colors[:, 0] = red
+    colors[:, 1] = green
+    colors[:, 2] = 255 - red
+    colors[:, 3] = alpha
+    return colors
+
+
+def scatter_payload(map_df, color_column="price_per_m2"):
+    """
+    Position, color and tooltip fields of the points; nothing else is sent to the browser.
+    """
+    payload = map_df[["lon", "lat"] + [col for col in TOOLTIP_COLUMNS if col in map_df.columns]].reset_index(drop=True)
+    colors = pd.DataFrame(price_colors(map_df[color_column]), columns=COLOR_COLUMNS)
+    return pd.concat([payload, colors], axis=1)
+
+
+def scatter_layer(payload, radius=120):
+    return pdk.Layer(
+        "ScatterplotLayer",
+        data=payload,
+        get_position="[lon, lat]",
+        get_radius=radius,
+        get_fill_color="[r, g, b, a]",
+        pickable=True,
+    )
+
+
+def _round_coordinates(coordinates, decimals=COORDINATE_DECIMALS):
+    if isinstance(coordinates, (list, tuple)) and coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(c, decimals) for c in coordinates]
+    return [_round_coordinates(c, decimals) for c in coordinates]
+
+
+def compact_geojson(geojson, decimals=COORDINATE_DECIMALS):
+    """
+    Copy of a FeatureCollection with rounded coordinates and only the feature names as properties.
+    """
+    features = []
+    for feature in geojson.get("features", []):
+        geometry = feature.get("geometry") or {}
+        properties = feature.get("properties") or {}
+        features.append({
+            "type": "Feature",
+            "geometry": {**geometry, "coordinates": _round_coordinates(geometry.get("coordinates", []), decimals)},
+            "properties": {key: properties[key] for key in ("neighborhood",) if key in properties},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _neighborhood_layer(path, mtime_ns, size):
+    with open(path, "r") as f:
+        geojson = compact_geojson(json.load(f))
+    return pdk.Layer(
+        "GeoJsonLayer",
+        geojson,
+        stroked=True,
+        filled=True,
+        get_fill_color=[200, 100, 100, 40],
+        get_line_color=[255, 0, 0],
+        line_width_min_pixels=1,
+        pickable=False,
+    )
+
+
+def neighborhood_layer(path=NEIGHBORHOODS_GEOJSON):
+    stat = os.stat(path)
+    return _neighborhood_layer(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def unit_test_price_colors():
+    """
+    Same colors as the per-row scale_color the map used before.
+    """
+    values = pd.Series([2500.0, 4000.0, np.nan, 9100.0, 6333.0])
+    min_val, max_val = values.min(), values.max()
+
+    def scale_color(val):
+        ratio = (val - min_val) / (max_val - min_val) if max_val > min_val else 0.5
+        r = int(255 * ratio)
+        b = 255 - r
+        return [r, 100, b, 180]
+
+    expected = [scale_color(v) for v in values.dropna()]
+    assert price_colors(values.dropna()).tolist() == expected
+    assert price_colors([5000.0, 5000.0]).tolist() == [[127, 100, 128, 180]] * 2
+
+    payload = scatter_payload(pd.DataFrame({
+        "lon": [4.9], "lat": [52.3], "label": ["Damstraat 1"], "price_str": ["1"], "area_str": ["1"],
+        "price_per_m2_str": ["1"], "price_per_m2": [1.0], "description": ["not sent"],
+    }))
+    assert payload.columns.tolist() == ["lon", "lat"] + TOOLTIP_COLUMNS + COLOR_COLUMNS
+
+
+if __name__ == "__main__":
+    unit_test_price_colors()
+    print("Vectorized colors match the per-row color scale.")
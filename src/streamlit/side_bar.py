@@ -1,18 +1,23 @@
 # %%
 import streamlit as st
-import pandas as pd
-import os
-from datetime import timedelta
 
 
-def side_bar_filters(df):
+from src.streamlit.filter_index import ListingIndex
+
+
+def side_bar_filters(df, index=None):
+    # The index (built once per data file) answers the filters with binary searches and bitmaps
+    if index is None:
+        index = ListingIndex(df)
+    df = index.df
+
     with st.sidebar:
         st.header("Filters")
         st.markdown("Use the filters below to narrow down the listings.")
 
-        min_val, max_val = int(df['price_per_m2'].min()), int(df['price_per_m2'].max())
-        area_min, area_max = int(df['area'].min()), int(df['area'].max())
-        price_min, price_max = int(df['price'].min()), int(df['price'].max())
+        min_val, max_val = (int(v) for v in index.bounds('price_per_m2'))
+        area_min, area_max = (int(v) for v in index.bounds('area'))
+        price_min, price_max = (int(v) for v in index.bounds('price'))
 
         filter_beschikbaar = st.checkbox("✅ Only available listings", value=True)
 
@@ -57,9 +62,7 @@ def side_bar_filters(df):
         # max_woonlagen = st.slider("🏢 Max number of woonlagen", min_value=1, max_value=int(df['woonlagen_num'].max()), value=2)
 
         # Date slider
-        # Ensure 'aangeboden_date' is datetime type for filtering
-        df['aangeboden_date'] = pd.to_datetime(df['aangeboden_date'])
-
+        # 'aangeboden_date' is already parsed by the data layer
         min_date = df['aangeboden_date'].min().date()
         max_date = df['aangeboden_date'].max().date()
 
@@ -76,7 +79,7 @@ def side_bar_filters(df):
         # date_range = (pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]))
 
 
-        regions_available = sorted(str(x) for x in df["neighborhood"].dropna().unique())
+        regions_available = index.neighborhoods()
         # Pre-select specific neighborhoods if present
         preselect = [
             "Baarsjes", 
@@ -110,47 +113,20 @@ def side_bar_filters(df):
     )
 
 
-    filtered_df = df[
-        ((df['price_per_m2'] >= selected_range[0]) & (df['price_per_m2'] <= selected_range[1]) | (df['price_per_m2'].isna())) &
-        ((df['area'] >= area_range[0]) & (df['area'] <= area_range[1]) | (df['area'].isna())) &
-        ((df['price'] >= price_range[0]) & (df['price'] <= price_range[1]) | (df['price'].isna())) &
-        ((df['neighborhood'].isin(selected_regions)) if selected_regions else True)
-    ]
-
-    # external_storage_space_m2 if >0 make has_berging True
-    filtered_df['has_berging'] = filtered_df['external_storage_space_m2'].apply(lambda x: x > 0 if pd.notna(x) else False)
-
-    # if acceptance or status is beschikbaar than make beschikbaar True
-    filtered_df['beschikbaar'] = filtered_df.apply(
-        lambda row: (
-            (str(row['acceptance']).lower() == 'beschikbaar' if pd.notna(row['acceptance']) else False) or
-            (str(row['status']).lower() == 'beschikbaar' if pd.notna(row['status']) else False)
-        ),
-        axis=1
+    # has_berging, beschikbaar and the cost thresholds are precomputed flags of the index
+    mask = index.mask(
+        price_per_m2_range=selected_range,
+        area_range=area_range,
+        price_range=price_range,
+        neighborhoods=selected_regions,
+        sources=['funda', 'makelaar', 'both'] if filter_source else ['funda', 'both'],
+        only_berging=filter_berging,
+        only_beschikbaar=filter_beschikbaar,
+        servicekosten_below_100=filter_servicekosten,
+        kadaster_lasten_below_100=filter_kadaster_lasten,
+        eigendom_after=eigendom_year_threshold if filter_eigendom else None,
     )
-
-    if filter_berging:
-        filtered_df = filtered_df[filtered_df['has_berging'] == True]
-
-    if filter_servicekosten:
-        filtered_df = filtered_df[
-            (filtered_df['servicekosten_num'] < 100) | (filtered_df['servicekosten_num'].isna())
-        ]
-    
-
-    if filter_beschikbaar:
-        filtered_df = filtered_df[filtered_df['beschikbaar'] == True]
-    if filter_source:
-        filtered_df = filtered_df[filtered_df['source'].isin(['funda', 'makelaar', 'both'])]
-    else:
-        filtered_df = filtered_df[filtered_df['source'].isin(['funda', 'both'])]
-    if filter_kadaster_lasten:
-        filtered_df = filtered_df[
-            (filtered_df['kadaster_lasten_price'] < 100) | (filtered_df['kadaster_lasten_price'].isna())
-        ]
-
-    if filter_eigendom:
-        filtered_df = filtered_df[filtered_df['eigendom_year'] > 2035]
+    filtered_df = df[mask]
 
     # filtered_df = filtered_df[
     #     # ((filtered_df['num_kamers'] > min_kamers) | (filtered_df['num_kamers'].isna())) &
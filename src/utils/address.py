@@ -0,0 +1,167 @@
+# %%
+# src/utils/address.py
+"""
+Vectorized address normalizer shared by the makelaar and rental pipelines.
+
+All functions take a whole column (pd.Series) and use pandas string operations,
+instead of running a regex and building a pd.Series per row.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CITY = "Amsterdam"
+
+# Everything before the last separator is the address, the rest is the city
+IN_CITY_PATTERN = re.compile(r"^(.*) in (.*)$", re.DOTALL)
+COMMA_CITY_PATTERN = re.compile(r"^(.*),(.*)$", re.DOTALL)
+# Street up to the first digit, house number + extension from there
+STREET_NUMBER_PATTERN = re.compile(r"(\D*?)(\d.*)")
+STREET_PREFIX_PATTERN = re.compile(r"^(.*?)\d")
+
+
+def _as_text(series):
+    """
+    Object Series with non-string values replaced by None.
+    """
+    is_text = series.map(lambda v: isinstance(v, str)).astype(bool)
+    return series.astype(object).where(is_text, None), is_text
+
+
+def split_city(series):
+    """
+    Splits 'Damstraat 1 in Amsterdam' / 'Damstraat 1, Amsterdam' on the last ' in ' or comma.
+
+    Returns:
+        (address, city): city is None when there is no separator
+    """
+    text, _ = _as_text(series)
+    address = text.copy()
+    city = pd.Series(None, index=series.index, dtype=object)
+
+    has_in = text.str.contains(" in ", regex=False).fillna(False).astype(bool)
+    has_comma = ~has_in & text.str.contains(",", regex=False).fillna(False).astype(bool)
+
+    for mask, pattern in ((has_in, IN_CITY_PATTERN), (has_comma, COMMA_CITY_PATTERN)):
+        if mask.any():
+            parts = text[mask].str.extract(pattern)
+            address[mask] = parts[0].str.strip()
+            city[mask] = parts[1].str.strip()
+    return address, city
+
+
+def split_street_number(series):
+    """
+    Splits 'Damstraat 1-3' into street 'Damstraat' and number_extension '1-3'.
+    Without a digit the whole value is the street and number_extension is None.
+    """
+    text, is_text = _as_text(series)
+    parts = text.str.extract(STREET_NUMBER_PATTERN)
+    has_number = parts[1].notna()
+
+    street = text.str.strip().where(~has_number, parts[0].str.strip()).where(is_text, None)
+    number_extension = parts[1].str.strip().where(has_number, None)
+    return street, number_extension
+
+
+def extract_street(series):
+    """
+    Street part of an address (everything before the first digit, stripped);
+    values without a digit are returned unchanged.
+    """
+    prefix = series.astype(object).str.extract(STREET_PREFIX_PATTERN)[0].str.strip()
+    return prefix.where(prefix.notna(), series)
+
+
+def join_nonempty(*columns, sep=" "):
+    """
+    Row-wise ' '.join of the non-empty values of several columns, as whole-column operations.
+    """
+    result = None
+    for column in columns:
+        column = column.astype(object).where(column.notna(), "").astype(str)
+        if result is None:
+            result = column
+            continue
+        separator = np.where((result != "") & (column != ""), sep, "")
+        result = result + separator + column
+    return result
+
+
+def normalize_addresses(series, default_city=DEFAULT_CITY):
+    """
+    Parses free-form broker addresses into street, number_extension and city,
+    and composes the strings used for geocoding.
+
+    Returns:
+        pd.DataFrame: 'street', 'number_extension', 'city',
+                      'full_address_processed', 'full_address_streets'
+    """
+    address, city = split_city(series)
+    street, number_extension = split_street_number(address)
+
+    # The city sometimes ends up in the number part ('12 Amsterdam')
+    number_extension = (
+        number_extension
+        .replace(default_city, "")
+        .str.replace(rf"\b{re.escape(default_city)}\b", "", regex=True)
+        .str.strip()
+    )
+    city = city.fillna(default_city)
+
+    return pd.DataFrame({
+        "street": street,
+        "number_extension": number_extension,
+        "city": city,
+        "full_address_processed": join_nonempty(street, number_extension, city),
+        "full_address_streets": join_nonempty(street, city),
+    }, index=series.index)
+
+
+def unit_test_normalize_addresses():
+    """
+    Parity check against the old row-wise split of prepare_address_fields.
+    """
+    def split_address(addr):
+        if not isinstance(addr, str):
+            return [None, None, None]
+        city = None
+        if ' in ' in addr:
+            city = addr.split(' in ')[-1].strip()
+            addr = ' in '.join(addr.split(' in ')[:-1]).strip()
+        elif ',' in addr:
+            city = addr.split(',')[-1].strip()
+            addr = ','.join(addr.split(',')[:-1]).strip()
+        match = re.search(r'(\D*?)(\d.*)', addr)
+        if match:
+            return [match.group(1).strip(), match.group(2).strip(), city]
+        return [addr.strip(), None, city]
+
+    addresses = pd.Series([
+        "Damstraat 1 in Amsterdam", "Van Hallstraat 12-3, Amsterdam", "Keizersgracht 100 A",
+        "Wonen in de Pijp 3 in Amsterdam", "Prinsengracht 2, 1015 DX, Amsterdam", "1e Helmersstraat 5",
+        "Nieuwbouwproject", None, "Jan Evertsenstraat 7 Amsterdam",
+    ])
+    result = normalize_addresses(addresses)
+
+    for i, addr in addresses.items():
+        street, number_extension, city = split_address(addr)
+        if number_extension is not None:
+            number_extension = re.sub(r'\bAmsterdam\b', '', number_extension).strip()
+        expected = [street, number_extension, city or DEFAULT_CITY]
+        actual = result.loc[i, ["street", "number_extension", "city"]].tolist()
+        actual = [None if pd.isna(v) else v for v in actual]
+        assert actual == expected, f"{addr!r}: {actual} != {expected}"
+
+        full = ' '.join(filter(None, expected))
+        assert result.loc[i, "full_address_processed"] == full, f"{addr!r}: {result.loc[i, 'full_address_processed']!r} != {full!r}"
+
+    streets = extract_street(pd.Series(["Damstraat 1", "Noordermarkt", "  Kerkstraat 12 B"]))
+    assert streets.tolist() == ["Damstraat", "Noordermarkt", "Kerkstraat"], streets.tolist()
+
+
+if __name__ == "__main__":
+    unit_test_normalize_addresses()
+    print("Vectorized address parsing matches the row-wise parser.")
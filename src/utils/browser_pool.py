@@ -0,0 +1,183 @@
+# %%
+# src/utils/browser_pool.py
+"""
+Pool of long-lived headless browsers for the Selenium fallback paths.
+
+Starting Chrome takes seconds, so drivers are created once, checked out per page
+and returned afterwards. A driver is health-checked on checkout and recycled after
+`max_pages` page loads (or when it died), so memory leaks in the browser do not pile up.
+Cookies are cleared when a driver goes back to the pool; pipelines expect a browser
+without cookies.
+"""
+
+import atexit
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PAGES = 50
+
+
+class BrowserPool:
+    """
+    Thread-safe pool of Selenium drivers created by `driver_factory`.
+    """
+
+    def __init__(self, driver_factory, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES, checkout_timeout=300):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create(self):
+        driver = self.driver_factory()
+        self._pages[id(driver)] = 0
+        logging.info(f"🚀 Started browser {self._created}/{self.size} for the pool")
+        return driver
+
+    def _destroy(self, driver):
+        self._pages.pop(id(driver), None)
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"⚠️ Failed to quit browser: {e}")
+
+    @staticmethod
+    def is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """
+        Returns an idle healthy driver, starts a new one while below `size`,
+        otherwise waits for a driver to be released.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = None
+
+            if driver is None:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                driver = self._idle.get(timeout=self.checkout_timeout)
+
+            if self.is_healthy(driver):
+                return driver
+            logging.warning("⚠️ Browser in pool is unresponsive, replacing it.")
+            self._destroy(driver)
+
+    @staticmethod
+    def clear_cookies(driver):
+        """
+        Removes the cookies of all domains, so the next page starts like a fresh browser.
+        Returns False when the driver could not be reset.
+        """
+        try:
+            # delete_all_cookies only clears the domain of the current page
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            return True
+        except Exception:
+            pass
+        try:
+            driver.delete_all_cookies()
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️ Could not clear browser cookies: {e}")
+            return False
+
+    def release(self, driver, broken=False):
+        """
+        Returns a driver to the pool with its cookies cleared, or quits it when it is broken,
+        has served `max_pages` or could not be reset.
+        """
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        if broken or self._closed or self._pages[id(driver)] >= self.max_pages or not self.clear_cookies(driver):
+            self._destroy(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = not self.is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def get_page_source(self, url):
+        """
+        Loads `url` in a pooled browser and returns the page source.
+        """
+        with self.driver() as driver:
+            driver.get(url)
+            return driver.page_source
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._destroy(driver)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool(service=None, options=None, local=False, executable_path=None, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+    """
+    Returns the shared pool for a (service, options) combination, creating it on first use.
+    With `local=True` an Edge driver at `executable_path` is used instead of Chrome.
+    """
+    key = (id(service), id(options), local, executable_path)
+    with _pools_lock:
+        if key not in _pools:
+            if local:
+                factory = lambda: webdriver.Edge(executable_path=executable_path, options=options)
+            else:
+                factory = lambda: webdriver.Chrome(service=service, options=options)
+            _pools[key] = BrowserPool(factory, size=size, max_pages=max_pages)
+        return _pools[key]
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,223 @@
+# %%
+# src/utils/gazetteer.py
+"""
+Offline street-level gazetteer built from addresses we already geocoded.
+
+Lookups are answered in memory, in this order:
+1. exact street + house number (incl. addition, e.g. '10-2')
+2. interpolation along the street between the nearest known house numbers
+   (same side of the street when possible: odd/even numbers), only when those are at
+   most MAX_INTERPOLATION_GAP apart
+3. street centroid, only when no house number is given
+
+A house number outside the known range, or between known numbers that are too far
+apart, gets no answer: those addresses are left for the remote geocoder, like
+addresses on unknown streets.
+"""
+
+import re
+import logging
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from src.utils.geocode_cache import get_geocode_cache
+
+EXACT = "exact"
+INTERPOLATED = "interpolated"
+STREET = "street"
+# Largest difference between the two known house numbers we interpolate between
+MAX_INTERPOLATION_GAP = 20
+# Answers older versions cached for numbered addresses that are too coarse to keep
+STALE_CACHE_SOURCES = ("gazetteer_extrapolated", "gazetteer_street")
+
+ADDRESS_PATTERN = re.compile(r'^(\D*?)\s*(\d.*?)(?:\s+amsterdam)?$', re.IGNORECASE)
+
+
+def normalize_street(street):
+    if not isinstance(street, str):
+        return None
+    street = re.sub(r"[^\w\s]", " ", street.lower())
+    street = re.sub(r"\s+", " ", street).strip()
+    return street or None
+
+
+def normalize_number(number):
+    if number is None or (isinstance(number, float) and np.isnan(number)):
+        return None
+    number = re.sub(r"\.0$", "", str(number).strip().lower())
+    number = re.sub(r"[^\w\-]", "", number)
+    return number or None
+
+
+def house_number(number):
+    """
+    Leading numeric part of a house number ('10-2' -> 10), or None.
+    """
+    match = re.match(r"(\d+)", normalize_number(number) or "")
+    return int(match.group(1)) if match else None
+
+
+class Gazetteer:
+    def __init__(self):
+        self.exact = {}
+        self._points = {}  # street -> {house number: [(lat, lon), ...]}
+        self._streets = {}  # street -> (numbers, lats, lons) sorted by number
+
+    def add(self, street, number, lat, lon):
+        street = normalize_street(street)
+        if street is None or pd.isna(lat) or pd.isna(lon):
+            return
+        lat, lon = float(lat), float(lon)
+
+        key_number = normalize_number(number)
+        if key_number is not None:
+            self.exact.setdefault((street, key_number), (lat, lon))
+
+        self._points.setdefault(street, {}).setdefault(house_number(number), []).append((lat, lon))
+        self._streets.pop(street, None)
+
+    def add_frame(self, df, street_col, number_col, lat_col, lon_col):
+        if df is None or df.empty or not {street_col, number_col, lat_col, lon_col}.issubset(df.columns):
+            return
+        subset = df[[street_col, number_col, lat_col, lon_col]].dropna(subset=[street_col, lat_col, lon_col])
+        for street, number, lat, lon in subset.itertuples(index=False):
+            self.add(street, number, lat, lon)
+
+    def _street_arrays(self, street):
+        if street not in self._streets:
+            points = self._points.get(street)
+            if not points:
+                return None
+            numbers, lats, lons = [], [], []
+            for number, coords in points.items():
+                coords = np.asarray(coords)
+                numbers.append(-1 if number is None else number)
+                lats.append(coords[:, 0].mean())
+                lons.append(coords[:, 1].mean())
+            order = np.argsort(numbers)
+            self._streets[street] = (np.asarray(numbers)[order], np.asarray(lats)[order], np.asarray(lons)[order])
+        return self._streets[street]
+
+    def lookup(self, street, number=None, max_gap=MAX_INTERPOLATION_GAP):
+        """
+        Returns (lat, lon, quality) or None when the street is unknown, or when a house
+        number is given that can't be placed exactly or interpolated within `max_gap`.
+        """
+        street = normalize_street(street)
+        if street is None:
+            return None
+
+        key_number = normalize_number(number)
+        if key_number is not None and (street, key_number) in self.exact:
+            return (*self.exact[(street, key_number)], EXACT)
+
+        arrays = self._street_arrays(street)
+        if arrays is None:
+            return None
+        numbers, lats, lons = arrays
+
+        if key_number is None:
+            return (float(lats.mean()), float(lons.mean()), STREET)
+
+        target = house_number(number)
+        known = numbers >= 0
+        if target is None or not known.any():
+            return None
+
+        # Prefer the same side of the street (odd/even) when we know two points on it
+        same_side = known & (numbers % 2 == target % 2)
+        mask = same_side if same_side.sum() >= 2 else known
+        numbers, lats, lons = numbers[mask], lats[mask], lons[mask]
+
+        # Only between two known numbers that are close enough, never past the ends of the street
+        right = int(np.searchsorted(numbers, target))
+        if right < len(numbers) and numbers[right] == target:
+            return (float(lats[right]), float(lons[right]), INTERPOLATED)
+        if right == 0 or right == len(numbers) or numbers[right] - numbers[right - 1] > max_gap:
+            return None
+        lat = float(np.interp(target, numbers, lats))
+        lon = float(np.interp(target, numbers, lons))
+        return (lat, lon, INTERPOLATED)
+
+    def lookup_address(self, address):
+        """
+        Lookup on a free-form address such as 'Van Hallstraat 1 Amsterdam'.
+        """
+        if not isinstance(address, str):
+            return None
+        match = ADDRESS_PATTERN.match(address.strip().rstrip(","))
+        if match:
+            return self.lookup(match.group(1), match.group(2).split()[0])
+        return self.lookup(address)
+
+    def __len__(self):
+        return len(self.exact)
+
+
+def build_gazetteer():
+    """
+    Builds the gazetteer from the listing store (Funda + makelaars) and the geocode cache.
+    """
+    from src.utils import listing_store
+
+    gazetteer = Gazetteer()
+
+    for source, columns in (
+        ("funda", ["street_name", "number", "lat", "lon"]),
+        ("makelaar", ["street", "number_extension", "latitude", "longitude"]),
+    ):
+        try:
+            df = listing_store.read_listings(source, columns=columns)
+        except Exception as e:
+            # Without this source far more lookups go to the remote geocoder
+            logging.warning(f"⚠️ Gazetteer built without the '{source}' listing store, it could not be read: {e}")
+            continue
+        gazetteer.add_frame(df, *columns)
+
+    try:
+        cache = get_geocode_cache()
+        dropped = cache.delete_sources(STALE_CACHE_SOURCES)
+        if dropped:
+            logging.info(f"🧹 Dropped {dropped} clamped or street-level gazetteer answers from the geocode cache")
+        # Only real geocoder results; gazetteer answers themselves would just echo the interpolation
+        cached = cache.to_frame()
+        cached = cached[~cached["source"].fillna("").str.startswith("gazetteer")]
+        for address, lat, lon in cached[["address", "lat", "lon"]].itertuples(index=False):
+            match = ADDRESS_PATTERN.match(str(address).strip())
+            if match:
+                gazetteer.add(match.group(1), match.group(2).split()[0], lat, lon)
+    except Exception as e:
+        logging.warning(f"⚠️ Could not read the geocode cache for gazetteer: {e}")
+
+    logging.info(f"📖 Gazetteer built with {len(gazetteer)} addresses on {len(gazetteer._points)} streets")
+    return gazetteer
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    return build_gazetteer()
+
+
+def unit_test_lookup():
+    gazetteer = Gazetteer()
+    for number, lat in ((10, 52.30), (20, 52.31), (30, 52.32)):
+        gazetteer.add("Damstraat", number, lat, 4.90)
+
+    assert gazetteer.lookup("damstraat", "20") == (52.31, 4.90, EXACT)
+    lat, _, quality = gazetteer.lookup("Damstraat", "14")
+    assert quality == INTERPOLATED and abs(lat - 52.304) < 1e-9
+    assert gazetteer.lookup("Damstraat", "20-3") == (52.31, 4.90, INTERPOLATED)
+    # Outside the known numbers or across a large gap: left for the remote geocoder
+    assert gazetteer.lookup("Damstraat", "50") is None
+    assert gazetteer.lookup("Damstraat", "2") is None
+    gazetteer.add("Damstraat", 80, 52.33, 4.90)
+    assert gazetteer.lookup("Damstraat", "56") is None
+    assert gazetteer.lookup("Damstraat")[2] == STREET
+    assert gazetteer.lookup("Singel", "1") is None
+
+
+if __name__ == "__main__":
+    unit_test_lookup()
+    print("Gazetteer lookups are labelled as expected.")
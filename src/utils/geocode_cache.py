@@ -0,0 +1,203 @@
+# %%
+# src/utils/geocode_cache.py
+"""
+Single geocode cache shared by the Funda, makelaar and rental pipelines.
+
+Backed by SQLite (WAL mode), so every new result is one O(1) upsert instead of
+rewriting a pickle + CSV. Keys are normalized addresses, so 'Damstraat 2, Amsterdam'
+and 'damstraat 2 amsterdam' hit the same entry. Failed lookups are cached as
+negative results that expire after NEGATIVE_TTL_DAYS, so they get retried eventually.
+
+Two kinds of entries exist: 'address' (street + house number) and 'street'
+(street-level results from the rental coordinate finder, with extra info).
+"""
+
+import os
+import re
+import json
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+
+import pandas as pd
+
+from src.utils.config import DATA_DIR
+
+CACHE_PATH = os.path.join(DATA_DIR, "geo_information", "geocode_cache.sqlite")
+LEGACY_PICKLE_PATH = os.path.join(DATA_DIR, "geo_information", "geo_cache.pkl")
+NEGATIVE_TTL_DAYS = 30
+
+ADDRESS = "address"
+STREET = "street"
+
+# Marker for a cached failed lookup
+NOT_FOUND = (None, None)
+
+_DROP_TOKENS = {"netherlands", "nederland", "nl"}
+
+
+def normalize_address(address):
+    """
+    Lowercases, removes punctuation except '-', and drops country names.
+    """
+    if not isinstance(address, str):
+        return None
+    address = re.sub(r"[^\w\s\-]", " ", address.lower())
+    tokens = [t for t in address.split() if t not in _DROP_TOKENS]
+    return " ".join(tokens) or None
+
+
+class GeocodeCache:
+    def __init__(self, path=CACHE_PATH, negative_ttl_days=NEGATIVE_TTL_DAYS):
+        self.path = path
+        self.negative_ttl = negative_ttl_days * 24 * 60 * 60
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                address TEXT,
+                lat REAL,
+                lon REAL,
+                found INTEGER NOT NULL,
+                source TEXT,
+                extra TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+
+    def get(self, address, kind=ADDRESS):
+        """
+        Returns (lat, lon) for a hit, NOT_FOUND for a fresh negative result,
+        or None when the address is unknown (or its negative result expired).
+        """
+        key = normalize_address(address)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lon, found, updated_at FROM geocode WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        if row is None:
+            return None
+        lat, lon, found, updated_at = row
+        if found:
+            return (lat, lon)
+        if time.time() - updated_at < self.negative_ttl:
+            return NOT_FOUND
+        return None
+
+    def get_extra(self, address, kind=STREET):
+        key = normalize_address(address)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT extra FROM geocode WHERE kind = ? AND key = ? AND found = 1", (kind, key)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def put(self, address, lat, lon, source=None, kind=ADDRESS, extra=None):
+        """
+        Upserts one result. Pass lat/lon None to store a negative result.
+        """
+        self.put_many([(address, lat, lon)], source=source, kind=kind, extras=[extra])
+
+    def put_many(self, records, source=None, kind=ADDRESS, extras=None, overwrite=True):
+        """
+        Upserts many (address, lat, lon) records in one transaction.
+        With overwrite=False existing entries are kept (used for backfills).
+        """
+        now = time.time()
+        extras = extras or [None] * len(records)
+        rows = []
+        for (address, lat, lon), extra in zip(records, extras):
+            key = normalize_address(address)
+            if key is None:
+                continue
+            found = int(lat is not None and lon is not None and not pd.isna(lat) and not pd.isna(lon))
+            rows.append((
+                kind, key, address,
+                float(lat) if found else None,
+                float(lon) if found else None,
+                found, source,
+                json.dumps(extra, default=str) if extra else None,
+                now,
+            ))
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(f"{verb} INTO geocode VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def import_frame(self, df, address_col, lat_col, lon_col, source, kind=ADDRESS):
+        """
+        Backfills the cache from a frame of already geocoded rows, keeping existing entries.
+        """
+        if df is None or df.empty or not {address_col, lat_col, lon_col}.issubset(df.columns):
+            return 0
+        subset = df[[address_col, lat_col, lon_col]].dropna()
+        return self.put_many(list(subset.itertuples(index=False, name=None)), source=source, kind=kind, overwrite=False)
+
+    def delete_sources(self, sources, kind=ADDRESS):
+        """
+        Removes all entries written by the given sources; returns the number of removed rows.
+        """
+        sources = list(sources)
+        if not sources:
+            return 0
+        placeholders = ", ".join("?" * len(sources))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM geocode WHERE kind = ? AND source IN ({placeholders})", (kind, *sources)
+            )
+        return cursor.rowcount
+
+    def to_frame(self, kind=ADDRESS, found_only=True):
+        query = "SELECT address, lat, lon, source, extra, updated_at FROM geocode WHERE kind = ?"
+        if found_only:
+            query += " AND found = 1"
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=(kind,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_geocode_cache():
+    """
+    Returns the process-wide cache. On first creation, the legacy geo_cache.pkl is imported.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            is_new = not os.path.exists(CACHE_PATH)
+            _cache = GeocodeCache()
+            if is_new:
+                migrate_legacy_pickle(_cache)
+    return _cache
+
+
+def migrate_legacy_pickle(cache, pickle_path=LEGACY_PICKLE_PATH):
+    if not os.path.exists(pickle_path):
+        return
+    try:
+        with open(pickle_path, "rb") as f:
+            legacy = pickle.load(f)
+        records = [(address, lat, lon) for address, (lat, lon) in legacy.items()]
+        cache.put_many(records, source="legacy_pickle", overwrite=False)
+        logging.info(f"📦 Imported {len(records)} addresses from {pickle_path} into the geocode cache")
+    except Exception as e:
+        logging.warning(f"⚠️ Could not import {pickle_path}: {e}")
@@ -1,18 +1,95 @@
+import os
+import threading
 import requests
 import logging
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils import html_cache
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def get_html(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
-    response = requests.get(url, headers=headers, verify=False)
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+
+# (connect, read) timeout in seconds, can be overridden per environment
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 20))
+
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+BACKOFF_FACTOR = 0.5
+POOL_CONNECTIONS = 32  # number of hosts we keep a pool for
+POOL_MAXSIZE = 8  # keep-alive connections per host
+
+# Only advertise brotli when urllib3 is able to decode it
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+_session = None
+_session_lock = threading.Lock()
+
+def build_session() -> requests.Session:
+    """
+    Builds a requests Session with per-host connection pooling, keep-alive and
+    bounded retries with exponential backoff on connection errors and 429/5xx responses.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    session.verify = False
+    return session
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide Session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+def fetch(url, headers=None, timeout=None):
+    """
+    Performs a GET through the shared Session and returns the response.
+    Raises requests.RequestException once the retries are exhausted.
+    """
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    return get_session().get(url, headers=headers, timeout=timeout)
+
+def get_html(url, timeout=None, use_cache=True):
+    try:
+        if use_cache:
+            return html_cache.cached_get_html(url, fetch, timeout=timeout)
+        response = fetch(url, timeout=timeout)
+    except requests.RequestException as e:
+        logging.warning(f"Failed to retrieve page {url}: {e}")
+        return None
     if response.status_code == 200:
         # logging.info(f"Successfully retrieved page: {url}")
         return response.text
     else:
         # print(f"Failed to retrieve page with status code: {response.status_code}")
         return None
-    
\ No newline at end of file
@@ -4,12 +4,17 @@ import gspread
 import pandas as pd
 import os
 import math
+import json
+import time
+import sqlite3
+import threading
+from contextlib import closing
 
 GOOGLE_SREVICE_JSON_KEY = os.getenv("GOOGLE_SERVICE_JSON_KEY",None)
 
 from src.utils import base64_decoder
 from src.utils.config import logging
-from src.utils.config import GEOCODED_STREETS, RENTAL_DB
+from src.utils.config import GEOCODED_STREETS, RENTAL_DB, DATA_DIR
 
 def clean_value(v):
     if isinstance(v, pd.Timestamp):
@@ -20,24 +25,150 @@ def clean_value(v):
         return v
     return str(v)
 
-def read_sheet_to_df(sheet_id: str, sheet_index: int = 0) -> pd.DataFrame:
-    import pandas as pd
-    import gspread
-    from google.oauth2.service_account import Credentials
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    # only used to read the revision (last update time) of a spreadsheet
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
 
-    if GOOGLE_SREVICE_JSON_KEY:
-        creds_dict = base64_decoder.decode_base64_to_json(GOOGLE_SREVICE_JSON_KEY)
-    else:
-        raise ValueError("Missing GOOGLE_SERVICE_JSON_KEY environment variable.")
-    
-    SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-    client = gspread.authorize(creds)
+# Sheets that get a persisted local snapshot (SQLite), reused across runs while the revision matches
+MIRRORED_SHEETS = {RENTAL_DB, GEOCODED_STREETS}
+MIRROR_PATH = os.path.join(DATA_DIR, "cache", "sheets_mirror.sqlite")
+
+_client = None
+_worksheets = {}
+_values = {}  # (sheet_id, sheet_index) -> (revision, all_values), in-process mirror
+_lock = threading.RLock()
+
+
+def _get_client():
+    """
+    Process-wide gspread client; the service key is decoded and authorized only once.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            if GOOGLE_SREVICE_JSON_KEY:
+                creds_dict = base64_decoder.decode_base64_to_json(GOOGLE_SREVICE_JSON_KEY)
+            else:
+                raise ValueError("Missing GOOGLE_SERVICE_JSON_KEY environment variable.")
+            creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+            _client = gspread.authorize(creds)
+        return _client
+
+
+def _open_worksheet(sheet_id: str, sheet_index: int = 0):
+    with _lock:
+        key = (sheet_id, sheet_index)
+        if key not in _worksheets:
+            spreadsheet = _get_client().open_by_key(sheet_id)
+            _worksheets[key] = spreadsheet.get_worksheet(sheet_index)
+        return _worksheets[key]
+
+
+def _get_revision(worksheet):
+    """
+    Last update time of the spreadsheet, or None when the Drive metadata is not available.
+    """
+    spreadsheet = worksheet.spreadsheet
+    try:
+        if hasattr(spreadsheet, "get_lastUpdateTime"):
+            return spreadsheet.get_lastUpdateTime()
+        return spreadsheet.lastUpdateTime
+    except Exception as e:
+        logging.debug(f"Could not read revision of sheet {spreadsheet.id}: {e}")
+        return None
+
+
+def _mirror_connection():
+    os.makedirs(os.path.dirname(MIRROR_PATH), exist_ok=True)
+    conn = sqlite3.connect(MIRROR_PATH)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS snapshot (
+            sheet_id TEXT NOT NULL,
+            sheet_index INTEGER NOT NULL,
+            revision TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            all_values TEXT NOT NULL,
+            PRIMARY KEY (sheet_id, sheet_index)
+        )
+    """)
+    return conn
+
+
+def _read_mirror(sheet_id, sheet_index, revision):
+    try:
+        with closing(_mirror_connection()) as conn:
+            row = conn.execute(
+                "SELECT all_values FROM snapshot WHERE sheet_id = ? AND sheet_index = ? AND revision = ?",
+                (sheet_id, sheet_index, revision),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    except Exception as e:
+        logging.warning(f"Could not read sheet mirror: {e}")
+        return None
+
+
+def _write_mirror(sheet_id, sheet_index, revision, all_values):
+    try:
+        with closing(_mirror_connection()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?, ?, ?)",
+                (sheet_id, sheet_index, revision, time.time(), json.dumps(all_values)),
+            )
+    except Exception as e:
+        logging.warning(f"Could not write sheet mirror: {e}")
+
+
+def invalidate_sheet_cache(sheet_id: str, sheet_index: int = 0) -> None:
+    """
+    Drops the local copies of a sheet, called after every write to it.
+    """
+    with _lock:
+        _values.pop((sheet_id, sheet_index), None)
+    if sheet_id in MIRRORED_SHEETS:
+        try:
+            with closing(_mirror_connection()) as conn, conn:
+                conn.execute("DELETE FROM snapshot WHERE sheet_id = ? AND sheet_index = ?", (sheet_id, sheet_index))
+        except Exception as e:
+            logging.warning(f"Could not invalidate sheet mirror: {e}")
+
+
+def get_all_values(sheet_id: str, sheet_index: int = 0, use_mirror: bool = True) -> list:
+    """
+    Returns all cell values of a worksheet, from a local copy when the sheet did not change.
+
+    Within one run the values are kept in memory (writes through this module invalidate them).
+    For MIRRORED_SHEETS a SQLite snapshot is reused across runs while the revision matches.
+    """
+    key = (sheet_id, sheet_index)
+    worksheet = _open_worksheet(sheet_id, sheet_index)
+    revision = _get_revision(worksheet) if use_mirror else None
 
-    spreadsheet = client.open_by_key(sheet_id)
-    worksheet = spreadsheet.get_worksheet(sheet_index)
+    with _lock:
+        if use_mirror and key in _values:
+            cached_revision, all_values = _values[key]
+            if revision is None or cached_revision == revision:
+                return all_values
 
-    all_data = worksheet.get_all_values()
+    all_values = None
+    if use_mirror and revision is not None and sheet_id in MIRRORED_SHEETS:
+        all_values = _read_mirror(sheet_id, sheet_index, revision)
+        if all_values is not None:
+            logging.info(f"Using local mirror of sheet {sheet_id} (revision {revision}).")
+
+    if all_values is None:
+        all_values = worksheet.get_all_values()
+        if revision is not None and sheet_id in MIRRORED_SHEETS:
+            _write_mirror(sheet_id, sheet_index, revision, all_values)
+
+    with _lock:
+        _values[key] = (revision, all_values)
+    return all_values
+
+
+def read_sheet_to_df(sheet_id: str, sheet_index: int = 0, use_mirror: bool = True) -> pd.DataFrame:
+    all_data = get_all_values(sheet_id, sheet_index, use_mirror=use_mirror)
     if not all_data:
         return pd.DataFrame()
 
@@ -80,17 +211,8 @@ def replace_full_table(
     if data.empty:
         raise ValueError("DataFrame is empty. Aborting write operation.")
 
-    if GOOGLE_SREVICE_JSON_KEY:
-        creds_dict = base64_decoder.decode_base64_to_json(GOOGLE_SREVICE_JSON_KEY)
-    else:
-        raise ValueError("Missing GOOGLE_SERVICE_JSON_KEY environment variable.")
-    
-    SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-    client = gspread.authorize(creds)
-
-    spreadsheet = client.open_by_key(sheet_id)
-    worksheet = spreadsheet.get_worksheet(sheet_index)
+    worksheet = _open_worksheet(sheet_id, sheet_index)
+    invalidate_sheet_cache(sheet_id, sheet_index)
 
     # Clear existing content
     worksheet.clear()
@@ -117,20 +239,11 @@ def append_row_to_sheet(
     - sheet_index: Index of the worksheet (default = 0 for first sheet)
     - credentials_path: Path to the service account JSON file
     """
-    if GOOGLE_SREVICE_JSON_KEY:
-        credentials_path = base64_decoder.decode_base64_to_json(GOOGLE_SREVICE_JSON_KEY)
-    print(f"Using credentials from: {credentials_path}")
-    
     if not isinstance(data, pd.DataFrame):
         raise ValueError("`data` must be a pandas DataFrame")
 
-    SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-    creds_dict = base64_decoder.decode_base64_to_json(GOOGLE_SREVICE_JSON_KEY)
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-    client = gspread.authorize(creds)
-
-    spreadsheet = client.open_by_key(sheet_id)
-    worksheet = spreadsheet.get_worksheet(sheet_index)
+    worksheet = _open_worksheet(sheet_id, sheet_index)
+    invalidate_sheet_cache(sheet_id, sheet_index)
 
     header = worksheet.row_values(1)
     num_columns = len(header)
@@ -150,6 +263,74 @@ def append_row_to_sheet(
 
     logging.info(f"Appended {len(data)} rows to sheet {sheet_id} at index {sheet_index}.")
 
+class SheetRowIndex:
+    """
+    Key -> row-number index over one worksheet, used to update single cells
+    instead of clearing and re-uploading the whole table.
+
+    Only the header row and the key column are downloaded to build the index.
+    """
+
+    def __init__(self, worksheet, key_column: str):
+        self.worksheet = worksheet
+        self.key_column = key_column
+        self.header = [col.strip() for col in worksheet.row_values(1)]
+        if key_column not in self.header:
+            raise ValueError(f"Key column '{key_column}' not found in sheet header.")
+
+        key_col_number = self.header.index(key_column) + 1
+        keys = worksheet.col_values(key_col_number)[1:]  # skip header
+
+        # A key can appear on several rows (e.g. the same link scraped on several days)
+        self.rows = {}
+        for offset, key in enumerate(keys):
+            self.rows.setdefault(key.strip(), []).append(offset + 2)  # sheet rows are 1-based + header
+
+    def update(self, updates: dict) -> int:
+        """
+        Writes only the given cells in one batched request.
+
+        Parameters:
+        - updates: {key: {column_name: value}}; every row with that key is updated
+
+        Returns the number of cells written.
+        """
+        data = []
+        for key, values in updates.items():
+            for row_number in self.rows.get(str(key).strip(), []):
+                for column, value in values.items():
+                    if column not in self.header:
+                        raise ValueError(f"Column '{column}' not found in sheet header.")
+                    a1 = gspread.utils.rowcol_to_a1(row_number, self.header.index(column) + 1)
+                    data.append({"range": a1, "values": [[clean_value(value)]]})
+
+        if data:
+            self.worksheet.batch_update(data, value_input_option="USER_ENTERED")
+        logging.info(f"Updated {len(data)} cells in sheet {self.worksheet.spreadsheet.id}.")
+        return len(data)
+
+
+def update_rows_by_key(
+    sheet_id: str,
+    key_column: str,
+    updates: dict,
+    sheet_index: int = 0,
+) -> int:
+    """
+    Updates individual cells of the rows identified by `key_column`.
+
+    Parameters:
+    - sheet_id: The unique Google Sheet ID
+    - key_column: Header of the column used to find rows (e.g. 'link')
+    - updates: {key: {column_name: value}}
+    - sheet_index: Index of the worksheet/tab (default is 0)
+    """
+    if not updates:
+        return 0
+    worksheet = _open_worksheet(sheet_id, sheet_index)
+    invalidate_sheet_cache(sheet_id, sheet_index)
+    return SheetRowIndex(worksheet, key_column).update(updates)
+
 if __name__ == "__main__":
     # Example usage
     # columsn
@@ -0,0 +1,250 @@
+# %%
+# src/utils/html_cache.py
+"""
+On-disk response cache for scraped pages.
+
+Every URL gets a small JSON entry (ETag, Last-Modified, time fetched, hash of the body).
+Bodies are stored zlib-compressed under the SHA-256 of their content, so identical pages
+are stored once. Within the TTL a cached body is returned without any request; after
+the TTL the page is revalidated with a conditional GET, which costs only a 304 when
+the page did not change. The cache is bounded in size and evicts least recently used entries.
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+
+from src.utils.config import DATA_DIR
+
+CACHE_DIR = os.getenv("HTML_CACHE_DIR", os.path.join(DATA_DIR, "cache", "html"))
+CACHE_ENABLED = os.getenv("HTML_CACHE_ENABLED", "1") not in ("0", "false", "False")
+CACHE_TTL_SECONDS = int(os.getenv("HTML_CACHE_TTL_SECONDS", 12 * 60 * 60))
+CACHE_MAX_BYTES = int(os.getenv("HTML_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+EVICT_EVERY_N_WRITES = 100
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class HtmlCache:
+    """
+    URL keyed cache of compressed response bodies plus their validators.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    # --- paths ---
+    def _entry_path(self, url):
+        key = _sha256(url.encode("utf-8"))
+        return os.path.join(self.cache_dir, "entries", key[:2], f"{key}.json")
+
+    def _blob_path(self, body_hash):
+        return os.path.join(self.cache_dir, "blobs", body_hash[:2], f"{body_hash}.z")
+
+    # --- entries ---
+    def get_entry(self, url):
+        path = self._entry_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_entry(self, url, entry):
+        _atomic_write(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def read_body(self, entry):
+        try:
+            with open(self._blob_path(entry["body_hash"]), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error, KeyError):
+            return None
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("fetched_at", 0) < self.ttl_seconds
+
+    def store(self, url, html, etag=None, last_modified=None):
+        """
+        Stores a body for `url`. Also used to keep pages fetched with Selenium.
+        """
+        raw = html.encode("utf-8")
+        body_hash = _sha256(raw)
+        blob_path = self._blob_path(body_hash)
+        if not os.path.exists(blob_path):
+            _atomic_write(blob_path, zlib.compress(raw, 6))
+
+        self._write_entry(url, {
+            "url": url,
+            "body_hash": body_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        })
+
+        with self._lock:
+            self._writes += 1
+            run_eviction = self._writes % EVICT_EVERY_N_WRITES == 0
+        if run_eviction:
+            self.evict()
+
+    def touch(self, url, entry):
+        """
+        Marks a cached entry as revalidated (after a 304).
+        """
+        entry["fetched_at"] = time.time()
+        self._write_entry(url, entry)
+
+    def invalidate(self, url):
+        """
+        Drops the entry for `url`, e.g. when the cached page turned out to be a captcha.
+        """
+        try:
+            os.remove(self._entry_path(url))
+        except OSError:
+            pass
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # --- eviction ---
+    def _list_files(self, sub_dir):
+        root = os.path.join(self.cache_dir, sub_dir)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if not filename.endswith(".tmp"):
+                    yield os.path.join(dirpath, filename)
+
+    def evict(self):
+        """
+        Removes the least recently fetched entries until the cache fits in `max_bytes`,
+        then deletes blobs that no entry points to anymore.
+        """
+        with self._lock:
+            entries = []
+            for path in self._list_files("entries"):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                    entries.append((entry.get("fetched_at", 0), path, entry.get("body_hash")))
+                except (OSError, json.JSONDecodeError):
+                    continue
+
+            blob_sizes = {}
+            for path in self._list_files("blobs"):
+                try:
+                    blob_sizes[os.path.basename(path)[:-2]] = os.path.getsize(path)
+                except OSError:
+                    continue
+
+            total = sum(blob_sizes.values())
+            entries.sort()
+            live = {}
+            for _, _, body_hash in entries:
+                live[body_hash] = live.get(body_hash, 0) + 1
+
+            removed = 0
+            for _, path, body_hash in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    continue
+                live[body_hash] -= 1
+                if live[body_hash] == 0:
+                    total -= blob_sizes.get(body_hash, 0)
+
+            # Remove blobs that are no longer referenced
+            for body_hash in blob_sizes:
+                if live.get(body_hash, 0) == 0:
+                    try:
+                        os.remove(self._blob_path(body_hash))
+                    except OSError:
+                        pass
+
+            if removed:
+                logging.info(f"🧹 Evicted {removed} pages from html cache ({total / 1e6:.1f} MB left)")
+
+
+_cache = None
+
+
+def get_cache():
+    """
+    Returns the process-wide cache, or None when the cache is disabled.
+    """
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = HtmlCache()
+    return _cache
+
+
+def cached_get_html(url, fetch, timeout=None):
+    """
+    Returns the page body for `url`, using the cache where possible.
+    `fetch(url, headers=..., timeout=...)` performs the actual request.
+    Only 200 (and 304 on a cached entry) produce a body; anything else returns None.
+    """
+    cache = get_cache()
+    entry = cache.get_entry(url) if cache else None
+    cached_body = cache.read_body(entry) if entry else None
+
+    if cached_body is not None and cache.is_fresh(entry):
+        return cached_body
+
+    headers = cache.conditional_headers(entry) if cached_body is not None else None
+    response = fetch(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and cached_body is not None:
+        cache.touch(url, entry)
+        return cached_body
+
+    if response.status_code == 200:
+        if cache:
+            cache.store(
+                url,
+                response.text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return response.text
+
+    return None
+
+
+def invalidate(url):
+    cache = get_cache()
+    if cache:
+        cache.invalidate(url)
+
+
+def store(url, html):
+    cache = get_cache()
+    if cache and html:
+        cache.store(url, html)
@@ -0,0 +1,409 @@
+# %%
+# src/utils/listing_history.py
+"""
+Listing history across Funda, makelaars and rentals.
+
+One row per canonical listing (source + normalized url) with first_seen, last_seen,
+first/last/lowest price and current status, plus one row per price change and per
+status transition. The table is updated incrementally after every scrape, so
+'what is new since X' and 'what dropped in price' are index lookups instead of
+scans over all daily files.
+
+Backed by SQLite (WAL mode), like the geocode cache.
+"""
+
+import os
+import glob
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+import pandas as pd
+
+from src.utils.config import DATA_DIR
+
+HISTORY_PATH = os.path.join(DATA_DIR, "store", "listing_history.sqlite")
+RENTAL_CSV_PATTERN = os.path.join(DATA_DIR, "huren", "*.csv")
+
+# Column names per source: (url, price, status, address)
+SOURCE_COLUMNS = {
+    "funda": ("url", "price", "overdracht_status", "full_address"),
+    "makelaar": ("url", "price", "available", "full_adres"),
+    "rental": ("link", "price", "is_available", "address_full"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    listing_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    address TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    times_seen INTEGER NOT NULL,
+    first_price REAL,
+    last_price REAL,
+    min_price REAL,
+    status TEXT,
+    status_since TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_listings_first_seen ON listings (source, first_seen);
+CREATE INDEX IF NOT EXISTS idx_listings_last_seen ON listings (source, last_seen);
+
+CREATE TABLE IF NOT EXISTS price_changes (
+    listing_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    old_price REAL,
+    new_price REAL,
+    PRIMARY KEY (listing_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_price_changes_date ON price_changes (date);
+
+CREATE TABLE IF NOT EXISTS status_changes (
+    listing_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT,
+    PRIMARY KEY (listing_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_status_changes_date ON status_changes (date);
+"""
+
+
+def canonical_url(url):
+    """
+    Lowercased scheme/host, no query string or fragment, no trailing slash.
+    """
+    if not isinstance(url, str) or not url.strip():
+        return None
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+def canonical_listing_id(source, url):
+    url = canonical_url(url)
+    return f"{source}:{url}" if url else None
+
+
+def _to_date(value):
+    return pd.Timestamp(value or pd.Timestamp.now()).strftime("%Y-%m-%d")
+
+
+def _clean_status(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, bool) or str(value).upper() in ("TRUE", "FALSE"):
+        return "available" if str(value).upper() == "TRUE" else "unavailable"
+    return str(value).strip().lower() or None
+
+
+def _clean_price(value):
+    price = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(price) else float(price)
+
+
+class ListingHistory:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _existing(self, listing_ids):
+        existing = {}
+        ids = list(listing_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT listing_id, first_seen, last_seen, times_seen, first_price, last_price, min_price, "
+                f"status, status_since FROM listings WHERE listing_id IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for row in rows:
+                existing[row[0]] = row[1:]
+        return existing
+
+    def update(self, df, source, scrape_date=None):
+        """
+        Records one scrape of `source`. Only listings in `df` are touched; a listing seen
+        again on the same date is not counted twice.
+
+        Replaying a date before last_seen (a backfill) only moves first_seen, first_price and
+        min_price; the current price and status stay those of last_seen. A date before
+        first_seen is compared with the price at first_seen, dates in between change nothing
+        else (their neighbouring prices are not stored).
+
+        Returns:
+            dict: counts of new listings, price changes and status changes
+        """
+        if df is None or df.empty:
+            return {"new": 0, "price_changes": 0, "status_changes": 0}
+
+        url_col, price_col, status_col, address_col = SOURCE_COLUMNS[source]
+        date = _to_date(scrape_date)
+
+        scraped = {}
+        for url, price, status, address in zip(
+            df[url_col],
+            df[price_col] if price_col in df.columns else [None] * len(df),
+            df[status_col] if status_col in df.columns else [None] * len(df),
+            df[address_col] if address_col in df.columns else [None] * len(df),
+        ):
+            listing_id = canonical_listing_id(source, url)
+            if listing_id:
+                scraped[listing_id] = (canonical_url(url), _clean_price(price), _clean_status(status), address)
+
+        listing_rows, price_rows, status_rows = [], [], []
+        new = 0
+        with self._lock:
+            existing = self._existing(scraped)
+            for listing_id, (url, price, status, address) in scraped.items():
+                address = address if isinstance(address, str) else None
+                if listing_id not in existing:
+                    new += 1
+                    listing_rows.append((
+                        listing_id, source, url, address, date, date, 1,
+                        price, price, price, status, date if status else None,
+                    ))
+                    continue
+
+                first_seen, last_seen, times_seen, first_price, last_price, min_price, old_status, status_since = existing[listing_id]
+                if price is not None:
+                    min_price = price if min_price is None else min(min_price, price)
+
+                if date < last_seen:
+                    if date < first_seen:
+                        times_seen += 1
+                        if price is not None:
+                            # the price moved from this date's price to first_price on first_seen
+                            if first_price is not None and price != first_price:
+                                price_rows.append((listing_id, first_seen, price, first_price))
+                            first_price = price
+                        first_seen = date
+                    listing_rows.append((
+                        listing_id, source, url, address, first_seen, last_seen, times_seen,
+                        first_price, last_price, min_price, old_status, status_since,
+                    ))
+                    continue
+
+                if last_seen != date:
+                    times_seen += 1
+                if price is not None and last_price is not None and price != last_price:
+                    price_rows.append((listing_id, date, last_price, price))
+                if status is not None and status != old_status:
+                    status_rows.append((listing_id, date, old_status, status))
+                    status_since = date
+                listing_rows.append((
+                    listing_id, source, url, address, first_seen, date, times_seen,
+                    first_price if first_price is not None else price,
+                    price if price is not None else last_price,
+                    min_price,
+                    status if status is not None else old_status,
+                    status_since,
+                ))
+
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", listing_rows)
+            self._conn.executemany("INSERT OR REPLACE INTO price_changes VALUES (?, ?, ?, ?)", price_rows)
+            self._conn.executemany("INSERT OR REPLACE INTO status_changes VALUES (?, ?, ?, ?)", status_rows)
+            self._conn.execute("COMMIT")
+
+        counts = {"new": new, "price_changes": len(price_rows), "status_changes": len(status_rows)}
+        logging.info(f"📜 Listing history ({source}, {date}): {counts['new']} new, "
+                     f"{counts['price_changes']} price changes, {counts['status_changes']} status changes")
+        return counts
+
+    def _query(self, query, params=()):
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def count(self, source):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM listings WHERE source = ?", (source,)).fetchone()[0]
+
+    def checkpoint(self):
+        """
+        Moves the WAL into the database file, so the file alone can be committed.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def new_since(self, since, source=None):
+        """
+        Listings first seen on or after `since`.
+        """
+        query = "SELECT * FROM listings WHERE first_seen >= ?"
+        params = [_to_date(since)]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        return self._query(query + " ORDER BY first_seen DESC", params)
+
+    def price_drops(self, since, source=None):
+        """
+        Price decreases on or after `since`, with the listing's current state.
+        """
+        query = """
+            SELECT p.listing_id, p.date, p.old_price, p.new_price, p.new_price - p.old_price AS change,
+                   l.source, l.url, l.address, l.first_seen, l.first_price, l.status
+            FROM price_changes p JOIN listings l ON l.listing_id = p.listing_id
+            WHERE p.date >= ? AND p.new_price < p.old_price
+        """
+        params = [_to_date(since)]
+        if source:
+            query += " AND l.source = ?"
+            params.append(source)
+        return self._query(query + " ORDER BY p.date DESC", params)
+
+    def lookup(self, source, urls):
+        """
+        History rows for the given urls of `source`, indexed by the original url.
+        """
+        urls = pd.Series(list(urls)).dropna().unique()
+        ids = {canonical_listing_id(source, url): url for url in urls}
+        ids.pop(None, None)
+        with self._lock:
+            existing = self._existing(ids)
+        columns = ["first_seen", "last_seen", "times_seen", "first_price", "last_price", "min_price", "status", "status_since"]
+        rows = {ids[listing_id]: values for listing_id, values in existing.items()}
+        return pd.DataFrame.from_dict(rows, orient="index", columns=columns)
+
+    def price_trajectory(self, source, url):
+        return self._query(
+            "SELECT date, old_price, new_price FROM price_changes WHERE listing_id = ? ORDER BY date",
+            (canonical_listing_id(source, url),),
+        )
+
+    def status_trajectory(self, source, url):
+        return self._query(
+            "SELECT date, old_status, new_status FROM status_changes WHERE listing_id = ? ORDER BY date",
+            (canonical_listing_id(source, url),),
+        )
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_listing_history():
+    """
+    Returns the process-wide listing history.
+    """
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = ListingHistory()
+    return _history
+
+
+def record_scrape(df, source, scrape_date=None):
+    """
+    Updates the listing history after a scrape; never lets a history problem break the scrape.
+    """
+    try:
+        return get_listing_history().update(df, source, scrape_date)
+    except Exception as e:
+        logging.warning(f"⚠️ Could not update the listing history for {source}: {e}")
+        return None
+
+
+def backfill_from_store(source):
+    """
+    One-off: replays all stored partitions of `source` (oldest first) into the history.
+    """
+    from src.utils import listing_store
+
+    url_col, price_col, status_col, address_col = SOURCE_COLUMNS[source]
+    for scrape_date in listing_store.list_partitions(source):
+        df = listing_store.read_listings(
+            source, columns=[url_col, price_col, status_col, address_col],
+            start_date=scrape_date, end_date=scrape_date,
+        )
+        get_listing_history().update(df, source, scrape_date)
+
+
+def backfill_from_csv(source, pattern, date_col, rename=None, **read_csv_kwargs):
+    """
+    One-off: replays CSV files that hold one row per listing per scrape (e.g. the rental
+    files in data/huren), date by date, oldest first.
+
+    Parameters:
+        date_col (str): column with the scrape date of each row
+        rename (dict): renames to the columns of SOURCE_COLUMNS, e.g. {'price_per_month': 'price'}
+    """
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            df = pd.read_csv(path, **read_csv_kwargs)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not read {path} for the listing history: {e}")
+            continue
+        if date_col in df.columns:
+            frames.append(df.rename(columns={k: v for k, v in (rename or {}).items() if v not in df.columns}))
+    if not frames:
+        return
+
+    df = pd.concat(frames, ignore_index=True)
+    df["_date"] = pd.to_datetime(df[date_col], errors="coerce", format="mixed").dt.strftime("%Y-%m-%d")
+    for scrape_date, day in df.dropna(subset=["_date"]).groupby("_date", sort=True):
+        get_listing_history().update(day, source, scrape_date)
+
+
+def backfill_rental_csvs(pattern=RENTAL_CSV_PATTERN):
+    backfill_from_csv("rental", pattern, "date_scraped", rename={"price_per_month": "price"})
+
+
+def ensure_backfilled(source):
+    """
+    Backfills `source` from the listing store (and for rentals the CSVs in data/huren) when
+    the history has no listings of it yet, so first_seen can be read from the history.
+
+    Returns:
+        bool: whether a backfill ran
+    """
+    if get_listing_history().count(source):
+        return False
+    logging.info(f"📜 Listing history has no {source} listings yet, backfilling")
+    backfill_from_store(source)
+    if source == "rental":
+        backfill_rental_csvs()
+    return True
+
+
+def unit_test_replay_older_day():
+    import tempfile
+
+    history = ListingHistory(os.path.join(tempfile.mkdtemp(), "listing_history.sqlite"))
+    url = "https://x.nl/a"
+    history.update(pd.DataFrame({"link": [url], "price": [1500], "is_available": [True]}), "rental", "2026-10-05")
+    history.update(pd.DataFrame({"link": [url], "price": [1400], "is_available": [False]}), "rental", "2026-10-01")
+    history.update(pd.DataFrame({"link": [url], "price": [1450], "is_available": [False]}), "rental", "2026-10-03")
+
+    row = history.lookup("rental", [url]).iloc[0]
+    assert (row["first_seen"], row["last_seen"]) == ("2026-10-01", "2026-10-05"), row
+    assert row["first_price"] == 1400 and row["min_price"] == 1400, row
+    assert row["last_price"] == 1500 and row["status"] == "available", row
+
+    # only the increase from the replayed first day to the first known day is recorded
+    trajectory = history.price_trajectory("rental", url)
+    assert trajectory.values.tolist() == [["2026-10-05", 1400, 1500]], trajectory
+    assert history.price_drops("2026-01-01", "rental").empty
+    assert history.status_trajectory("rental", url).empty
+
+    history.update(pd.DataFrame({"link": [url], "price": [1300]}), "rental", "2026-10-06")
+    drops = history.price_drops("2026-01-01", "rental")
+    assert drops[["date", "old_price", "new_price"]].values.tolist() == [["2026-10-06", 1500, 1300]], drops
+
+
+if __name__ == "__main__":
+    unit_test_replay_older_day()
+    for source in SOURCE_COLUMNS:
+        backfill_from_store(source)
+    backfill_rental_csvs()
@@ -0,0 +1,285 @@
+# %%
+# src/utils/listing_store.py
+"""
+Columnar listing store replacing the daily CSV sprawl.
+
+Listings are stored as Parquet, partitioned by source and scrape date:
+
+    data/store/<source>/scrape_date=YYYY-MM-DD/part-<name>.parquet
+
+Each source has a typed schema for its core columns; extra columns are kept as strings.
+Reads go through pyarrow.dataset, so only the requested columns are read (projection)
+and only the partitions/row groups matching the filters are opened (predicate pushdown).
+"""
+
+import os
+import re
+import glob
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.utils.config import DATA_DIR
+
+STORE_DIR = os.path.join(DATA_DIR, "store")
+
+# Core column types per source; other columns are stored as strings
+SCHEMAS = {
+    "funda": {
+        "street_name": "string",
+        "number": "string",
+        "url": "string",
+        "m2": "float64",
+        "price": "float64",
+        "price/m2": "float64",
+        "city": "string",
+        "country": "string",
+        "full_address": "string",
+        "lat": "float64",
+        "lon": "float64",
+        "neighborhood": "string",
+        "overdracht_status": "string",
+        "overdracht_aangeboden_sinds": "string",
+        "listing_data_bouwjaar": "Int64",
+        "listing_data_externe_bergruimte_m2": "float64",
+        "listing_data_gebouwgebonden_buitenruimte_m2": "float64",
+    },
+    "makelaar": {
+        "python_file": "string",
+        "url": "string",
+        "full_adres": "string",
+        "city": "string",
+        "price": "float64",
+        "area": "float64",
+        "num_rooms": "float64",
+        "available": "string",
+        "street": "string",
+        "number_extension": "string",
+        "full_address_processed": "string",
+        "full_address_streets": "string",
+        "latitude": "float64",
+        "longitude": "float64",
+    },
+    "rental": {
+        "address_full": "string",
+        "street": "string",
+        "price": "float64",
+        "squared_m2": "float64",
+        "surface_m2": "float64",
+        "price_per_m2": "float64",
+        "price_per_squared_m2": "float64",
+        "is_available": "boolean",
+        "note": "string",
+        "date_scraped": "datetime64[ns]",
+        "link": "string",
+        "available_from": "string",
+        "available_from_date": "string",
+        "rental_company": "string",
+    },
+}
+
+PARTITION_SCHEMA = pa.schema([("scrape_date", pa.string())])
+
+# Arrow type of each core dtype; all other columns are read as strings
+ARROW_TYPES = {
+    "float64": pa.float64(),
+    "Int64": pa.int64(),
+    "string": pa.large_string(),
+    "boolean": pa.bool_(),
+    "datetime64[ns]": pa.timestamp("ns"),
+}
+
+
+def _source_dir(source):
+    if source not in SCHEMAS:
+        raise ValueError(f"Unknown source '{source}', expected one of {list(SCHEMAS)}")
+    return os.path.join(STORE_DIR, source)
+
+
+def apply_schema(df, source):
+    """
+    Casts the core columns of `source` to their types and all other columns to strings,
+    so a column has the same type in every partition whatever pandas inferred that day.
+    """
+    df = df.copy()
+    schema = SCHEMAS[source]
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype in ("float64", "Int64"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        elif dtype == "datetime64[ns]":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype == "boolean":
+            df[col] = df[col].replace({"TRUE": True, "FALSE": False, "True": True, "False": False}).astype("boolean")
+        else:
+            df[col] = df[col].astype("string")
+
+    for col in df.columns:
+        if col not in schema:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def write_partition(df, source, scrape_date=None, part="0"):
+    """
+    Writes (or replaces) the partition of `source` for `scrape_date` (default today).
+    Several writers can share one day by using a different `part`, e.g. one per rental company.
+    """
+    if df is None or df.empty:
+        logging.info(f"No {source} rows to store.")
+        return None
+
+    scrape_date = pd.Timestamp(scrape_date or pd.Timestamp.now()).strftime("%Y-%m-%d")
+    partition_dir = os.path.join(_source_dir(source), f"scrape_date={scrape_date}")
+    os.makedirs(partition_dir, exist_ok=True)
+
+    table = pa.Table.from_pandas(apply_schema(df, source), preserve_index=False)
+    path = os.path.join(partition_dir, f"part-{part}.parquet")
+    # files starting with '_' are ignored by pyarrow.dataset while being written
+    tmp_path = os.path.join(partition_dir, f"_part-{part}.parquet.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+    logging.info(f"💾 Stored {len(df)} {source} rows in {path}")
+    return path
+
+
+def list_partitions(source):
+    """
+    Returns the sorted scrape dates available for `source`.
+    """
+    pattern = os.path.join(_source_dir(source), "scrape_date=*")
+    return sorted(os.path.basename(p).split("=", 1)[1] for p in glob.glob(pattern))
+
+
+def _dataset_schema(source, files):
+    """
+    One schema over all files (only footers are read): columns were added over time, and
+    older partitions may have stored a non-core column with another type. Core columns get
+    their schema type and everything else is string; the scan casts each file to it.
+    """
+    core = SCHEMAS[source]
+    fields = {}
+    for path in files:
+        for field in pq.read_schema(path):
+            if field.name in fields or field.name == "scrape_date" or field.name.startswith("__index_level_"):
+                continue
+            target = ARROW_TYPES.get(core.get(field.name), pa.large_string())
+            fields[field.name] = pa.field(field.name, target)
+    return pa.schema(list(fields.values()) + list(PARTITION_SCHEMA))
+
+
+def read_listings(source, columns=None, start_date=None, end_date=None, filter=None):
+    """
+    Reads listings of `source` from the store.
+
+    Parameters:
+        source (str): 'funda', 'makelaar' or 'rental'
+        columns (list): Columns to read (None for all)
+        start_date, end_date: Inclusive scrape date bounds (strings or timestamps)
+        filter (pyarrow.dataset.Expression): Extra row filter, e.g. ds.field('price') < 500000
+
+    Returns:
+        pd.DataFrame: Matching rows, with a 'scrape_date' column
+    """
+    source_dir = _source_dir(source)
+    if not list_partitions(source):
+        return pd.DataFrame(columns=columns or [])
+
+    files = glob.glob(os.path.join(source_dir, "scrape_date=*", "part-*.parquet"))
+    schema = _dataset_schema(source, files)
+    dataset = ds.dataset(
+        files,
+        schema=schema,
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        partition_base_dir=source_dir,
+    )
+
+    expression = filter
+    for bound, op in ((start_date, "ge"), (end_date, "le")):
+        if bound is None:
+            continue
+        bound = pd.Timestamp(bound).strftime("%Y-%m-%d")
+        condition = ds.field("scrape_date") >= bound if op == "ge" else ds.field("scrape_date") <= bound
+        expression = condition if expression is None else expression & condition
+
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+
+def read_latest(source, columns=None):
+    """
+    Reads only the most recent partition of `source`.
+    """
+    partitions = list_partitions(source)
+    if not partitions:
+        return pd.DataFrame(columns=columns or [])
+    return read_listings(source, columns=columns, start_date=partitions[-1], end_date=partitions[-1])
+
+
+def import_csv_history(source, pattern, date_regex=r"(\d{4}-\d{2}-\d{2})", **read_csv_kwargs):
+    """
+    One-off backfill of the store from the existing daily CSV files, e.g.
+    import_csv_history('funda', 'data/funda/funda_data_*.csv').
+    Partitions that already exist are left untouched.
+    """
+    existing = set(list_partitions(source))
+    for path in sorted(glob.glob(pattern)):
+        match = re.search(date_regex, os.path.basename(path))
+        if not match or match.group(1) in existing:
+            continue
+        try:
+            df = pd.read_csv(path, **read_csv_kwargs)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not import {path}: {e}")
+            continue
+        write_partition(df, source, match.group(1))
+
+
+def unit_test_mixed_types():
+    """
+    Days where pandas inferred different types for the same extra column must read back
+    together, also when an older partition stored the column with its inferred type.
+    """
+    import tempfile
+    global STORE_DIR
+
+    store_dir = STORE_DIR
+    STORE_DIR = tempfile.mkdtemp()
+    try:
+        base = {"url": ["a", "b"], "street_name": ["Damstraat", "Singel"], "price": [400000, 500000]}
+        write_partition(pd.DataFrame({**base, "popularity_bekeken": [120, 80]}), "funda", "2026-10-01")
+        write_partition(pd.DataFrame({**base, "popularity_bekeken": ["1.234x", None]}), "funda", "2026-10-02")
+        write_partition(pd.DataFrame({**base, "popularity_bekeken": [None, None], "extra": [1.5, 2.5]}), "funda", "2026-10-03")
+
+        # a partition written before every extra column was stored as string
+        legacy_dir = os.path.join(_source_dir("funda"), "scrape_date=2026-09-30")
+        os.makedirs(legacy_dir)
+        pq.write_table(pa.table({"url": ["c"], "price": [300000.0], "popularity_bekeken": [7], "extra": [3]}),
+                       os.path.join(legacy_dir, "part-0.parquet"))
+
+        df = read_listings("funda").sort_values(["scrape_date", "url"])
+        assert len(df) == 7 and df["popularity_bekeken"].dropna().tolist() == ["7", "120", "80", "1.234x"], df
+        assert df["extra"].dropna().tolist() == ["3", "1.5", "2.5"], df
+        assert df["price"].dtype == "float64"
+
+        df = read_listings("funda", columns=["url", "popularity_bekeken", "scrape_date"], start_date="2026-10-02",
+                           filter=ds.field("price") < 450000)
+        df = df.sort_values("scrape_date")
+        assert df["url"].tolist() == ["a", "a"] and df["popularity_bekeken"].isna().tolist() == [False, True], df
+    finally:
+        STORE_DIR = store_dir
+
+
+if __name__ == "__main__":
+    unit_test_mixed_types()
+    import_csv_history("funda", os.path.join(DATA_DIR, "funda", "funda_data_*.csv"))
+    import_csv_history("makelaar", os.path.join(DATA_DIR, "makelaar", "makelaar_results_*.csv"))
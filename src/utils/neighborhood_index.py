@@ -0,0 +1,164 @@
+# %%
+# src/utils/neighborhood_index.py
+"""
+Prebuilt spatial index for assigning neighborhoods to lat/lon points.
+
+The bounding box of data/neighborhoods_amsterdam.json is divided into a grid of small cells.
+For every cell we precompute whether it lies completely inside one neighborhood, completely
+outside all of them, or on a border. Lookups over raw lat/lon arrays are then a vectorized
+array index; only points in border cells get an exact point-in-polygon test (STRtree).
+
+The grid is persisted next to the html cache and rebuilt when the GeoJSON changes.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+from functools import lru_cache
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+from shapely.strtree import STRtree
+
+from src.utils.config import DATA_DIR
+
+NEIGHBORHOODS_PATH = os.path.join(DATA_DIR, "neighborhoods_amsterdam.json")
+INDEX_PATH = os.path.join(DATA_DIR, "cache", "neighborhood_index.pkl")
+CELL_SIZE = 0.001  # degrees, roughly 70 x 110 metres in Amsterdam
+UNKNOWN = "Unknown"
+
+OUTSIDE = -1  # cell does not touch any neighborhood
+BORDER = -2  # cell touches a border, needs an exact test
+
+
+class NeighborhoodIndex:
+    """
+    Grid of precomputed cell -> neighborhood lookups with an STRtree fallback for border cells.
+    """
+
+    def __init__(self, names, polygons, cell_size=CELL_SIZE):
+        # polygons without a name count as 'Unknown', like the fillna after the old sjoin
+        self.names = np.array([name or UNKNOWN for name in names] + [UNKNOWN], dtype=object)
+        self.polygons = list(polygons)
+        self.cell_size = cell_size
+        self.tree = STRtree(self.polygons)
+
+        min_x, min_y, max_x, max_y = shapely.total_bounds(self.polygons)
+        self.origin = (min_x, min_y)
+        self.shape = (
+            int(np.ceil((max_y - min_y) / cell_size)) + 1,
+            int(np.ceil((max_x - min_x) / cell_size)) + 1,
+        )
+        self.grid = self._build_grid()
+
+    def _build_grid(self):
+        n_rows, n_cols = self.shape
+        rows, cols = np.mgrid[0:n_rows, 0:n_cols]
+        x0 = self.origin[0] + cols.ravel() * self.cell_size
+        y0 = self.origin[1] + rows.ravel() * self.cell_size
+        cells = shapely.box(x0, y0, x0 + self.cell_size, y0 + self.cell_size)
+
+        grid = np.full(cells.shape[0], OUTSIDE, dtype=np.int32)
+
+        # Cells touching any polygon are border cells until proven to lie inside one
+        cell_idx, _ = self.tree.query(cells, predicate="intersects")
+        touching, n_touching = np.unique(cell_idx, return_counts=True)
+        grid[touching] = BORDER
+
+        # Cells completely inside a polygon and touching no other polygon get that polygon
+        cell_idx, poly_idx = self.tree.query(cells, predicate="within")
+        single = np.isin(cell_idx, touching[n_touching == 1])
+        grid[cell_idx[single]] = poly_idx[single]
+
+        return grid.reshape(self.shape)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("tree")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.tree = STRtree(self.polygons)
+
+    def lookup(self, lat, lon):
+        """
+        Returns the neighborhood name for every point (array of str, 'Unknown' when not inside one).
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        result = np.full(lat.shape, len(self.names) - 1, dtype=np.int64)
+
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        col = np.floor((lon - self.origin[0]) / self.cell_size)
+        row = np.floor((lat - self.origin[1]) / self.cell_size)
+        in_grid = valid & (row >= 0) & (row < self.shape[0]) & (col >= 0) & (col < self.shape[1])
+
+        idx = np.flatnonzero(in_grid)
+        cell_values = self.grid[row[idx].astype(np.int64), col[idx].astype(np.int64)]
+
+        inside = cell_values >= 0
+        result[idx[inside]] = cell_values[inside]
+
+        # Exact test only for points in border cells
+        border = idx[cell_values == BORDER]
+        if border.size:
+            points = shapely.points(lon[border], lat[border])
+            point_idx, poly_idx = self.tree.query(points, predicate="within")
+            # overlapping neighborhoods: keep the first polygon in file order
+            order = np.lexsort((poly_idx, point_idx))
+            point_idx, poly_idx = point_idx[order], poly_idx[order]
+            _, first = np.unique(point_idx, return_index=True)
+            result[border[point_idx[first]]] = poly_idx[first]
+
+        return self.names[result]
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_index(geojson_path=NEIGHBORHOODS_PATH, cell_size=CELL_SIZE):
+    with open(geojson_path, "r") as f:
+        geojson_data = json.load(f)
+
+    names, polygons = [], []
+    for feature in geojson_data["features"]:
+        names.append(feature["properties"].get("neighborhood"))
+        polygons.append(shape(feature["geometry"]))
+    return NeighborhoodIndex(names, polygons, cell_size=cell_size)
+
+
+@lru_cache(maxsize=None)
+def get_neighborhood_index(geojson_path=NEIGHBORHOODS_PATH, index_path=INDEX_PATH):
+    """
+    Loads the persisted index, rebuilding it when the GeoJSON changed since it was built.
+    """
+    source_hash = _file_hash(geojson_path)
+
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "rb") as f:
+                stored = pickle.load(f)
+            if stored["source_hash"] == source_hash:
+                return stored["index"]
+        except Exception as e:
+            logging.warning(f"⚠️ Could not load neighborhood index, rebuilding: {e}")
+
+    index = build_index(geojson_path)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    with open(index_path, "wb") as f:
+        pickle.dump({"source_hash": source_hash, "index": index}, f)
+    logging.info(f"🗺️ Built neighborhood index with grid {index.shape} and saved it to {index_path}")
+    return index
+
+
+def assign_neighborhoods(lat, lon):
+    """
+    Vectorized neighborhood lookup over raw lat/lon arrays.
+    """
+    return get_neighborhood_index().lookup(lat, lon)
@@ -0,0 +1,299 @@
+# %%
+# src/utils/neighborhood_stats.py
+"""
+Materialized neighborhood statistics per (neighborhood, source, date, rooms bucket).
+
+Each row holds the number of listings, the number of new listings (first seen that day,
+from the listing history) and the median / p25 / p75 price per m2. After every scrape
+only the (source, date) slice that was just written is recomputed from the listing
+store, so the dashboard and the notifications read a few hundred aggregate rows instead
+of scanning raw listings.
+
+Besides the buckets '1', '2', '3', '4+' and 'unknown', every neighborhood/date has a
+rooms_bucket 'all' row (medians cannot be combined from the buckets).
+
+Rentals are not aggregated: the rental pipelines store no coordinates or neighborhood,
+so every rental would end up in 'Unknown'. Add them to SOURCE_FIELDS once the rental
+listings are geocoded.
+
+Backed by SQLite (WAL mode), like the listing history.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import DATA_DIR
+
+STATS_PATH = os.path.join(DATA_DIR, "store", "neighborhood_stats.sqlite")
+ALL_ROOMS = "all"
+UNKNOWN_NEIGHBORHOOD = "Unknown"
+
+# Columns per source: (url, price, area, rooms, lat, lon)
+SOURCE_FIELDS = {
+    "funda": ("url", "price", "m2", "indeling_kamers", "lat", "lon"),
+    "makelaar": ("url", "price", "area", "num_rooms", "latitude", "longitude"),
+}
+
+STAT_COLUMNS = ["listings", "new_listings", "median_price_per_m2", "p25_price_per_m2", "p75_price_per_m2", "median_price"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS neighborhood_stats (
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    neighborhood TEXT NOT NULL,
+    rooms_bucket TEXT NOT NULL,
+    listings INTEGER NOT NULL,
+    new_listings INTEGER NOT NULL,
+    median_price_per_m2 REAL,
+    p25_price_per_m2 REAL,
+    p75_price_per_m2 REAL,
+    median_price REAL,
+    PRIMARY KEY (source, date, neighborhood, rooms_bucket)
+);
+CREATE INDEX IF NOT EXISTS idx_neighborhood_stats_date ON neighborhood_stats (date, rooms_bucket);
+"""
+
+
+def rooms_bucket(rooms):
+    """
+    '1', '2', '3', '4+' or 'unknown'; text such as '3 kamers (2 slaapkamers)' is parsed.
+    """
+    if rooms.dtype == object or pd.api.types.is_string_dtype(rooms):
+        rooms = rooms.astype("string").str.extract(r"(\d+)", expand=False)
+    rooms = pd.to_numeric(rooms, errors="coerce")
+    bucket = pd.Series("unknown", index=rooms.index, dtype=object)
+    valid = rooms >= 1
+    bucket[valid] = np.where(rooms[valid] >= 4, "4+", rooms[valid].astype("Int64").astype(str))
+    return bucket
+
+
+def _neighborhoods(df, lat_col, lon_col):
+    if "neighborhood" in df.columns:
+        return df["neighborhood"].astype(object).fillna(UNKNOWN_NEIGHBORHOOD).astype(str)
+    if lat_col in df.columns and lon_col in df.columns:
+        from src.utils.neighborhood_index import assign_neighborhoods
+        return pd.Series(assign_neighborhoods(
+            pd.to_numeric(df[lat_col], errors="coerce").to_numpy(),
+            pd.to_numeric(df[lon_col], errors="coerce").to_numpy(),
+        ), index=df.index).astype(str)
+    return pd.Series(UNKNOWN_NEIGHBORHOOD, index=df.index)
+
+
+def aggregate_listings(df, source, scrape_date, new_urls=None):
+    """
+    Aggregate rows for one scrape of `source`.
+
+    Parameters:
+        new_urls (set): urls first seen on `scrape_date`; None counts no new listings
+    """
+    url_col, price_col, area_col, rooms_col, lat_col, lon_col = SOURCE_FIELDS[source]
+    date = pd.Timestamp(scrape_date).strftime("%Y-%m-%d")
+    if url_col in df.columns:
+        df = df.drop_duplicates(subset=url_col)
+
+    price = pd.to_numeric(df[price_col], errors="coerce") if price_col in df.columns else pd.Series(np.nan, index=df.index)
+    area = pd.to_numeric(df[area_col], errors="coerce") if area_col in df.columns else pd.Series(np.nan, index=df.index)
+    rooms = df[rooms_col] if rooms_col in df.columns else pd.Series(np.nan, index=df.index)
+
+    rows = pd.DataFrame({
+        "neighborhood": _neighborhoods(df, lat_col, lon_col),
+        "rooms_bucket": rooms_bucket(rooms),
+        "price": price,
+        "price_per_m2": price / area.where(area > 0),
+        "is_new": df[url_col].isin(new_urls or ()) if url_col in df.columns else False,
+    })
+    rows = pd.concat([rows, rows.assign(rooms_bucket=ALL_ROOMS)], ignore_index=True)
+
+    grouped = rows.groupby(["neighborhood", "rooms_bucket"], sort=True)
+    stats = pd.DataFrame({
+        "listings": grouped.size(),
+        "new_listings": grouped["is_new"].sum().astype(int),
+        "median_price_per_m2": grouped["price_per_m2"].median(),
+        "p25_price_per_m2": grouped["price_per_m2"].quantile(0.25),
+        "p75_price_per_m2": grouped["price_per_m2"].quantile(0.75),
+        "median_price": grouped["price"].median(),
+    }).reset_index()
+    stats.insert(0, "date", date)
+    stats.insert(0, "source", source)
+    return stats
+
+
+class NeighborhoodStats:
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def replace(self, stats, source, scrape_date):
+        """
+        Replaces the (source, date) slice with `stats` in one transaction.
+        """
+        date = pd.Timestamp(scrape_date).strftime("%Y-%m-%d")
+        columns = ["source", "date", "neighborhood", "rooms_bucket"] + STAT_COLUMNS
+        values = [
+            tuple(None if isinstance(v, float) and np.isnan(v) else v for v in row)
+            for row in stats[columns].astype(object).itertuples(index=False, name=None)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM neighborhood_stats WHERE source = ? AND date = ?", (source, date))
+            self._conn.executemany(
+                f"INSERT INTO neighborhood_stats ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values
+            )
+            self._conn.execute("COMMIT")
+
+    def refresh(self, source, scrape_date=None, history=None):
+        """
+        Recomputes the slice of `source` for `scrape_date` (default today) from the listing store,
+        so several writers of one day all end up in the slice.
+
+        Parameters:
+            history (ListingHistory): for the new listing counts (default the process-wide one)
+        """
+        from src.utils import listing_store
+        from src.utils.listing_history import get_listing_history
+
+        date = pd.Timestamp(scrape_date or pd.Timestamp.now()).strftime("%Y-%m-%d")
+        columns = [c for c in SOURCE_FIELDS[source] if c] + ["neighborhood"]
+        df = listing_store.read_listings(source, columns=columns, start_date=date, end_date=date)
+        if df.empty:
+            return None
+
+        url_col = SOURCE_FIELDS[source][0]
+        history = (history or get_listing_history()).lookup(source, df[url_col])
+        new_urls = set(history.index[history["first_seen"] == date])
+
+        stats = aggregate_listings(df, source, date, new_urls)
+        self.replace(stats, source, date)
+        logging.info(f"📊 Neighborhood stats ({source}, {date}): {len(stats)} rows")
+        return stats
+
+    def query(self, source=None, start_date=None, end_date=None, rooms_bucket=ALL_ROOMS, neighborhood=None):
+        conditions, params = ["1 = 1"], []
+        for column, op, value in (
+            ("source", "=", source), ("date", ">=", start_date), ("date", "<=", end_date),
+            ("rooms_bucket", "=", rooms_bucket), ("neighborhood", "=", neighborhood),
+        ):
+            if value is None:
+                continue
+            if column == "date":
+                value = pd.Timestamp(value).strftime("%Y-%m-%d")
+            conditions.append(f"{column} {op} ?")
+            params.append(value)
+        query = f"SELECT * FROM neighborhood_stats WHERE {' AND '.join(conditions)} ORDER BY date, neighborhood, rooms_bucket"
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def latest(self, source, rooms_bucket=ALL_ROOMS):
+        """
+        Stats of the most recent date of `source`.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(date) FROM neighborhood_stats WHERE source = ?", (source,)).fetchone()
+        if row is None or row[0] is None:
+            return pd.DataFrame()
+        return self.query(source, start_date=row[0], end_date=row[0], rooms_bucket=rooms_bucket)
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_neighborhood_stats():
+    """
+    Returns the process-wide neighborhood statistics table.
+    """
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = NeighborhoodStats()
+    return _stats
+
+
+def refresh_neighborhood_stats(source, scrape_date=None):
+    """
+    Refreshes the stats after a scrape; never lets a stats problem break the scrape.
+    """
+    try:
+        return get_neighborhood_stats().refresh(source, scrape_date)
+    except Exception as e:
+        logging.error(f"❌ Could not refresh the neighborhood stats for {source}: {e}", exc_info=True)
+        return None
+
+
+def unit_test_aggregate_listings():
+    df = pd.DataFrame({
+        "url": ["a", "b", "c", "d", "d"],
+        "price": [400000, 600000, 500000, None, None],
+        "m2": [50, 60, 0, 70, 70],
+        "indeling_kamers": ["2 kamers (1 slaapkamer)", "5 kamers", None, "2 kamers", "2 kamers"],
+        "neighborhood": ["Oost", "Oost", "Oost", None, None],
+    })
+    stats = aggregate_listings(df, "funda", "2026-10-01", new_urls={"b"}).set_index(["neighborhood", "rooms_bucket"])
+
+    oost = stats.loc[("Oost", ALL_ROOMS)]
+    assert oost["listings"] == 3 and oost["new_listings"] == 1
+    assert oost["median_price_per_m2"] == 9000 and oost["p25_price_per_m2"] == 8500
+    assert stats.loc[("Oost", "4+"), "listings"] == 1
+    assert stats.loc[("Oost", "unknown"), "listings"] == 1
+    assert stats.loc[(UNKNOWN_NEIGHBORHOOD, "2"), "listings"] == 1
+
+
+def unit_test_refresh():
+    """
+    Refresh against a multi-day listing store whose extra columns changed type between days.
+    """
+    import tempfile
+    from src.utils import listing_store
+    from src.utils.listing_history import ListingHistory
+
+    store_dir = listing_store.STORE_DIR
+    tmp = tempfile.mkdtemp()
+    listing_store.STORE_DIR = tmp
+    try:
+        history = ListingHistory(os.path.join(tmp, "listing_history.sqlite"))
+        stats = NeighborhoodStats(os.path.join(tmp, "neighborhood_stats.sqlite"))
+        day1 = pd.DataFrame({
+            "url": ["a", "b"], "price": [400000, 600000], "m2": [50, 60],
+            "indeling_kamers": ["2 kamers", "3 kamers"], "neighborhood": ["Oost", "West"],
+            "popularity_bekeken": [120, 80],
+        })
+        day2 = pd.DataFrame({
+            "url": ["a", "c"], "price": [390000, 500000], "m2": [50, 100],
+            "indeling_kamers": ["2 kamers", "4 kamers"], "neighborhood": ["Oost", "Oost"],
+            "popularity_bekeken": ["1.234x", None],
+        })
+        for date, df in (("2026-10-01", day1), ("2026-10-02", day2)):
+            listing_store.write_partition(df, "funda", date)
+            history.update(df, "funda", date)
+            assert stats.refresh("funda", date, history=history) is not None
+
+        latest = stats.latest("funda").set_index("neighborhood")
+        assert latest["date"].unique().tolist() == ["2026-10-02"]
+        assert latest.loc["Oost", "listings"] == 2 and latest.loc["Oost", "new_listings"] == 1
+        assert latest.loc["Oost", "median_price_per_m2"] == 6400
+        assert "West" not in latest.index
+        assert stats.query("funda", start_date="2026-10-01", end_date="2026-10-01")["new_listings"].sum() == 2
+    finally:
+        listing_store.STORE_DIR = store_dir
+
+
+if __name__ == "__main__":
+    # Backfill from every stored partition
+    from src.utils import listing_store
+
+    unit_test_aggregate_listings()
+    unit_test_refresh()
+    for source in SOURCE_FIELDS:
+        for scrape_date in listing_store.list_partitions(source):
+            get_neighborhood_stats().refresh(source, scrape_date)
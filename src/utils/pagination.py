@@ -0,0 +1,77 @@
+# %%
+# src/utils/pagination.py
+"""
+Adaptive pagination for listing overviews.
+
+Instead of requesting a fixed number of pages, pages are requested one after another
+until a page has no listings, or only listings that were already seen on an earlier
+page (many sites repeat the last page for any page number past the end).
+Optionally the next page is fetched while the current one is processed.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _is_empty(items):
+    return items is None or len(items) == 0
+
+
+def crawl_pages(pages, fetch_page, keys_of, prefetch=False, max_stale_pages=1, stop_on_failure=lambda page: True):
+    """
+    Yields (page, items) for every page that has new listings, and stops at the last real page.
+
+    Parameters:
+        pages (iterable): Page identifiers (urls or page numbers), consumed lazily; acts as the upper bound
+        fetch_page (callable): page -> listings (list or DataFrame); None when the page failed
+        keys_of (callable): listings -> iterable of listing identities (e.g. detail urls)
+        prefetch (bool): Fetch the next page in a background thread while the current one is handled
+        max_stale_pages (int): Consecutive pages without new listings before stopping
+        stop_on_failure (callable): page -> bool, whether a failed page ends the crawl
+    """
+    pages = iter(pages)
+    seen = set()
+    stale = 0
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        def submit(page):
+            return executor.submit(fetch_page, page) if executor else None
+
+        page = next(pages, None)
+        future = submit(page) if page is not None else None
+
+        while page is not None:
+            items = future.result() if future is not None else fetch_page(page)
+
+            next_page = next(pages, None)
+            # the request for the next page runs while we look at this one
+            future = submit(next_page) if next_page is not None else None
+
+            if items is None:
+                if stop_on_failure(page):
+                    logging.info(f"Stopping pagination: page {page} failed.")
+                    break
+                page = next_page
+                continue
+
+            if _is_empty(items):
+                logging.info(f"Stopping pagination: page {page} has no listings.")
+                break
+
+            keys = set(keys_of(items))
+            if keys <= seen:
+                stale += 1
+                if stale >= max_stale_pages:
+                    logging.info(f"Stopping pagination: page {page} only has listings seen before.")
+                    break
+            else:
+                stale = 0
+                seen |= keys
+                yield page, items
+
+            page = next_page
+    finally:
+        if executor:
+            # a prefetched page past the end is not waited for
+            executor.shutdown(wait=False, cancel_futures=True)